@@ -10,6 +10,9 @@ Usage:
     python cli/harness_cli.py phase-next         --project .
     python cli/harness_cli.py task list          --project .
     python cli/harness_cli.py task add           --project . --title "..." --role "..." --phase "..."
+    python cli/harness_cli.py plan show          --project .
+    python cli/harness_cli.py plan invalidate    --project .
+    python cli/harness_cli.py plan pin|unpin     --project .
     python cli/harness_cli.py launch-concurrent  --project .
 """
 
@@ -26,6 +29,7 @@ if _RUNTIME_DIR not in sys.path:
 
 from config import Config, load_config
 from gates import gate_check, GateResult, GATE_CRITERIA
+from plan_cache import PlanCache, plan_key
 from state import State, Task, PHASE_ORDER
 
 
@@ -180,6 +184,41 @@ def cmd_task_add(args):
     print(f"Added task [{task.id}] '{task.title}' to {task.phase} phase, assigned to {task.role}")
 
 
+def cmd_plan(args):
+    """Show, invalidate, pin or unpin the cached implementation plan."""
+    cache = PlanCache(args.project)
+
+    if args.plan_command == "invalidate":
+        print("Cached plan removed." if cache.invalidate() else "No cached plan.")
+        return
+    if args.plan_command in ("pin", "unpin"):
+        if not cache.pin(args.plan_command == "pin"):
+            print("No cached plan to pin.")
+            sys.exit(1)
+        print(f"Cached plan {args.plan_command}ned.")
+        return
+
+    entry = cache.load()
+    if entry is None:
+        print(json.dumps(None) if args.json_output else "No cached plan.")
+        return
+    config_path = os.path.join(args.project, "runtime", "config.yaml")
+    config = load_config(config_path) if os.path.isfile(config_path) else Config()
+    current = entry["key"] == plan_key(args.project, config)
+
+    if args.json_output:
+        print(json.dumps({**entry, "current": current}, indent=2))
+        return
+    if current:
+        freshness = "matches current specs"
+    else:
+        freshness = "stale, still used because it is pinned" if entry.get("pinned") else "stale, will be re-planned"
+    print(f"Cached plan: {len(entry['tasks'])} tasks, created {entry['created']} ({freshness})")
+    for t in entry["tasks"]:
+        deps = f" <- {', '.join(t['dependencies'])}" if t["dependencies"] else ""
+        print(f"  [{t['id']}] {t['title']} ({t['role']}){deps}")
+
+
 def cmd_launch_concurrent(args):
     """Run preflight checks and launch the concurrent orchestrator as a background process."""
     _PREFLIGHT = os.path.join(_CLI_DIR, "preflight_concurrent.py")
@@ -252,6 +291,13 @@ def main():
     add_parser.add_argument("--acceptance", default="", help="Acceptance criteria")
     add_parser.add_argument("--id", help="Custom task ID (auto-generated if omitted)")
 
+    plan_parser = subparsers.add_parser("plan", help="Cached implementation plan")
+    plan_sub = plan_parser.add_subparsers(dest="plan_command", required=True)
+    plan_sub.add_parser("show", help="Show the cached plan and whether it matches current specs")
+    plan_sub.add_parser("invalidate", help="Delete the cached plan so the planner runs again")
+    plan_sub.add_parser("pin", help="Keep using the cached plan even after specs change")
+    plan_sub.add_parser("unpin", help="Re-plan again when specs change")
+
     subparsers.add_parser("launch-concurrent", help="Preflight + launch concurrent orchestrator")
 
     args = parser.parse_args()
@@ -267,6 +313,8 @@ def main():
         cmd_gate_check(args)
     elif args.command == "phase-next":
         cmd_phase_next(args)
+    elif args.command == "plan":
+        cmd_plan(args)
     elif args.command == "launch-concurrent":
         cmd_launch_concurrent(args)
     elif args.command == "task":
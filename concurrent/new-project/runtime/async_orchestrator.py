@@ -0,0 +1,339 @@
+"""asyncio-based orchestrator engine for Concurrent mode.
+
+Alternative to the blocking loop in orchestrator.py (select with
+``run.py --engine async``). Workers are spawned with
+``asyncio.create_subprocess_exec``; gate judges, merges, planning and
+notifications run as coroutines (blocking helpers are moved off the event loop
+with ``asyncio.to_thread``), each bounded by its own semaphore. Task
+semantics are identical to the sync engine. State is mostly updated from the
+event loop thread, but spec re-planning and phase planning run in worker
+threads and add, change or remove tasks there; State serialises every update
+with its own lock. Notifications, including those sent by the shared failure
+and conflict handlers, go through the ``notify_concurrency`` semaphore and
+never block the loop. An unexpected error while gating or merging a worker
+fails that task through the usual retry handling instead of ending the run.
+
+Hedged execution (``hedge_enabled``) and batched merges (``merge_batch_max``
+> 1) are sync-engine features; the async engine refuses to start with either
+of them on (see unsupported_options).
+"""
+
+import asyncio
+import subprocess
+import time
+
+from config import Config
+from control import CheckpointWatch
+from dispatcher import Dispatcher
+from durations import task_shape
+from gate_cache import flush_caches
+from gates import gate_check
+from merge import merge_branch, cleanup_worktree, MergeConflict, task_branch
+from conflicts import rebase_and_recheck
+from merge_predict import MergePredictor, describe
+from notifier import notify
+from orchestrator import (
+    _checkpoint_exists,
+    _create_checkpoint,
+    _check_stalled,
+    _generate_phase_tasks,
+    _handle_conflict,
+    _handle_failure,
+    _lookahead_phase,
+    _needs_phase_tasks,
+    _replan_on_spec_changes,
+)
+from state import State
+from telemetry import init_run, log_event, log_run_complete
+from worker import Worker
+
+
+def unsupported_options(config: Config) -> list[str]:
+    """Options enabled in ``config`` that only the sync engine implements."""
+    options = []
+    if config.hedge_enabled:
+        options.append("hedge_enabled")
+    if config.merge_batch_max > 1:
+        options.append("merge_batch_max")
+    return options
+
+
+class AsyncOrchestrator:
+    """Runs the phase loop with every external step as a concurrent coroutine."""
+
+    def __init__(self, project_path: str, config: Config):
+        unsupported = unsupported_options(config)
+        if unsupported:
+            raise ValueError(f"not supported by the async engine: {', '.join(unsupported)}")
+        self.project_path = project_path
+        self.config = config
+        self.state = State(project_path, pipelined=config.pipelined_phases)
+        self.control = CheckpointWatch(project_path)
+        self.dispatcher = Dispatcher(config, project_path, self.control)
+        self._gate_sem = asyncio.Semaphore(max(1, config.gate_concurrency))
+        self._merge_sem = asyncio.Semaphore(1)  # merges mutate the main checkout
+        self._predictor = MergePredictor(project_path, config.merge_predict_workers) if config.merge_predict else None
+        self._notify_sem = asyncio.Semaphore(max(1, config.notify_concurrency))
+        self._planner_sem = asyncio.Semaphore(1)
+        self._changed = asyncio.Event()
+        self._background: set[asyncio.Task] = set()
+
+    def run(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        state, config, project_path = self.state, self.config, self.project_path
+        run_id = init_run(project_path)
+        run_start = time.time()
+        if self.control.fileno() is not None:
+            asyncio.get_running_loop().add_reader(self.control.fileno(), self._on_control)
+        self._notify(f"Starting concurrent run {run_id} (async engine). Phase: {state.current_phase}", "info")
+
+        while state.current_phase != "complete":
+            if state.current_phase in config.skip_phases:
+                self._notify(f"Skipping phase: {state.current_phase}", "info")
+                state.advance_phase()
+                continue
+
+            if _checkpoint_exists(project_path):
+                self._notify("Paused at checkpoint. Run with --resume to continue.", "warning")
+                await self._wait_for_resume()
+
+            async with self._planner_sem:
+                await asyncio.to_thread(_replan_on_spec_changes, state, project_path, config)
+
+            if _needs_phase_tasks(state):
+                async with self._planner_sem:
+                    tasks = await asyncio.to_thread(_generate_phase_tasks, state.current_phase, project_path, config, state)
+                if not tasks:
+                    self._notify(f"No tasks for phase {state.current_phase}. Advancing.", "info")
+                    state.advance_phase()
+                    continue
+                state.add_tasks(tasks)
+
+            lookahead = _lookahead_phase(state, config)
+            if lookahead:
+                async with self._planner_sem:
+                    state.add_tasks(await asyncio.to_thread(_generate_phase_tasks, lookahead, project_path, config, state))
+
+            await self._dispatch_phase()
+            if self.dispatcher.window_active():
+                log_event("slot_utilisation", self.dispatcher.window_stats(), project_path, phase=state.current_phase)
+            _check_stalled(state, config, project_path, notify_fn=self._send)
+
+            if state.phase_complete():
+                log_event("phase_advance", {"from": state.current_phase}, project_path, phase=state.current_phase)
+                self._notify(f"Phase complete: {state.current_phase}", "info")
+                state.advance_phase()
+
+                if state.current_phase == "design" and config.checkpoint_after_requirements:
+                    self._notify("Requirements phase complete. Review specs/requirements.md and resume.", "warning")
+                    _create_checkpoint(project_path)
+
+        self.dispatcher.close()
+        flush_caches()
+        log_run_complete(project_path, time.time() - run_start, self.dispatcher.total_stats())
+        self._notify("All phases complete. Project delivery finished.", "complete")
+        state.log_decision(
+            "Concurrent run complete",
+            "All phases passed gate checks. Review deliverables and run /validate-harness.",
+        )
+        await asyncio.gather(*self._background)
+
+    async def _dispatch_phase(self):
+        """Refill free slots whenever a worker exits or a task finishes merging."""
+        in_flight: set[asyncio.Task] = set()
+        while True:
+            self._changed.clear()
+            if not _checkpoint_exists(self.project_path):
+                for task in self.dispatcher.admit(self.state.get_ready_tasks(), self.state.tasks):
+                    w = self.dispatcher.make_worker(task)
+                    self.dispatcher.track(w)
+                    job = asyncio.create_task(self._run_worker(w))
+                    job.add_done_callback(lambda _: self._changed.set())
+                    in_flight.add(job)
+
+            done = {job for job in in_flight if job.done()}
+            for job in done:
+                job.result()  # task failures are handled inside the job; anything else ends the run
+            in_flight -= done
+            if not in_flight:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.dispatcher.wake_interval)
+            except asyncio.TimeoutError:
+                pass  # re-run admission so slot-count changes take effect
+
+    async def _run_worker(self, w: Worker):
+        task = w.task
+        self._notify(f"Dispatching: {task.id} ({task.title}) -> {task.role}", "info")
+        log_event("task_dispatch", {}, self.project_path, task_id=task.id, role=task.role, phase=task.phase, model=self.config.model)
+        try:
+            await asyncio.to_thread(w.prepare)
+            proc = await asyncio.create_subprocess_exec(
+                *w.command(),
+                cwd=w.worktree,
+                stdout=w.output_file,
+                stderr=subprocess.STDOUT,
+            )
+        except Exception as e:
+            w.finish()
+            self.dispatcher.release(w)
+            self.dispatcher.release_scope(w)
+            self._notify(f"Failed to start worker for {task.id}: {e}", "error")
+            log_event("task_fail", {"error": str(e)[:200]}, self.project_path, task_id=task.id, role=task.role, phase=task.phase)
+            self.state.mark_blocked(task, str(e))
+            return
+
+        w.pid = proc.pid
+        w.started_at = time.time()
+        self.state.mark_in_progress(task)
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=w.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            w.timed_out = True
+        w.finish()
+        self.dispatcher.release(w)
+        self._changed.set()
+
+        try:
+            await self._finish_worker(w)
+        except Exception as e:  # fail the task, not the run
+            await self._fail_unexpectedly(w, e)
+        finally:
+            self.dispatcher.release_scope(w)  # file scope is held until merged or failed
+            self._changed.set()
+
+    async def _finish_worker(self, w: Worker):
+        """Gate-check an exited worker, then merge it or hand it to failure handling."""
+        task, project_path, config = w.task, self.project_path, self.config
+        dur = w.duration
+        if w.timed_out:
+            error = f"Worker timed out after {w.timeout}s"
+            self._notify(f"Worker {task.id} failed: {error}", "error")
+            log_event("task_fail", {"error": error}, project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=dur)
+            await self._discard(w)
+            self.state.mark_blocked(task, error)
+            return
+
+        async with self._gate_sem:
+            gate_start = time.time()
+            log_event(
+                "gate_start",
+                {"exit_at": round(w.finished_at, 3), "gate_start_at": round(gate_start, 3), "queue_delay_s": round(gate_start - w.finished_at, 3)},
+                project_path, task_id=task.id, role=task.role, phase=task.phase,
+            )
+            result = await asyncio.to_thread(gate_check, task, w.output_path, config, project_path)
+        timing = {"gate_queue_s": round(gate_start - w.finished_at, 3), "gate_exec_s": round(time.time() - gate_start, 3)}
+
+        if not result.passed:
+            log_event("gate_fail", {"summary": result.summary, "missing": result.missing, **timing}, project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=dur, model=config.model)
+            self._notify(f"FAIL: {task.id} — {result.summary}", "warning")
+            await self._discard(w)
+            _handle_failure(task, result.summary, self.state, config, project_path, notify_fn=self._send)
+            return
+
+        log_event("gate_pass", {"summary": result.summary, **timing}, project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=dur, model=config.model)
+        enqueued = time.time()
+        rebases = 0
+        while True:
+            try:
+                await self._merge(w, enqueued)
+                break
+            except MergeConflict as mc:
+                if mc.paths and rebases < config.merge_rebase_attempts:
+                    rebases += 1
+                    mc = await asyncio.to_thread(rebase_and_recheck, mc, w.worktree, project_path, config)
+                    if mc is None:
+                        continue  # rebased cleanly: merge again
+                self._notify(f"Merge conflict on {task.id}: {mc.details[:200]}", "error")
+                log_event("task_fail", {"error": f"merge_conflict: {mc.details[:200]}"}, project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=dur)
+                if not _handle_conflict(w, mc, self.state, self.dispatcher, config, project_path, notify_fn=self._send):
+                    await self._discard(w)
+                return
+
+        self.state.mark_done(task)
+        log_event("task_complete", task_shape(task), project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=dur, model=config.model)
+        self.dispatcher.durations.record(task, dur)
+        self._notify(f"PASS + merged: {task.id}", "info")
+
+    async def _merge(self, w: Worker, enqueued: float):
+        """Merge ``w``'s branch into main behind the merge slot; raises MergeConflict."""
+        task, project_path = w.task, self.project_path
+        await self._predict_merge(task)  # in parallel with other branches, before waiting for the merge slot
+        async with self._merge_sem:
+            merge_start = time.time()
+            try:
+                await self._predict_merge(task)  # HEAD may have moved while waiting
+                await asyncio.to_thread(merge_branch, task, project_path, w.branch)
+                try:
+                    await asyncio.to_thread(cleanup_worktree, task, project_path, w.worktree, w.branch, pool=w.pool)
+                except Exception as e:  # merged all the same
+                    log_event("merge_cleanup_error", {"error": str(e)[:200]}, project_path, task_id=task.id, role=task.role, phase=task.phase)
+            finally:
+                log_event(
+                    "merge",
+                    {"queue_s": round(merge_start - enqueued, 3), "merge_s": round(time.time() - merge_start, 3)},
+                    project_path, task_id=task.id, role=task.role, phase=task.phase,
+                )
+
+    async def _fail_unexpectedly(self, w: Worker, error: Exception):
+        """Send a task whose gate or merge raised through failure handling, like a failed gate."""
+        task = w.task
+        if task.status == "done":  # merged; only the bookkeeping after it failed
+            return
+        message = f"{type(error).__name__}: {error}"
+        self._notify(f"Worker {task.id} failed: {message[:200]}", "error")
+        log_event("task_fail", {"error": message[:200]}, self.project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=w.duration)
+        try:
+            await self._discard(w)
+        except Exception:
+            pass  # the worktree is left for cleanup_all_worktrees
+        _handle_failure(task, message, self.state, self.config, self.project_path, notify_fn=self._send)
+
+    async def _discard(self, w: Worker):
+        """Remove a failed worker's worktree and unmerged branch (a pooled worktree is parked again)."""
+        await asyncio.to_thread(cleanup_worktree, w.task, self.project_path, w.worktree, w.branch, force=True, pool=w.pool)
+
+    async def _predict_merge(self, task):
+        """Raise MergeConflict, without touching the main checkout, if the branch would conflict with HEAD."""
+        if self._predictor is None:
+            return
+        predictions = await asyncio.to_thread(self._predictor.predict, [task_branch(task)])
+        prediction = predictions[task_branch(task)]
+        if not prediction.clean:
+            raise MergeConflict(task, describe(prediction), prediction.paths)
+
+    def _notify(self, message: str, level: str = "info"):
+        """Send a notification in the background without blocking the event loop."""
+        async def send():
+            async with self._notify_sem:
+                await asyncio.to_thread(notify, self.config, message, level)
+
+        job = asyncio.create_task(send())
+        self._background.add(job)
+        job.add_done_callback(self._background.discard)
+
+    def _send(self, config: Config, message: str, level: str = "info"):
+        """``notify``-compatible callable for shared handlers in orchestrator.py."""
+        self._notify(message, level)
+
+    def _on_control(self):
+        """inotify reader callback: wake the dispatch loop when the checkpoint comes or goes."""
+        if self.control.changed():
+            self._changed.set()
+
+    async def _wait_for_resume(self):
+        while self.control.paused:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.dispatcher.wake_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def run_async(project_path: str, config: Config):
+    """Entry point used by run.py for ``--engine async``."""
+    AsyncOrchestrator(project_path, config).run()
@@ -0,0 +1,111 @@
+"""Load-adaptive worker concurrency.
+
+Samples host load average, available memory and the resident memory of each
+running worker's process tree (from /proc) and moves the dispatcher's slot
+count between ``worker_floor`` and ``worker_ceiling``: one slot down when the
+host is overloaded, one slot up when it is clearly idle. Hosts without /proc
+only use the load average.
+"""
+
+import os
+import time
+from typing import Optional
+
+from config import Config
+from telemetry import log_event
+
+
+class AdaptiveConcurrency:
+    """Recomputes the effective slot count at most once per ``concurrency_sample_s``."""
+
+    def __init__(self, config: Config, project_path: str):
+        self.config = config
+        self.project_path = project_path
+        self.floor = max(1, config.worker_floor)
+        self.ceiling = max(self.floor, config.worker_ceiling or config.max_workers)
+        self._cpus = os.cpu_count() or 1
+        self._last_sample = 0.0
+
+    def adjust(self, current: int, worker_pids: list[int]) -> int:
+        """Return the new slot count given the current one and the running worker PIDs."""
+        now = time.time()
+        if now - self._last_sample < self.config.concurrency_sample_s:
+            return current
+        self._last_sample = now
+
+        sample = self.sample(worker_pids)
+        target = current
+        reason = ""
+        if sample["load_per_cpu"] > self.config.load_per_cpu_high:
+            target, reason = current - 1, "load_high"
+        elif sample["mem_available_mb"] is not None and sample["mem_available_mb"] < self.config.min_free_mem_mb:
+            target, reason = current - 1, "memory_low"
+        elif (
+            sample["load_per_cpu"] < self.config.load_per_cpu_low
+            and _has_room_for_worker(sample, self.config.min_free_mem_mb)
+            and len(worker_pids) >= current
+        ):
+            target, reason = current + 1, "idle_capacity"
+
+        target = min(self.ceiling, max(self.floor, target))
+        if target != current:
+            log_event("concurrency_adjust", {"from": current, "to": target, "reason": reason, **sample}, self.project_path)
+        return target
+
+    def sample(self, worker_pids: list[int]) -> dict:
+        load_1m = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+        rss = _tree_rss_mb(worker_pids) if worker_pids else []
+        return {
+            "load_1m": round(load_1m, 2),
+            "load_per_cpu": round(load_1m / self._cpus, 2),
+            "mem_available_mb": _mem_available_mb(),
+            "worker_rss_mb": round(max(rss), 1) if rss else 0.0,
+            "workers_rss_total_mb": round(sum(rss), 1),
+        }
+
+
+def _has_room_for_worker(sample: dict, min_free_mb: int) -> bool:
+    """Adding a worker must keep available memory above the floor (by the largest worker's RSS)."""
+    if sample["mem_available_mb"] is None:
+        return True
+    return sample["mem_available_mb"] - sample["worker_rss_mb"] > min_free_mb
+
+
+def _mem_available_mb() -> Optional[float]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _tree_rss_mb(root_pids: list[int]) -> list[float]:
+    """Resident memory of each root PID plus all its descendants (claude, test runners, ...)."""
+    children: dict[int, list[int]] = {}
+    rss_kb: dict[int, int] = {}
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return [0.0 for _ in root_pids]
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields.get("PPid", "0").strip() or 0), []).append(pid)
+        rss_kb[pid] = int(fields.get("VmRSS", "0 kB").split()[0])
+
+    totals = []
+    for root in root_pids:
+        total, stack = 0, [root]
+        while stack:
+            pid = stack.pop()
+            total += rss_kb.get(pid, 0)
+            stack.extend(children.get(pid, []))
+        totals.append(total / 1024)
+    return totals
@@ -12,12 +12,56 @@ class Config:
     model: str = "claude-sonnet-4-20250514"
     gate_model: Optional[str] = None
     max_workers: int = 3
+    adaptive_concurrency: bool = False
+    worker_floor: int = 1
+    worker_ceiling: int = 0  # 0 = max_workers
+    concurrency_sample_s: int = 30
+    load_per_cpu_high: float = 1.5
+    load_per_cpu_low: float = 0.7
+    min_free_mem_mb: int = 2048
     max_retries: int = 2
+    scheduler_aging_factor: float = 1.0
+    role_limits: dict[str, int] = field(default_factory=dict)
+    resource_tokens: dict[str, int] = field(default_factory=dict)
+    scope_exclusive: bool = False
+    scope_shared_paths: list[str] = field(default_factory=list)
     checkpoint_after_requirements: bool = True
     notification_webhook: str = ""
     worker_timeout: int = 3600
+    duration_min_samples: int = 3
+    duration_timeout_factor: float = 3.0
+    hedge_enabled: bool = False
+    hedge_percentile: float = 90
+    hedge_min_samples: int = 5
     gate_timeout: int = 120
+    judge_backend: str = "cli"  # cli | http
+    judge_url: str = "https://api.anthropic.com"
+    judge_api_key_env: str = "ANTHROPIC_API_KEY"
+    judge_concurrency: int = 4
+    judge_max_retries: int = 3
+    gate_concurrency: int = 3
+    gate_cache_size: int = 0  # 0 = no gate cache
+    gate_batch_window_s: float = 0.0  # 0 = judge each gate on its own
+    gate_batch_max: int = 8
+    pre_gate_builtin: bool = False  # apply PRE_GATE_RULES to phases not in pre_gate_rules
+    pre_gate_rules: dict[str, list[dict]] = field(default_factory=dict)
+    merge_queue_size: int = 8
+    merge_predict: bool = False
+    merge_predict_workers: int = 4
+    worktree_pool_size: int = 0  # 0 = every worker adds its own worktree
+    sparse_worktrees: bool = False
+    sparse_always_include: list[str] = field(default_factory=list)
+    merge_batch_max: int = 1  # 1 = merge branches one at a time
+    merge_batch_window_s: float = 0.0
+    merge_rebase_attempts: int = 0  # 0 = report conflicts without rebasing
+    conflict_resolution: bool = False
+    notify_concurrency: int = 4
     skip_phases: list[str] = field(default_factory=list)
+    pipelined_phases: bool = False
+    planner_cache: bool = False
+    planner_map_reduce_chars: int = 0  # 0 = always plan all specs in one call
+    planner_concurrency: int = 4
+    incremental_replan: bool = False
     role_overrides: dict[str, str] = field(default_factory=dict)
     project_name: str = ""
 
@@ -0,0 +1,117 @@
+"""Cheap-first handling of merge conflicts on a worker's branch.
+
+When a branch conflicts with main, the merge queue first rebases it onto the
+current main inside the worker's own worktree and, if that succeeds and the
+phase's pre-gate rules (pregate.py) still hold, queues it again — seconds of
+git work instead of a new worker. Only when the rebase itself conflicts does
+the orchestrator escalate: the same task is re-dispatched into its existing
+worktree, with main merged in (``git merge --no-commit``) and the conflict
+hunks in its prompt, so the resolution worker keeps the task's scope,
+dependencies and required reads and only has to fix the markers.
+"""
+
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from config import Config
+from merge import MergeConflict
+from pregate import check as pre_gate_check
+from state import Task
+from telemetry import log_event
+
+MAX_HUNKS_CHARS = 12000
+
+
+@dataclass
+class Rebase:
+    ok: bool
+    paths: list[str] = field(default_factory=list)  # conflicted paths when not ok
+    error: str = ""
+
+
+@dataclass
+class Resolution:
+    base: str  # main commit merged into the branch
+    paths: list[str]
+    hunks: str  # ``git diff`` of the conflicted files, markers included
+
+
+def main_head(project_path: str) -> Optional[str]:
+    result = _git(project_path, "rev-parse", "HEAD")
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def rebase_onto_main(project_path: str, worktree: str) -> Rebase:
+    """Rebase the branch checked out in ``worktree`` onto main's HEAD; aborted again on conflict."""
+    base = main_head(project_path)
+    if base is None:
+        return Rebase(False, error="cannot resolve main HEAD")
+    result = _git(worktree, "rebase", "--autostash", base)
+    if result.returncode == 0:
+        return Rebase(True)
+    paths = _conflicted(worktree)
+    _git(worktree, "rebase", "--abort")
+    return Rebase(False, paths, (result.stderr or result.stdout).strip()[-500:])
+
+
+def rebase_and_recheck(conflict: MergeConflict, worktree: str, project_path: str, config: Config) -> Optional[MergeConflict]:
+    """Rebase a conflicting branch and re-run only the pre-gate rules.
+
+    Returns None when the branch is ready to merge again, else the conflict to
+    escalate (with the paths the rebase stopped on).
+    """
+    task = conflict.task
+    if not os.path.isdir(worktree):
+        return conflict
+    started = time.time()
+    rebase = rebase_onto_main(project_path, worktree)
+    violations = pre_gate_check(task.phase, worktree, config.pre_gate_rules, config.gate_timeout, config.pre_gate_builtin) if rebase.ok else []
+    log_event(
+        "merge_rebase",
+        {"result": "conflict" if not rebase.ok else "pre_gate_fail" if violations else "rebased", "paths": rebase.paths or conflict.paths, "violations": violations},
+        project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=time.time() - started,
+    )
+    if not rebase.ok:
+        return MergeConflict(task, f"{conflict.details}\nAutomatic rebase onto main failed: {rebase.error}", rebase.paths or conflict.paths)
+    if violations:
+        return MergeConflict(task, f"Rebased onto main but pre-gate checks fail: {'; '.join(violations)}", conflict.paths)
+    return None
+
+
+def merge_main(project_path: str, worktree: str) -> Resolution:
+    """Merge main into the worktree's branch without committing, leaving conflict markers for a worker."""
+    base = main_head(project_path) or "HEAD"
+    _git(worktree, "merge", "--no-commit", "--no-ff", base)
+    paths = _conflicted(worktree)
+    hunks = _git(worktree, "diff", "--", *paths).stdout if paths else ""
+    if len(hunks) > MAX_HUNKS_CHARS:
+        hunks = hunks[:MAX_HUNKS_CHARS] + "\n...(truncated — run `git diff` for the rest)"
+    return Resolution(base, paths, hunks)
+
+
+def resolution_prompt(task: Task, resolution: Resolution) -> str:
+    """Prompt section telling a resolution worker what to fix."""
+    if not resolution.paths:
+        return (
+            f"\n## Merge In Progress\nMain ({resolution.base[:12]}) has been merged into this branch without conflicts. "
+            f"Check that {task.id} still meets its acceptance criteria, then commit to conclude the merge."
+        )
+    return "\n".join([
+        "\n## Merge Conflict Resolution",
+        f"Your branch for {task.id} conflicted with main. Main ({resolution.base[:12]}) is now being merged into it",
+        f"and these files contain conflict markers: {', '.join(resolution.paths)}",
+        "Resolve every conflict keeping both main's changes and the intent of this task, run the relevant tests,",
+        "then `git add` the files and `git commit` to conclude the merge. Do not redo work that is not in conflict.",
+        f"\n```diff\n{resolution.hunks}\n```",
+    ])
+
+
+def _conflicted(worktree: str) -> list[str]:
+    return [p for p in _git(worktree, "diff", "--name-only", "--diff-filter=U").stdout.splitlines() if p]
+
+
+def _git(cwd: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
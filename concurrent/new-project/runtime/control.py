@@ -0,0 +1,104 @@
+"""Checkpoint control channel: pause and resume signalling through runtime/.checkpoint.
+
+On Linux the runtime/ directory is watched with inotify, so creating or
+removing the checkpoint wakes the orchestrator at once (the inotify fd is
+registered with the reaper's selector alongside the worker pidfds). Elsewhere
+the checkpoint file is polled every ``poll_interval`` seconds.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import Optional
+
+CHECKPOINT_NAME = ".checkpoint"
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+
+
+class CheckpointWatch:
+    """Tracks whether the run is paused and wakes waiters when that changes."""
+
+    def __init__(self, project_path: str, poll_interval: float = 1.0):
+        self.runtime_dir = os.path.join(project_path, "runtime")
+        self.path = os.path.join(self.runtime_dir, CHECKPOINT_NAME)
+        self.poll_interval = poll_interval
+        os.makedirs(self.runtime_dir, exist_ok=True)
+        self._fd = _inotify_watch(self.runtime_dir)
+        self._last = self.paused
+
+    @property
+    def paused(self) -> bool:
+        return os.path.exists(self.path)
+
+    def fileno(self) -> Optional[int]:
+        """The inotify fd to select on, or None when polling."""
+        return self._fd
+
+    def changed(self) -> bool:
+        """Non-blocking: True if the checkpoint appeared or disappeared since the last call."""
+        if self._fd is not None:
+            _drain(self._fd)
+        paused = self.paused
+        flipped, self._last = paused != self._last, paused
+        return flipped
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the checkpoint state changes or ``timeout`` elapses."""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.changed():
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self._fd is not None:
+                select.select([self._fd], [], [], remaining)
+            else:
+                time.sleep(self.poll_interval if remaining is None else min(remaining, self.poll_interval))
+        return True
+
+    def wait_for_resume(self):
+        """Block until the checkpoint is removed (by --resume or manual deletion)."""
+        while self.paused:
+            self.wait()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _inotify_watch(directory: str) -> Optional[int]:
+    """Return a non-blocking inotify fd watching ``directory`` for entries coming and going."""
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    mask = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+    if add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _drain(fd: int):
+    """Consume pending inotify events (state is re-read from the filesystem)."""
+    while True:
+        try:
+            if not os.read(fd, 4096):
+                return
+        except BlockingIOError:
+            return
@@ -0,0 +1,299 @@
+"""Slot-based worker dispatch for the concurrent orchestrator.
+
+The dispatcher owns the pool of worker slots. Instead of starting a batch and
+waiting for every worker in it, the orchestrator asks the dispatcher which
+ready tasks may start, starts them, and is handed back each worker as soon as
+it exits so the freed slot can be refilled immediately.
+"""
+
+import time
+from typing import Optional
+
+from concurrency import AdaptiveConcurrency
+from config import Config
+from control import CheckpointWatch
+from durations import DurationModel
+from reaper import Reaper
+from scheduler import Scheduler
+from scope_index import ScopeIndex
+from state import Task
+from telemetry import log_event
+from worker import Worker
+from worktree_pool import WorktreePool
+
+
+class Dispatcher:
+    """Tracks running workers and slot utilisation for one orchestrator run."""
+
+    def __init__(self, config: Config, project_path: str, control: Optional[CheckpointWatch] = None):
+        self.config = config
+        self.project_path = project_path
+        self.control = control
+        self.capacity = max(1, config.max_workers)
+        self.controller: Optional[AdaptiveConcurrency] = None
+        if config.adaptive_concurrency:
+            self.controller = AdaptiveConcurrency(config, project_path)
+            self.capacity = min(self.controller.ceiling, max(self.controller.floor, self.capacity))
+        self.running: dict[str, Worker] = {}
+        self._reaper = Reaper()
+        self._wake_sources = []
+        if control is not None:
+            self.add_wake_source(control)
+        self.durations = DurationModel(project_path, config)
+        self.scheduler = Scheduler(config, self.durations.estimate)
+        self.scopes = ScopeIndex(config.scope_shared_paths)
+        self._claims: dict[str, Task] = {}  # worker key -> task whose file scope it holds until merged or dropped
+        self._waiting_since: dict[tuple[str, str], float] = {}
+        self._resolving: dict[str, tuple[str, str]] = {}  # task id -> (variant, worktree) holding the conflicting branch
+        self.worktrees = WorktreePool(project_path, config.worktree_pool_size) if config.worktree_pool_size > 0 else None
+        self._last_tick = time.time()
+        self._total = _new_window()
+        self._window = _new_window()
+
+    def free_slots(self) -> int:
+        return max(0, self.capacity - len(self.running))
+
+    def admit(self, ready: list[Task], all_tasks: Optional[list[Task]] = None) -> list[Task]:
+        """Return the ready tasks that may start now, most critical first.
+
+        ``all_tasks`` is the full board; it lets the scheduler see dependents
+        that are not ready yet when computing critical paths.
+        """
+        self.adapt()
+        in_flight_ids = {w.task.id for w in self.running.values()}
+        candidates = [t for t in ready if t.id not in in_flight_ids]
+        in_flight = [w.task for w in self.running.values()]
+        admitted: list[Task] = []
+        now = time.time()
+        try:
+            for task in self.scheduler.order(candidates, all_tasks):
+                if len(admitted) >= self.free_slots():
+                    break
+                busy = self._busy_limits(task, in_flight + admitted)
+                if busy:
+                    self._record_held(task, busy, now)
+                    continue
+                self._record_waits(task, now)
+                admitted.append(task)
+                self.scopes.add(task.id, task.file_scope)  # claimed until this round ends
+        finally:
+            for task in admitted:
+                self.scopes.remove(task.id, task.file_scope)
+        return admitted
+
+    def can_start_copy(self, task: Task) -> bool:
+        """Whether a second copy of running ``task`` fits its role cap, resource tokens and file scope."""
+        return not self._busy_limits(task, [w.task for w in self.running.values()])
+
+    def _busy_limits(self, task: Task, in_flight: list[Task]) -> list[str]:
+        """Names of the role cap / resource tokens that keep ``task`` from starting now."""
+        busy = []
+        role_limit = self.config.role_limits.get(task.role)
+        if role_limit is not None:
+            if sum(1 for t in in_flight if t.role == task.role) >= max(1, role_limit):
+                busy.append(f"role:{task.role}")
+        for token in task.resources:
+            capacity = max(1, self.config.resource_tokens.get(token, 1))
+            if sum(1 for t in in_flight if token in t.resources) >= capacity:
+                busy.append(token)
+        if self.config.scope_exclusive:
+            busy.extend(f"scope:{other}" for other in sorted(self.scopes.overlapping(task.file_scope, exclude=task.id)))
+        return busy
+
+    def _record_held(self, task: Task, busy: list[str], now: float):
+        """Start the wait clock for each limit holding ``task`` back; log newly avoided scope overlaps."""
+        for limit in busy:
+            if limit.startswith("scope:") and (task.id, limit) not in self._waiting_since:
+                other = limit[len("scope:"):]
+                log_event(
+                    "scope_conflict_avoided",
+                    {"in_flight": other, "paths": self.scopes.overlapping(task.file_scope, exclude=task.id).get(other, [])},
+                    self.project_path, task_id=task.id, role=task.role, phase=task.phase,
+                )
+            self._waiting_since.setdefault((task.id, limit), now)
+
+    def _record_waits(self, task: Task, now: float):
+        """Log how long ``task`` waited on each token, role cap or overlapping scope before admission."""
+        for key in [k for k in self._waiting_since if k[0] == task.id]:
+            waited = now - self._waiting_since.pop(key)
+            log_event(
+                "resource_wait", {"resource": key[1], "wait_s": round(waited, 2)},
+                self.project_path, task_id=task.id, role=task.role, phase=task.phase,
+            )
+
+    def start(self, task: Task, variant: str = "") -> Worker:
+        """Start a worker for ``task`` and occupy a slot with it.
+
+        ``variant`` starts an extra copy of a task that is already running
+        (see hedging.py) on its own worktree and branch.
+        """
+        w = self.make_worker(task, variant)
+        w.start()
+        self.track(w)
+        self._reaper.add(w)
+        return w
+
+    def make_worker(self, task: Task, variant: str = "") -> Worker:
+        """A Worker for ``task``; after ``resolve_in_place`` it reuses the conflicting worktree."""
+        if not variant and task.id in self._resolving:
+            variant, worktree = self._resolving.pop(task.id)
+            return Worker(task, self.config, self.project_path, variant, resolve=True, worktree=worktree, pool=self.worktrees)
+        return Worker(task, self.config, self.project_path, variant=variant, pool=self.worktrees)
+
+    def resolve_in_place(self, worker: Worker):
+        """Run ``worker``'s task again in its own worktree to resolve a merge conflict."""
+        self._resolving[worker.task.id] = (worker.variant, worker.worktree)
+
+    def track(self, worker: Worker):
+        """Occupy a slot with ``worker`` (engines that spawn processes themselves call this directly)."""
+        self._tick()
+        if worker.default_timeout is None:
+            worker.default_timeout = self.durations.default_timeout(worker.task)
+        self.running[worker.key] = worker
+        if worker.key not in self._claims:
+            self._claims[worker.key] = worker.task
+            self.scopes.add(worker.task.id, worker.task.file_scope)
+        for window in (self._total, self._window):
+            window["dispatched"] += 1
+            window["peak_in_flight"] = max(window["peak_in_flight"], len(self.running))
+
+    def release(self, worker: Worker):
+        self._tick()
+        self.running.pop(worker.key, None)
+        self._reaper.remove(worker)
+
+    def release_scope(self, worker: Worker):
+        """Drop ``worker``'s file-scope claim once its branch is merged, discarded or failed.
+
+        The claim outlives the process: while the branch waits for its gate
+        and merge, an overlapping task would branch from a HEAD without it.
+        """
+        task = self._claims.pop(worker.key, None)
+        if task is not None:
+            self.scopes.remove(task.id, task.file_scope)
+
+    def siblings(self, worker: Worker) -> list[Worker]:
+        """Other running copies of ``worker``'s task (hedged execution)."""
+        return [w for w in self.running.values() if w.task.id == worker.task.id and w is not worker]
+
+    def cancel(self, worker: Worker):
+        """Kill a running worker and free its slot."""
+        worker.kill()
+        self.release(worker)
+
+    def add_wake_source(self, source):
+        """End ``wait_any`` early when ``source`` signals.
+
+        ``source`` provides ``fileno()`` (None if it can only be polled) and a
+        non-blocking ``changed()``; see control.CheckpointWatch and
+        gate_pool.GatePool.
+        """
+        self._wake_sources.append(source)
+        if source.fileno() is not None:
+            self._reaper.add_wakeup(source.fileno())
+
+    @property
+    def wake_interval(self) -> Optional[float]:
+        """How often a waiting engine should re-run admission (None = only on events)."""
+        intervals = []
+        if self.controller is not None:
+            intervals.append(self.config.concurrency_sample_s)
+        if self.control is not None and self.control.fileno() is None:
+            intervals.append(self.control.poll_interval)  # no inotify: poll the checkpoint
+        return min(intervals) if intervals else None
+
+    def adapt(self):
+        """Let the adaptive controller (if enabled) move the slot count."""
+        if self.controller is None:
+            return
+        pids = [w.pid for w in self.running.values() if w.pid]
+        target = self.controller.adjust(self.capacity, pids)
+        if target != self.capacity:
+            self._tick()
+            self.capacity = target
+
+    def wait_any(self, timeout: Optional[float] = None) -> list[Worker]:
+        """Block until at least one running worker exits; return exited workers in exit order.
+
+        Returns an empty list if ``timeout`` elapses first, or early when the
+        adaptive controller opens a new slot or a wake source (the checkpoint
+        watch, gate verdicts) signals, so the caller can act on it.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.running:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            step = remaining
+            if self.wake_interval is not None:
+                step = self.wake_interval if step is None else min(step, self.wake_interval)
+            finished = self._reaper.wait(step)
+            if finished:
+                for w in finished:
+                    self.release(w)
+                return finished
+            if [source for source in self._wake_sources if source.changed()]:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+            if self.controller is not None:
+                self.adapt()
+                if self.free_slots():
+                    break
+        return []
+
+    def window_stats(self) -> dict:
+        """Return utilisation since the previous call and start a new window."""
+        self._tick()
+        stats = _summarise(self._window, self.capacity)
+        self._window = _new_window()
+        if self.worktrees is not None:
+            stats["worktree_pool"] = self.worktrees.stats()
+        return stats
+
+    def window_active(self) -> bool:
+        """Whether a worker was dispatched or running since the window started."""
+        self._tick()
+        return bool(self._window["dispatched"] or self._window["busy_slot_s"])
+
+    def total_stats(self) -> dict:
+        self._tick()
+        stats = _summarise(self._total, self.capacity)
+        if self.worktrees is not None:
+            stats["worktree_pool"] = self.worktrees.stats()
+        return stats
+
+    def close(self):
+        """Remove the idle pooled worktrees at the end of a run."""
+        if self.worktrees is not None:
+            self.worktrees.close()
+
+    def _tick(self):
+        """Accumulate busy and available slot-seconds since the last state change."""
+        now = time.time()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+        for window in (self._total, self._window):
+            window["wall_s"] += elapsed
+            window["busy_slot_s"] += elapsed * len(self.running)
+            window["capacity_slot_s"] += elapsed * self.capacity
+
+
+def _new_window() -> dict:
+    return {
+        "wall_s": 0.0,
+        "busy_slot_s": 0.0,
+        "capacity_slot_s": 0.0,
+        "dispatched": 0,
+        "peak_in_flight": 0,
+    }
+
+
+def _summarise(window: dict, capacity: int) -> dict:
+    capacity_s = window["capacity_slot_s"]
+    return {
+        "slots": capacity,
+        "wall_s": round(window["wall_s"], 2),
+        "busy_slot_s": round(window["busy_slot_s"], 2),
+        "slot_utilisation": round(window["busy_slot_s"] / capacity_s, 3) if capacity_s else 0.0,
+        "dispatched": window["dispatched"],
+        "peak_in_flight": window["peak_in_flight"],
+    }
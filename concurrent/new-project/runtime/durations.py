@@ -0,0 +1,181 @@
+"""Task duration estimates learned from past runs.
+
+Indexes the ``task_complete`` events in logs/runs.jsonl by role, phase,
+model, acceptance-criteria length and file-scope size, and answers percentile
+queries (p50/p90) for a task. Predictions fall back to coarser keys (role +
+phase + model, role + phase, role) until one has enough samples.
+
+Durations are kept as log-spaced histograms in a compact summary,
+logs/durations.json, together with the byte offset of runs.jsonl it covers,
+so each start only parses events appended since the previous one.
+"""
+
+import json
+import math
+import os
+from typing import Optional
+
+from config import Config
+from state import Task
+
+SUMMARY_VERSION = 1
+BUCKET_RATIO = 1.1  # histogram resolution: predictions are within ~5%
+MIN_DURATION_S = 0.1
+MIN_DERIVED_TIMEOUT_S = 300
+
+
+class DurationModel:
+    """Percentile duration predictions per task shape, kept in sync with runs.jsonl."""
+
+    def __init__(self, project_path: str, config: Config):
+        self.config = config
+        self.log_path = os.path.join(project_path, "logs", "runs.jsonl")
+        self.summary_path = os.path.join(project_path, "logs", "durations.json")
+        self._offset = 0
+        self._histograms: dict[str, dict[int, int]] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Fold events appended to runs.jsonl since the last summary into the model."""
+        self._load_summary()
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        if size < self._offset:  # log was truncated or replaced: rebuild
+            self._offset, self._histograms = 0, {}
+        if size == self._offset:
+            return
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        complete = chunk.rfind(b"\n") + 1  # leave a partially written last line for next time
+        for line in chunk[:complete].splitlines():
+            try:
+                event = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if event.get("event") == "task_complete" and event.get("duration_s"):
+                self._add(_event_keys(event), float(event["duration_s"]))
+        self._offset += complete
+        self._save_summary()
+
+    def record(self, task: Task, duration_s: float, model: str = ""):
+        """Add a duration observed in this run (persisted via runs.jsonl on the next start)."""
+        self._add(_task_keys(task, model or self.config.model), duration_s)
+
+    def predict(self, task: Task, pct: float, min_samples: Optional[int] = None) -> Optional[float]:
+        """``pct`` percentile duration in seconds for ``task``, or None without enough history."""
+        needed = max(1, self.config.duration_min_samples if min_samples is None else min_samples)
+        for key in _task_keys(task, self.config.model):
+            hist = self._histograms.get(key)
+            if hist and sum(hist.values()) >= needed:
+                return _hist_percentile(hist, pct)
+        return None
+
+    def p50(self, task: Task) -> Optional[float]:
+        return self.predict(task, 50)
+
+    def p90(self, task: Task) -> Optional[float]:
+        return self.predict(task, 90)
+
+    def estimate(self, task: Task) -> Optional[float]:
+        """Scheduler estimator: the median duration."""
+        return self.p50(task)
+
+    def default_timeout(self, task: Task) -> Optional[int]:
+        """Timeout for a task without its own: p90 times ``duration_timeout_factor``, capped at ``worker_timeout``."""
+        if task.timeout > 0 or self.config.duration_timeout_factor <= 0:
+            return None
+        p90 = self.p90(task)
+        if p90 is None:
+            return None
+        derived = max(MIN_DERIVED_TIMEOUT_S, p90 * self.config.duration_timeout_factor)
+        return int(min(self.config.worker_timeout, derived))
+
+    def _add(self, keys: list[str], duration_s: float):
+        bucket = _bucket(duration_s)
+        for key in keys:
+            hist = self._histograms.setdefault(key, {})
+            hist[bucket] = hist.get(bucket, 0) + 1
+
+    def _load_summary(self):
+        try:
+            with open(self.summary_path) as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if raw.get("version") != SUMMARY_VERSION:
+            return
+        self._offset = int(raw.get("offset", 0))
+        self._histograms = {
+            key: {int(b): n for b, n in hist.items()}
+            for key, hist in raw.get("histograms", {}).items()
+        }
+
+    def _save_summary(self):
+        os.makedirs(os.path.dirname(self.summary_path), exist_ok=True)
+        tmp = self.summary_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": SUMMARY_VERSION, "offset": self._offset, "histograms": self._histograms}, f)
+        os.replace(tmp, self.summary_path)
+
+
+def task_shape(task: Task) -> dict:
+    """Fields logged with ``task_complete`` so later runs can index the task's shape."""
+    return {"acceptance_len": len(task.acceptance), "scope_size": len(task.file_scope)}
+
+
+def _task_keys(task: Task, model: str) -> list[str]:
+    return _keys(task.role, task.phase, model, len(task.acceptance), len(task.file_scope))
+
+
+def _event_keys(event: dict) -> list[str]:
+    keys = _keys(
+        event.get("role", ""), event.get("phase", ""), event.get("model", ""),
+        event.get("acceptance_len"), event.get("scope_size"),
+    )
+    if not event.get("model"):
+        keys = keys[2:]  # older events carry no model: only the role/phase levels apply
+    elif event.get("acceptance_len") is None or event.get("scope_size") is None:
+        keys = keys[1:]
+    return keys
+
+
+def _keys(role: str, phase: str, model: str, acceptance_len, scope_size) -> list[str]:
+    """Most specific first: full shape, role+phase+model, role+phase, role."""
+    return [
+        f"{role}|{phase}|{model}|{_acceptance_bucket(acceptance_len or 0)}|{_scope_bucket(scope_size or 0)}",
+        f"{role}|{phase}|{model}",
+        f"{role}|{phase}",
+        role,
+    ]
+
+
+def _acceptance_bucket(length: int) -> str:
+    if length < 200:
+        return "short"
+    return "medium" if length < 800 else "long"
+
+
+def _scope_bucket(size: int) -> str:
+    if size <= 2:
+        return str(size)
+    return "3-5" if size <= 5 else "6+"
+
+
+def _bucket(duration_s: float) -> int:
+    return math.floor(math.log(max(MIN_DURATION_S, duration_s)) / math.log(BUCKET_RATIO))
+
+
+def _hist_percentile(hist: dict[int, int], pct: float) -> float:
+    """Nearest-rank percentile, reported as the geometric midpoint of its bucket."""
+    total = sum(hist.values())
+    rank = max(1, math.ceil(min(100.0, max(0.0, pct)) / 100 * total))
+    seen = 0
+    for bucket in sorted(hist):
+        seen += hist[bucket]
+        if seen >= rank:
+            return round(BUCKET_RATIO ** (bucket + 0.5), 2)
+    return round(BUCKET_RATIO ** (max(hist) + 0.5), 2)
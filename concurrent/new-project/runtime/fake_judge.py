@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Messages API, for testing and benchmarking the HTTP judge.
+
+Usage:
+    python runtime/fake_judge.py --port 8765 --latency 0.2
+    # then in config.yaml: judge_backend: http, judge_url: http://127.0.0.1:8765
+
+Every request to ``/v1/messages`` gets a passing gate verdict after
+``latency`` seconds, unless the prompt contains ``FAKE-JUDGE-FAIL``. A batched
+gate prompt (gates.py, one ``=== Task i of n: title (id) ===`` section per
+task) gets a JSON array with one verdict per task, failing only the tasks
+whose section contains the marker. The
+first responses can be forced to error statuses (``--errors 429,503``) to
+exercise retries. The server speaks HTTP/1.1 keep-alive and counts the
+requests and TCP connections it has served.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAIL_MARKER = "FAKE-JUDGE-FAIL"
+_BATCH_TASK = re.compile(r"^=== Task \d+ of \d+: .* \((\S+)\) ===$", re.MULTILINE)
+
+
+class FakeJudgeServer:
+    """Threaded fake judge on 127.0.0.1; usable as a context manager."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, errors: tuple[int, ...] = ()):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._errors = list(errors)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-judge", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeJudgeServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeJudgeServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, body: dict) -> tuple[int, dict]:
+        with self._lock:
+            self.requests += 1
+            status = self._errors.pop(0) if self._errors else 200
+        if self.latency:
+            time.sleep(self.latency)
+        if status != 200:
+            return status, {"type": "error", "error": {"type": "overloaded_error", "message": "fake judge error"}}
+        prompt = "".join(
+            m["content"] if isinstance(m.get("content"), str) else json.dumps(m.get("content"))
+            for m in body.get("messages", [])
+        )
+        sections = _BATCH_TASK.split(prompt)[1:]  # [id, section, id, section, ...]
+        if sections:
+            reply = [{"task_id": task_id, **_verdict(section)} for task_id, section in zip(sections[::2], sections[1::2])]
+        else:
+            reply = _verdict(prompt)
+        return 200, {
+            "id": f"msg_fake_{self.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": [{"type": "text", "text": json.dumps(reply)}],
+            "stop_reason": "end_turn",
+        }
+
+
+def _verdict(prompt: str) -> dict:
+    passed = FAIL_MARKER not in prompt
+    return {
+        "passed": passed,
+        "summary": "fake judge: criteria met" if passed else "fake judge: failure requested",
+        "evidence": "",
+        "missing": [] if passed else ["fake failure"],
+    }
+
+
+def _handler(server: FakeJudgeServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connections += 1
+
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                body = {}
+            if self.path != "/v1/messages":
+                status, payload = 404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}}
+            else:
+                status, payload = server._respond(body)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            if status == 429:
+                self.send_header("retry-after", "0")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake gate judge (Messages API stand-in)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each reply")
+    parser.add_argument("--errors", default="", help="Comma-separated statuses returned before the first success")
+    args = parser.parse_args()
+
+    errors = tuple(int(s) for s in args.errors.split(",") if s.strip())
+    server = FakeJudgeServer(args.port, args.latency, errors).start()
+    print(f"Fake judge listening on {server.url} (latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Coalescing of gate checks that arrive close together into one judge call.
+
+Gate threads (gate_pool.py, or the async engine's ``to_thread`` calls) hand
+their request to ``GateBatcher.judge`` with a batch key. The first request
+for a key waits up to ``window_s`` for others with the same key (or until
+``max_size`` have joined), then judges the whole batch in one call on its own
+thread while the others wait for their share. Requests the batch call could
+not answer are judged one by one, so a malformed batch reply costs extra
+calls but never a wrong verdict.
+"""
+
+import threading
+import time
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+Request = TypeVar("Request")
+Result = TypeVar("Result")
+
+
+class _Slot(Generic[Request, Result]):
+    def __init__(self, request: Request):
+        self.request = request
+        self.result: Optional[Result] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class GateBatcher(Generic[Request, Result]):
+    """Groups concurrent requests by key and judges each group with one batch call."""
+
+    def __init__(
+        self,
+        window_s: float,
+        max_size: int,
+        judge_batch: Callable[[list[Request]], list[Optional[Result]]],
+        judge_one: Callable[[Request], Result],
+    ):
+        self.window_s = window_s
+        self.max_size = max(1, max_size)
+        self._judge_batch = judge_batch
+        self._judge_one = judge_one
+        self._open: dict[Hashable, list[_Slot]] = {}
+        self._cond = threading.Condition()
+
+    def judge(self, key: Hashable, request: Request) -> Result:
+        """Judge ``request``, batched with any others submitted under ``key`` within the window."""
+        slot = _Slot(request)
+        with self._cond:
+            batch = self._open.setdefault(key, [])
+            batch.append(slot)
+            leader = len(batch) == 1
+            if len(batch) >= self.max_size:
+                del self._open[key]  # full: close it so the leader runs now
+                self._cond.notify_all()
+
+        if leader:
+            deadline = time.time() + self.window_s
+            with self._cond:
+                while self._open.get(key) is batch and time.time() < deadline:
+                    self._cond.wait(deadline - time.time())
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._run(batch)
+        else:
+            slot.done.wait()
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _run(self, batch: list[_Slot]):
+        try:
+            if len(batch) == 1:
+                results: list[Optional[Result]] = [None]
+            else:
+                results = self._judge_batch([s.request for s in batch])
+            for slot, result in zip(batch, results):
+                slot.result = result if result is not None else self._judge_one(slot.request)
+        except BaseException as e:  # every waiter must be released, with the error
+            for slot in batch:
+                if slot.result is None:
+                    slot.error = e
+        finally:
+            for slot in batch:
+                slot.done.set()
@@ -0,0 +1,113 @@
+"""Persistent cache of gate verdicts keyed by what the judge is shown.
+
+A verdict is stored under a SHA-256 of the phase criteria, the task's
+acceptance criteria, the collected artifact summary, the worker output tail
+and the judge model, so a resumed run or a retry that reproduces the same
+inputs gets the earlier ``GateResult`` without another judge call. Entries
+live in runtime/gate_cache.json, most recently used last, and the least
+recently used are evicted beyond ``gate_cache_size``. The file is rewritten
+when a verdict is added; hits only reorder the entries in memory, and that
+order is written by ``flush_caches`` at the end of the run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+CACHE_VERSION = 1
+
+
+def gate_key(criteria: str, acceptance: str, artifacts: str, worker_output: str, model: str) -> str:
+    h = hashlib.sha256()
+    for part in (criteria, acceptance, artifacts, worker_output, model):
+        data = part.encode("utf-8", "replace")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class GateCache:
+    """LRU map from gate key to a verdict dict, shared by every judge thread of a run."""
+
+    def __init__(self, project_path: str, max_entries: int):
+        self.path = os.path.join(project_path, "runtime", "gate_cache.json")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False  # LRU order changed since the last save
+        self._load()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            return dict(entry)
+
+    def put(self, key: str, verdict: dict):
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def flush(self):
+        """Write the LRU order if hits changed it since the last save."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if raw.get("version") != CACHE_VERSION:
+            return
+        for key, verdict in raw.get("entries", []):
+            self._entries[key] = verdict
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": list(self._entries.items())}, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+_caches: dict[str, GateCache] = {}
+_caches_lock = threading.Lock()
+
+
+def cache_for(project_path: str, max_entries: int) -> Optional[GateCache]:
+    """The project's gate cache (one instance per process), or None when disabled."""
+    if not project_path or max_entries <= 0:
+        return None
+    path = os.path.abspath(project_path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = GateCache(path, max_entries)
+        cache.max_entries = max_entries
+        return cache
+
+
+def flush_caches():
+    """Persist the LRU order of every gate cache opened by this process (end of run)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.flush()
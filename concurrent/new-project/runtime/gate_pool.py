@@ -0,0 +1,102 @@
+"""Parallel gate evaluation for the sync orchestrator.
+
+Exited workers are handed to a thread pool of ``gate_concurrency`` judges, so
+one slow ``gate_check`` no longer holds up other finished workers or new
+dispatch. Results come back through a queue; each one also writes a byte to a
+pipe whose read end sits in the reaper's selector, so the orchestrator wakes
+as soon as a verdict is ready.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from config import Config
+from gates import GateResult, gate_check
+from reaper import WakeupPipe
+from telemetry import log_event
+from worker import Worker
+
+
+@dataclass
+class GateOutcome:
+    worker: Worker
+    result: GateResult
+    queued_s: float  # worker exit -> judge start
+    exec_s: float  # judge start -> verdict
+
+
+class GatePool:
+    """Runs gate checks on a bounded thread pool and queues their outcomes."""
+
+    def __init__(self, config: Config, project_path: str):
+        self.config = config
+        self.project_path = project_path
+        self._executor = ThreadPoolExecutor(max_workers=max(1, config.gate_concurrency), thread_name_prefix="gate")
+        self._results: queue.Queue[GateOutcome] = queue.Queue()
+        self._pending: dict[str, Worker] = {}
+        self._lock = threading.Lock()
+        self._wakeup = WakeupPipe()
+
+    def submit(self, worker: Worker):
+        """Queue ``worker``'s output for judging."""
+        with self._lock:
+            self._pending[worker.key] = worker
+        self._executor.submit(self._judge, worker)
+
+    def pending(self, task_id: str = "") -> list[Worker]:
+        """Workers submitted but not yet collected (optionally only copies of ``task_id``)."""
+        with self._lock:
+            return [w for w in self._pending.values() if not task_id or w.task.id == task_id]
+
+    def results(self) -> list[GateOutcome]:
+        """Collect every finished verdict without blocking."""
+        self.changed()
+        outcomes = []
+        while True:
+            try:
+                outcome = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pending.pop(outcome.worker.key, None)
+            outcomes.append(outcome)
+        return outcomes
+
+    def wait(self, timeout=None) -> list[GateOutcome]:
+        """Block until at least one verdict is ready (or ``timeout``), then collect."""
+        try:
+            first = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        self._results.put(first)
+        return self.results()
+
+    def fileno(self) -> int:
+        return self._wakeup.fileno()
+
+    def changed(self) -> bool:
+        """True if a verdict arrived since the last call."""
+        return self._wakeup.changed()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._wakeup.close()
+
+    def _judge(self, worker: Worker):
+        task = worker.task
+        started = time.time()
+        queued = started - worker.finished_at
+        log_event(
+            "gate_start",
+            {"exit_at": round(worker.finished_at, 3), "gate_start_at": round(started, 3), "queue_delay_s": round(queued, 3)},
+            self.project_path, task_id=task.id, role=task.role, phase=task.phase,
+        )
+        try:
+            result = gate_check(task, worker.output_path, self.config, self.project_path)
+        except Exception as e:  # a crashed judge must still hand the worker back
+            result = GateResult(passed=False, summary=f"Gate check error: {e}", evidence=str(e))
+        self._results.put(GateOutcome(worker, result, queued, time.time() - started))
+        self._wakeup.notify()
@@ -2,12 +2,18 @@
 
 import json
 import os
-import subprocess
-from dataclasses import dataclass
+import re
+import threading
+from dataclasses import asdict, dataclass
 from typing import Optional
 
 from config import Config
+from gate_batch import GateBatcher
+from gate_cache import cache_for, gate_key
+from judge import judge_for
+from pregate import check as pre_gate_check
 from state import Task
+from telemetry import log_event
 
 GATE_CRITERIA = {
     "requirements": (
@@ -67,39 +73,153 @@ PHASE_ARTIFACTS = {
     "review": ["STATUS.md", "DECISIONS.md"],
 }
 
+# Verdicts that reflect a judge failure rather than the work; never cached
+_UNCACHEABLE = {"timeout", "cli_missing", "judge_error", "parse_error"}
+
 
 def gate_check(task: Task, output_path: str, config: Config, project_path: str = "") -> GateResult:
-    """Evaluate gate criteria by sending artifacts + criteria to an LLM judge."""
+    """Evaluate gate criteria by sending artifacts + criteria to an LLM judge.
+
+    The phase's pre-gate rules (pregate.py) run first against the worker's
+    tree; any violation fails the gate without calling the judge. With
+    ``gate_batch_window_s`` set, same-phase checks arriving within the window
+    share one judge call (gate_batch.py).
+    """
     criteria = GATE_CRITERIA.get(task.phase, "All acceptance criteria for this task are met.")
 
+    if project_path:
+        tree = _worker_tree(output_path, project_path)
+        violations = pre_gate_check(task.phase, tree, config.pre_gate_rules, config.gate_timeout, config.pre_gate_builtin)
+        if violations:
+            log_event("pre_gate_fail", {"violations": violations}, project_path, task_id=task.id, role=task.role, phase=task.phase)
+            more = f" (+{len(violations) - 1} more)" if len(violations) > 1 else ""
+            return GateResult(
+                passed=False,
+                summary=f"Pre-gate failed: {violations[0].splitlines()[0]}{more}",
+                evidence="\n".join(violations),
+                missing=violations,
+            )
+
     worker_output = _read_truncated(output_path, max_chars=3000)
     artifacts_summary = _collect_artifacts(task, project_path) if project_path else ""
+    model = config.gate_model or config.model
+    cache = cache_for(project_path, config.gate_cache_size)
+    key = gate_key(criteria, task.acceptance, artifacts_summary, worker_output, model)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            log_event("gate_cache_hit", {"key": key[:16], "passed": cached["passed"]}, project_path, task_id=task.id, role=task.role, phase=task.phase, model=model)
+            return GateResult(**cached)
+
+    request = _GateRequest(task, criteria, artifacts_summary, worker_output, model, config, project_path)
+    batcher = _batcher_for(config)
+    if batcher is not None:
+        result = batcher.judge((project_path, task.phase, model, artifacts_summary), request)
+    else:
+        result = _judge_one(request)
+    if cache is not None and not _UNCACHEABLE.intersection(result.missing):
+        cache.put(key, asdict(result))
+    return result
 
-    prompt = f"""You are a quality gate reviewer for an automated software delivery pipeline.
 
-Phase: {task.phase}
-Task: {task.title} ({task.id})
+@dataclass
+class _GateRequest:
+    task: Task
+    criteria: str
+    artifacts: str
+    worker_output: str
+    model: str
+    config: Config
+    project_path: str
+
+
+_PROMPT_HEADER = """You are a quality gate reviewer for an automated software delivery pipeline.
+
+Phase: {phase}
 
 Gate criteria:
 {criteria}
 
+Artifact files produced (first 500 chars each):
+{artifacts}
+"""
+
+_VERDICT_FIELDS = '"passed": true/false, "summary": "one-line summary", "evidence": "key evidence", "missing": ["list of unmet criteria if any"]'
+
+
+def _judge_one(req: _GateRequest) -> GateResult:
+    task = req.task
+    prompt = _PROMPT_HEADER.format(phase=task.phase, criteria=req.criteria, artifacts=req.artifacts or "(no artifacts found)")
+    prompt += f"""
+Task: {task.title} ({task.id})
+
 Task acceptance criteria:
 {task.acceptance}
 
-Artifact files produced (first 500 chars each):
-{artifacts_summary or "(no artifacts found)"}
-
 Worker output (last 3000 chars):
-{worker_output}
+{req.worker_output}
 
 Evaluate whether the gate criteria are met based on the artifacts and worker output.
 Return ONLY valid JSON (no markdown fences):
-{{"passed": true/false, "summary": "one-line summary", "evidence": "key evidence", "missing": ["list of unmet criteria if any"]}}
+{{{_VERDICT_FIELDS}}}
 """
+    return _parse_result(_call_llm_judge(prompt, req.model, req.config))
 
-    model = config.gate_model or config.model
-    result = _call_llm_judge(prompt, model, config.gate_timeout)
-    return _parse_result(result)
+
+def _judge_batch(reqs: list[_GateRequest]) -> list[Optional[GateResult]]:
+    """Judge several tasks of one phase in a single call; None for tasks the reply did not cover."""
+    first = reqs[0]
+    batched = list({req.task.id: req for req in reversed(reqs)}.values())[::-1]  # hedged copies share an id: judge those alone
+    prompt = _PROMPT_HEADER.format(phase=first.task.phase, criteria=first.criteria, artifacts=first.artifacts or "(no artifacts found)")
+    for i, req in enumerate(batched, 1):
+        prompt += f"""
+=== Task {i} of {len(batched)}: {req.task.title} ({req.task.id}) ===
+
+Task acceptance criteria:
+{req.task.acceptance}
+
+Worker output (last 3000 chars):
+{req.worker_output}
+"""
+    prompt += f"""
+Evaluate each task separately: whether the gate criteria are met based on the artifacts and that task's worker output.
+Return ONLY a valid JSON array (no markdown fences) with one object per task:
+[{{"task_id": "task id", {_VERDICT_FIELDS}}}]
+"""
+    raw = _call_llm_judge(prompt, first.model, first.config)
+    verdicts = _parse_batch(raw)
+    results = [verdicts.get(req.task.id) if any(req is b for b in batched) else None for req in reqs]
+    if first.project_path:
+        log_event(
+            "gate_batch",
+            {"size": len(batched), "task_ids": [r.task.id for r in batched], "fallback": [r.task.id for r, v in zip(reqs, results) if v is None]},
+            first.project_path, role=first.task.role, phase=first.task.phase, model=first.model,
+        )
+    return results
+
+
+_batcher: Optional[GateBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def _batcher_for(config: Config) -> Optional[GateBatcher]:
+    """The process-wide gate batcher, or None when batching is off."""
+    global _batcher
+    if config.gate_batch_window_s <= 0 or config.gate_batch_max < 2:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = GateBatcher(config.gate_batch_window_s, config.gate_batch_max, _judge_batch, _judge_one)
+        _batcher.window_s, _batcher.max_size = config.gate_batch_window_s, config.gate_batch_max
+        return _batcher
+
+
+def _worker_tree(output_path: str, project_path: str) -> str:
+    """The git tree the worker wrote to (its worktree), else the project root."""
+    worktree = os.path.dirname(output_path) if output_path else ""
+    if worktree and os.path.exists(os.path.join(worktree, ".git")):
+        return worktree
+    return project_path
 
 
 def _collect_artifacts(task: Task, project_path: str) -> str:
@@ -130,23 +250,9 @@ def _list_dir_files(dir_path: str, max_files: int = 10) -> list[str]:
         return []
 
 
-def _call_llm_judge(prompt: str, model: str, timeout: int) -> str:
-    """Call Claude CLI as a stateless judge.
-
-    TODO: Replace with direct API call if preferred (avoids CLI overhead).
-    """
-    try:
-        result = subprocess.run(
-            ["claude", "--print", "--model", model, "-p", prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        return '{"passed": false, "summary": "Gate evaluation timed out", "evidence": "", "missing": ["timeout"]}'
-    except FileNotFoundError:
-        return '{"passed": false, "summary": "Claude CLI not found", "evidence": "", "missing": ["cli_missing"]}'
+def _call_llm_judge(prompt: str, model: str, config: Config) -> str:
+    """Send the prompt to the configured judge backend (judge.py) and return its raw reply."""
+    return judge_for(config).judge(prompt, model, config.gate_timeout)
 
 
 def _parse_result(raw: str) -> GateResult:
@@ -167,6 +273,25 @@ def _parse_result(raw: str) -> GateResult:
         )
 
 
+def _parse_batch(raw: str) -> dict[str, GateResult]:
+    """Per-task verdicts from a batch reply, keyed by task id (empty if unparseable)."""
+    match = re.search(r"\[.*\]", raw, re.DOTALL)
+    try:
+        items = json.loads(match.group()) if match else []
+    except json.JSONDecodeError:
+        return {}
+    verdicts = {}
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and item.get("task_id") and isinstance(item.get("passed"), bool):
+            verdicts[str(item["task_id"])] = GateResult(
+                passed=item["passed"],
+                summary=item.get("summary", ""),
+                evidence=item.get("evidence", ""),
+                missing=item.get("missing", []),
+            )
+    return verdicts
+
+
 def _read_truncated(path: str, max_chars: int = 4000) -> str:
     try:
         with open(path) as f:
@@ -0,0 +1,44 @@
+"""Speculative (hedged) execution for straggling workers.
+
+When a worker has run longer than a configurable percentile of the historical
+durations of similar tasks (see durations.py) and a slot would otherwise sit
+idle, the orchestrator starts a second copy of the same task on its own
+worktree and branch. The first copy to pass its gate is
+merged; the other is killed and its worktree and branch are discarded.
+"""
+
+import time
+from typing import Iterable, Optional
+
+from config import Config
+from durations import DurationModel
+from state import Task
+from worker import Worker
+
+HEDGE_VARIANT = "hedge"
+
+
+class HedgePolicy:
+    """Decides which running workers are stragglers worth hedging."""
+
+    def __init__(self, config: Config, durations: DurationModel):
+        self.config = config
+        self.durations = durations
+
+    def threshold(self, task: Task) -> Optional[float]:
+        """Duration after which ``task`` counts as a straggler, or None without enough history."""
+        return self.durations.predict(task, self.config.hedge_percentile, min_samples=self.config.hedge_min_samples)
+
+    def stragglers(self, running: Iterable[Worker], now: Optional[float] = None) -> list[tuple[Worker, float]]:
+        """Primary workers past their threshold that have no hedge yet, slowest first."""
+        now = time.time() if now is None else now
+        running = list(running)
+        hedged = {w.task.id for w in running if w.variant == HEDGE_VARIANT}
+        found = []
+        for w in running:
+            if w.variant or w.task.id in hedged:
+                continue
+            limit = self.threshold(w.task)
+            if limit is not None and now - w.started_at > limit:
+                found.append((w, limit))
+        return sorted(found, key=lambda item: item[0].started_at)
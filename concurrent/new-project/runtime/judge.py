@@ -0,0 +1,151 @@
+"""Judge backends used by gates.py.
+
+A backend takes the gate prompt and returns the judge's raw reply, which
+gates.py parses into a ``GateResult``. Failures come back as a failed verdict
+in the same JSON shape rather than as exceptions.
+
+- ``cli`` (default): one ``claude --print`` process per gate.
+- ``http``: the Messages API over a pooled keep-alive session, with at most
+  ``judge_concurrency`` requests in flight and retries with exponential
+  backoff on 429/5xx. ``judge_url`` can point at fake_judge.py for tests and
+  benchmarks.
+
+One backend instance is shared per process (``judge_for``) so the HTTP
+connection pool outlives individual gate checks.
+"""
+
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from config import Config
+
+API_VERSION = "2023-06-01"
+MAX_TOKENS = 4096  # room for a batched verdict array
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 30.0
+
+
+def failed_verdict(summary: str, missing: str) -> str:
+    return json.dumps({"passed": False, "summary": summary, "evidence": "", "missing": [missing]})
+
+
+class CliJudge:
+    """Runs each gate through a fresh ``claude --print`` process."""
+
+    def __init__(self, config: Config):
+        self.config = config
+
+    def judge(self, prompt: str, model: str, timeout: int) -> str:
+        try:
+            result = subprocess.run(
+                ["claude", "--print", "--model", model, "-p", prompt],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+            return result.stdout.strip()
+        except subprocess.TimeoutExpired:
+            return failed_verdict("Gate evaluation timed out", "timeout")
+        except FileNotFoundError:
+            return failed_verdict("Claude CLI not found", "cli_missing")
+
+    def close(self):
+        pass
+
+
+class HttpJudge:
+    """Calls the Messages API on a keep-alive connection pool shared by all gate threads."""
+
+    def __init__(self, config: Config):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._requests = requests
+        self.url = config.judge_url.rstrip("/") + "/v1/messages"
+        self.max_retries = max(0, config.judge_max_retries)
+        concurrency = max(1, config.judge_concurrency)
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._session = requests.Session()
+        self._session.mount(self.url.split("/v1/")[0], HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+        self._session.headers.update({
+            "anthropic-version": API_VERSION,
+            "content-type": "application/json",
+            "x-api-key": os.environ.get(config.judge_api_key_env, ""),
+        })
+
+    def judge(self, prompt: str, model: str, timeout: int) -> str:
+        body = {"model": model, "max_tokens": MAX_TOKENS, "messages": [{"role": "user", "content": prompt}]}
+        deadline = time.time() + timeout  # time queued for a slot counts against the gate timeout
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.time())):
+            return failed_verdict("Gate evaluation timed out waiting for a judge slot", "timeout")
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    resp = self._session.post(self.url, json=body, timeout=remaining)
+                except self._requests.Timeout:
+                    break
+                except self._requests.RequestException as e:
+                    if attempt == self.max_retries:
+                        return failed_verdict(f"Judge request failed: {e}", "judge_error")
+                    time.sleep(min(_backoff(attempt), max(0.0, deadline - time.time())))
+                    continue
+                if resp.status_code == 200:
+                    try:
+                        return _reply_text(resp.json())
+                    except ValueError:
+                        return resp.text  # gates.py reports it as a parse error
+                if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return failed_verdict(f"Judge returned HTTP {resp.status_code}: {resp.text[:200]}", "judge_error")
+                wait = _retry_after(resp)
+                time.sleep(min(wait if wait is not None else _backoff(attempt), max(0.0, deadline - time.time())))
+        finally:
+            self._slots.release()
+        return failed_verdict("Gate evaluation timed out", "timeout")
+
+    def close(self):
+        self._session.close()
+
+
+def _reply_text(data: dict) -> str:
+    return "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text").strip()
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+def _retry_after(resp) -> Optional[float]:
+    try:
+        return min(BACKOFF_MAX_S, float(resp.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+BACKENDS = {"cli": CliJudge, "http": HttpJudge}
+
+_backends: dict[tuple, object] = {}
+_backends_lock = threading.Lock()
+
+
+def judge_for(config: Config):
+    """The process-wide backend for ``config.judge_backend`` (CLI when unknown)."""
+    kind = config.judge_backend if config.judge_backend in BACKENDS else "cli"
+    key = (
+        (kind, config.judge_url, config.judge_concurrency, config.judge_max_retries, config.judge_api_key_env)
+        if kind == "http" else (kind,)
+    )
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = _backends[key] = BACKENDS[kind](config)
+        return backend
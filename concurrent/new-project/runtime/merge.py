@@ -2,17 +2,24 @@
 
 import os
 import subprocess
+from typing import Optional
 
 from state import Task
+from worktree_pool import WORKTREE_LOCK, WorktreePool
 
 
 class MergeConflict(Exception):
-    def __init__(self, task: Task, details: str):
+    def __init__(self, task: Task, details: str, paths: Optional[list[str]] = None):
         self.task = task
         self.details = details
+        self.paths = paths or []  # conflicted paths, when known
         super().__init__(f"Merge conflict on {task.id}: {details}")
 
 
+def task_branch(task: Task) -> str:
+    return f"agent/{task.role}/{task.id}-{task.slug}"
+
+
 def create_worktree(project_path: str, worktree_path: str, branch: str):
     """Create a git worktree on a new branch for isolated worker execution."""
     os.makedirs(os.path.dirname(worktree_path), exist_ok=True)
@@ -25,12 +32,13 @@ def create_worktree(project_path: str, worktree_path: str, branch: str):
     )
 
 
-def merge_branch(task: Task, project_path: str):
+def merge_branch(task: Task, project_path: str, branch: Optional[str] = None):
     """Merge a worker's branch back into the main branch.
 
-    Raises MergeConflict if the merge fails.
+    ``branch`` defaults to the task's standard branch name; hedged copies pass
+    their own. Raises MergeConflict if the merge fails.
     """
-    branch = f"agent/{task.role}/{task.id}-{task.slug}"
+    branch = branch or task_branch(task)
     result = subprocess.run(
         ["git", "merge", "--no-ff", branch, "-m", f"Merge {task.id}: {task.title}"],
         cwd=project_path,
@@ -38,24 +46,66 @@ def merge_branch(task: Task, project_path: str):
         text=True,
     )
     if result.returncode != 0:
+        conflicted = subprocess.run(
+            ["git", "diff", "--name-only", "--diff-filter=U"],
+            cwd=project_path,
+            capture_output=True,
+            text=True,
+        )
         subprocess.run(["git", "merge", "--abort"], cwd=project_path, capture_output=True)
-        raise MergeConflict(task, result.stderr)
+        raise MergeConflict(task, result.stderr, conflicted.stdout.splitlines())
 
 
-def cleanup_worktree(task: Task, project_path: str):
-    """Remove worktree and delete the branch after successful merge."""
-    worktree_path = os.path.join(project_path, ".worktrees", task.id)
+def merge_branches(tasks: list[Task], branches: list[str], project_path: str):
+    """Merge several workers' branches into the main branch with one octopus merge commit.
+
+    Raises MergeConflict (for the first task) and leaves the main branch as it
+    was if git cannot merge them all at once.
+    """
+    before = subprocess.run(["git", "rev-parse", "HEAD"], cwd=project_path, capture_output=True, text=True).stdout.strip()
+    message = f"Merge {', '.join(t.id for t in tasks)}\n\n" + "\n".join(f"{t.id}: {t.title}" for t in tasks)
+    result = subprocess.run(
+        ["git", "merge", "--no-ff", "-m", message, *branches],
+        cwd=project_path,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        subprocess.run(["git", "merge", "--abort"], cwd=project_path, capture_output=True)
+        if before:
+            subprocess.run(["git", "reset", "--merge", before], cwd=project_path, capture_output=True)
+        raise MergeConflict(tasks[0], result.stderr or result.stdout)
+
+
+def cleanup_worktree(
+    task: Task,
+    project_path: str,
+    worktree_path: Optional[str] = None,
+    branch: Optional[str] = None,
+    force: bool = False,
+    pool: Optional[WorktreePool] = None,
+):
+    """Remove worktree and delete the branch after successful merge.
+
+    ``force`` deletes the branch even though it was never merged (used to
+    discard the losing copy of a hedged task). A worktree taken from ``pool``
+    is reset and parked for the next worker instead of being removed.
+    """
+    worktree_path = worktree_path or os.path.join(project_path, ".worktrees", task.id)
+    branch = branch or task_branch(task)
+    if pool is not None and pool.recycle(worktree_path, branch, force):
+        return
 
     if os.path.isdir(worktree_path):
-        subprocess.run(
-            ["git", "worktree", "remove", "--force", worktree_path],
-            cwd=project_path,
-            capture_output=True,
-        )
+        with WORKTREE_LOCK:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree_path],
+                cwd=project_path,
+                capture_output=True,
+            )
 
-    branch = f"agent/{task.role}/{task.id}-{task.slug}"
     subprocess.run(
-        ["git", "branch", "-d", branch],
+        ["git", "branch", "-D" if force else "-d", branch],
         cwd=project_path,
         capture_output=True,
     )
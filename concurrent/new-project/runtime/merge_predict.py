@@ -0,0 +1,95 @@
+"""Conflict prediction for passing branches before they touch the main checkout.
+
+``git merge-tree --write-tree`` (git 2.38+) performs the merge entirely in the
+object database and reports the conflicted paths without touching the index
+or working tree, so several queued branches can be tested against the current
+HEAD in parallel. A branch that conflicts with HEAD will conflict whatever
+order the queue merges in, so merge_queue.py fails it at once with the
+conflicting paths; among the clean ones it merges first the branch whose
+changed paths overlap least with the other candidates, so merging it is least
+likely to break theirs.
+"""
+
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+_OID = re.compile(r"^[0-9a-f]{40,64}$")
+
+
+@dataclass
+class Prediction:
+    branch: str
+    clean: bool
+    paths: list[str] = field(default_factory=list)  # conflicted paths when not clean
+    error: str = ""  # prediction itself failed; the real merge decides
+
+
+class MergePredictor:
+    """Tests branches against HEAD with ``git merge-tree``; results are cached per (HEAD, branch tip)."""
+
+    def __init__(self, project_path: str, workers: int = 4):
+        self.project_path = project_path
+        self.workers = max(1, workers)
+        self.available = True  # False once git turns out to lack merge-tree --write-tree
+        self._cache: dict[tuple[str, str], Prediction] = {}
+        self._changed: dict[str, set[str]] = {}
+
+    def predict(self, branches: list[str]) -> dict[str, Prediction]:
+        """Predict the merge of each branch into the current HEAD, in parallel."""
+        head = self._rev_parse("HEAD")
+        if head is None or not self.available:
+            return {b: Prediction(b, True, error="prediction unavailable") for b in branches}
+        self._cache = {k: v for k, v in self._cache.items() if k[0] == head}
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(branches))), thread_name_prefix="merge-predict") as pool:
+            return dict(zip(branches, pool.map(lambda b: self._predict_one(head, b), branches)))
+
+    def order(self, branches: list[str]) -> list[str]:
+        """``branches`` with the one overlapping fewest of the others first (stable otherwise)."""
+        changed = {b: self.changed_paths(b) for b in branches}
+        overlaps = {b: sum(1 for o in branches if o != b and changed[b] & changed[o]) for b in branches}
+        return sorted(branches, key=lambda b: overlaps[b])
+
+    def changed_paths(self, branch: str) -> set[str]:
+        """Paths the branch changed since it forked from HEAD."""
+        tip = self._rev_parse(branch)
+        if tip is None:
+            return set()
+        if tip not in self._changed:
+            result = self._git("diff", "--name-only", f"HEAD...{tip}")
+            self._changed[tip] = set(result.stdout.splitlines()) if result.returncode == 0 else set()
+        return self._changed[tip]
+
+    def _predict_one(self, head: str, branch: str) -> Prediction:
+        tip = self._rev_parse(branch)
+        if tip is None:
+            return Prediction(branch, True, error=f"unknown branch {branch}")
+        cached = self._cache.get((head, tip))
+        if cached is not None:
+            return cached
+        result = self._git("merge-tree", "--write-tree", "--name-only", "--no-messages", head, tip)
+        lines = result.stdout.splitlines()
+        if result.returncode == 0:
+            prediction = Prediction(branch, True)
+        elif result.returncode == 1 and lines and _OID.match(lines[0]):
+            prediction = Prediction(branch, False, list(dict.fromkeys(line for line in lines[1:] if line)))
+        else:
+            if "usage:" in result.stderr or result.returncode == 129:
+                self.available = False
+            return Prediction(branch, True, error=result.stderr.strip()[:200])
+        self._cache[(head, tip)] = prediction
+        return prediction
+
+    def _rev_parse(self, ref: str) -> Optional[str]:
+        result = self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", *args], cwd=self.project_path, capture_output=True, text=True)
+
+
+def describe(prediction: Prediction) -> str:
+    return f"predicted conflict with main in: {', '.join(prediction.paths) or '(unknown paths)'}"
+
@@ -0,0 +1,255 @@
+"""Serialized merge stage for the sync orchestrator.
+
+Branches whose gate passed are merged into the main branch one at a time on a
+dedicated thread, so dispatch and gating carry on while git works. The queue
+is bounded (``merge_queue_size``): when it is full ``submit`` refuses the job
+instead of blocking and the orchestrator offers it again on its next pass.
+A task is never merged ahead of a queued task it depends on. With
+``merge_predict`` every mergeable branch is first test-merged against HEAD in
+memory (merge_predict.py): predicted conflicts fail with their paths before
+the main checkout is touched, and the clean branch least entangled with the
+others is merged first. With ``merge_batch_max`` > 1, clean branches whose
+changed paths are disjoint are merged together in one octopus merge commit,
+falling back to one at a time if git refuses. Outcomes come
+back through a queue plus a wakeup pipe, like gate_pool.py, and all State
+changes stay on the orchestrator thread.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config import Config
+from conflicts import rebase_and_recheck
+from merge import MergeConflict, cleanup_worktree, merge_branch, merge_branches
+from merge_predict import MergePredictor, describe
+from reaper import WakeupPipe
+from telemetry import log_event
+from worker import Worker
+from worktree_pool import WorktreePool
+
+
+@dataclass
+class MergeOutcome:
+    worker: Worker
+    conflict: Optional[MergeConflict]
+    queued_s: float  # enqueue -> merge start
+    merge_s: float  # merge + worktree cleanup
+
+
+class MergeQueue:
+    """One merge thread fed from a bounded, dependency-ordered queue."""
+
+    def __init__(self, config: Config, project_path: str, pool: Optional[WorktreePool] = None):
+        self.config = config
+        self.project_path = project_path
+        self.pool = pool  # merged worktrees go back to the pool
+        self.capacity = max(1, config.merge_queue_size)
+        self._jobs: list[tuple[Worker, float]] = []
+        self._active: list[Worker] = []
+        self._cond = threading.Condition()
+        self._results: queue.Queue[MergeOutcome] = queue.Queue()
+        self._wakeup = WakeupPipe()
+        self._rebases: dict[str, int] = {}  # worker key -> automatic rebases so far
+        self.batch_max = max(1, config.merge_batch_max)
+        batching = self.batch_max > 1
+        self.predictor = MergePredictor(project_path, config.merge_predict_workers) if config.merge_predict or batching else None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="merge", daemon=True)
+        self._thread.start()
+
+    def submit(self, worker: Worker) -> bool:
+        """Queue ``worker``'s branch for merging; False if the queue is full."""
+        with self._cond:
+            if len(self._jobs) >= self.capacity:
+                return False
+            self._jobs.append((worker, time.time()))
+            self._cond.notify()
+            return True
+
+    def pending(self, task_id: str = "") -> list[Worker]:
+        """Queued and in-progress merges (optionally only copies of ``task_id``)."""
+        with self._cond:
+            workers = [w for w, _ in self._jobs] + self._active
+        return [w for w in workers if not task_id or w.task.id == task_id]
+
+    def results(self) -> list[MergeOutcome]:
+        """Collect finished merges without blocking."""
+        self.changed()
+        outcomes = []
+        while True:
+            try:
+                outcomes.append(self._results.get_nowait())
+            except queue.Empty:
+                return outcomes
+
+    def fileno(self) -> int:
+        return self._wakeup.fileno()
+
+    def changed(self) -> bool:
+        return self._wakeup.changed()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._wakeup.close()
+
+    def _mergeable(self) -> list[tuple[Worker, float]]:
+        """Queued jobs that do not depend on another queued task, oldest first."""
+        queued = {w.task.id for w, _ in self._jobs}
+        ready = [job for job in self._jobs if not queued.intersection(job[0].task.dependencies)]
+        return ready or self._jobs[:1]  # dependency cycle: fall back to arrival order
+
+    def _choose(self, candidates: list[tuple[Worker, float]]) -> tuple[list[tuple[Worker, float]], list[tuple[Worker, float, MergeConflict]]]:
+        """Pick the jobs to merge next (one, or a batch) and the jobs predicted to conflict with HEAD.
+
+        Runs git outside the lock; only this thread removes jobs, so the
+        candidates stay queued meanwhile.
+        """
+        if self.predictor is None:
+            return candidates[:1], []
+        doomed, clean = [], candidates
+        if self.config.merge_predict:
+            started = time.time()
+            branches = [w.branch for w, _ in candidates]
+            predictions = self.predictor.predict(branches)
+            doomed = [
+                (w, enqueued, MergeConflict(w.task, describe(predictions[w.branch]), predictions[w.branch].paths))
+                for w, enqueued in candidates if not predictions[w.branch].clean
+            ]
+            clean = [(w, enqueued) for w, enqueued in candidates if predictions[w.branch].clean]
+            log_event(
+                "merge_predict",
+                {
+                    "branches": len(branches), "predict_s": round(time.time() - started, 3),
+                    "conflicts": {w.task.id: mc.paths for w, _, mc in doomed},
+                    "errors": {p.branch: p.error for p in predictions.values() if p.error},
+                },
+                self.project_path,
+            )
+        if not clean:
+            return [], doomed
+        by_branch = {w.branch: (w, enqueued) for w, enqueued in clean}
+        ordered = [by_branch[b] for b in self.predictor.order(list(by_branch))]
+        return self._batch(ordered), doomed
+
+    def _batch(self, ordered: list[tuple[Worker, float]]) -> list[tuple[Worker, float]]:
+        """The first job plus the following ones whose changed paths are disjoint from the batch so far."""
+        batch = ordered[:1]
+        if self.batch_max <= 1:
+            return batch
+        claimed = set(self.predictor.changed_paths(batch[0][0].branch))
+        for job in ordered[1:]:
+            if len(batch) >= self.batch_max:
+                break
+            paths = self.predictor.changed_paths(job[0].branch)
+            if paths and not paths & claimed:
+                batch.append(job)
+                claimed |= paths
+        return batch
+
+    def _wait_for_batch(self):
+        """With batching, let more jobs arrive until the oldest has waited ``merge_batch_window_s`` (lock held)."""
+        if self.batch_max <= 1 or self.config.merge_batch_window_s <= 0:
+            return
+        deadline = min(enqueued for _, enqueued in self._jobs) + self.config.merge_batch_window_s
+        while len(self._jobs) < self.batch_max and not self._closed and time.time() < deadline:
+            self._cond.wait(deadline - time.time())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                self._wait_for_batch()
+                candidates = self._mergeable()
+            batch, doomed = self._choose(candidates)
+            for worker, enqueued, mc in doomed:
+                mc = self._rebase(worker, mc)
+                if mc is not None:  # otherwise it stays queued and is predicted again
+                    self._finish(MergeOutcome(worker, mc, time.time() - enqueued, 0.0), "predicted_conflict", remove=(worker, enqueued))
+            if not batch:
+                continue
+            with self._cond:
+                for job in batch:
+                    self._jobs.remove(job)
+                self._active = [w for w, _ in batch]
+            if len(batch) > 1 and self._merge_batch(batch):
+                continue
+            for job in batch:  # one at a time, also the fallback for a failed octopus merge
+                self._merge_one(job)
+
+    def _merge_one(self, job: tuple[Worker, float]):
+        worker, enqueued = job
+        started = time.time()
+        conflict = None
+        try:
+            merge_branch(worker.task, self.project_path, worker.branch)
+        except MergeConflict as mc:
+            conflict = mc
+        except Exception as e:  # keep the merge thread alive; report as a failed merge
+            conflict = MergeConflict(worker.task, str(e))
+        else:
+            self._cleanup(worker)
+        if conflict is not None and conflict.paths and self._rebase(worker, conflict) is None:
+            with self._cond:
+                self._jobs.insert(0, job)
+                self._active.remove(worker)
+            return
+        outcome = MergeOutcome(worker, conflict, started - enqueued, time.time() - started)
+        self._finish(outcome, "conflict" if conflict else "merged")
+
+    def _merge_batch(self, batch: list[tuple[Worker, float]]) -> bool:
+        """Octopus-merge ``batch`` in one commit; False (main untouched) if git could not."""
+        workers = [w for w, _ in batch]
+        ids = [w.task.id for w in workers]
+        started = time.time()
+        try:
+            merge_branches([w.task for w in workers], [w.branch for w in workers], self.project_path)
+        except Exception as e:
+            details = e.details if isinstance(e, MergeConflict) else str(e)
+            log_event("merge_batch", {"tasks": ids, "result": "fallback", "error": details[:200]}, self.project_path)
+            return False
+        log_event("merge_batch", {"tasks": ids, "result": "merged", "merge_s": round(time.time() - started, 3)}, self.project_path)
+        for worker, enqueued in batch:
+            self._cleanup(worker)
+            self._finish(MergeOutcome(worker, None, started - enqueued, time.time() - started), "merged")
+        return True
+
+    def _cleanup(self, worker: Worker):
+        """Remove a merged branch's worktree; a failure is logged, the merge still counts."""
+        try:
+            cleanup_worktree(worker.task, self.project_path, worker.worktree, worker.branch, pool=self.pool)
+        except Exception as e:
+            task = worker.task
+            log_event("merge_cleanup_error", {"error": str(e)[:200]}, self.project_path, task_id=task.id, role=task.role, phase=task.phase)
+
+    def _rebase(self, worker: Worker, conflict: MergeConflict) -> Optional[MergeConflict]:
+        """Rebase a conflicting branch onto main; None if it can be merged again, else the conflict to report."""
+        attempts = self._rebases.get(worker.key, 0)
+        if attempts >= self.config.merge_rebase_attempts:
+            return conflict
+        self._rebases[worker.key] = attempts + 1
+        return rebase_and_recheck(conflict, worker.worktree, self.project_path, self.config)
+
+    def _finish(self, outcome: MergeOutcome, result: str, remove: Optional[tuple[Worker, float]] = None):
+        self._rebases.pop(outcome.worker.key, None)
+        task = outcome.worker.task
+        log_event(
+            "merge",
+            {"result": result, "queue_s": round(outcome.queued_s, 3), "merge_s": round(outcome.merge_s, 3)},
+            self.project_path, task_id=task.id, role=task.role, phase=task.phase,
+        )
+        with self._cond:  # hand over atomically so pending() + results() never miss it
+            if remove is not None:
+                self._jobs.remove(remove)
+            else:
+                self._active.remove(outcome.worker)
+            self._results.put(outcome)
+        self._wakeup.notify()
@@ -7,13 +7,26 @@ and advances phases until the project is complete or a blocking failure occurs.
 import json
 import os
 import re
+import select
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 from config import Config
-from gates import gate_check
-from merge import merge_branch, cleanup_worktree, MergeConflict
+from control import CheckpointWatch
+from dispatcher import Dispatcher
+from durations import task_shape
+from gate_cache import flush_caches
+from gate_pool import GateOutcome, GatePool
+from hedging import HEDGE_VARIANT, HedgePolicy
+from merge import MergeConflict, cleanup_worktree
+from merge_queue import MergeOutcome, MergeQueue
 from notifier import notify
+from plan_cache import PlanCache, plan_key, spec_files
+from plan_split import SpecPart, apply_merge, format_parts, parse_merge, renumber, spec_parts
+from replan import apply_ops, diff_specs, format_changes, format_task_graph, parse_ops
+from scheduler import format_duration
 from state import State, Task, PHASE_ORDER
 from telemetry import init_run, log_event, log_run_complete
 from worker import Worker
@@ -38,9 +51,13 @@ PHASE_ROLES = {
 
 def run(project_path: str, config: Config, dry_run: bool = False):
     """Main orchestrator entry point."""
-    state = State(project_path)
+    state = State(project_path, pipelined=config.pipelined_phases)
     run_id = init_run(project_path)
     _run_start = time.time()
+    control = CheckpointWatch(project_path)
+    dispatcher = Dispatcher(config, project_path, control)
+    stages = Stages(config, project_path, dispatcher)
+    hedger = HedgePolicy(config, dispatcher.durations) if config.hedge_enabled else None
     notify(config, f"Starting concurrent run {run_id}. Phase: {state.current_phase}", "info")
 
     while state.current_phase != "complete":
@@ -52,74 +69,36 @@ def run(project_path: str, config: Config, dry_run: bool = False):
         # Check for human checkpoint
         if _checkpoint_exists(project_path):
             notify(config, "Paused at checkpoint. Run with --resume to continue.", "warning")
-            _wait_for_resume(project_path)
+            control.wait_for_resume()
+
+        # Apply spec edits made since the implementation plan was generated
+        if not dry_run:
+            _replan_on_spec_changes(state, project_path, config)
 
         # Get or generate tasks for current phase
-        tasks = state.get_ready_tasks()
-        if not tasks:
-            tasks = _generate_phase_tasks(state.current_phase, project_path, config)
+        if _needs_phase_tasks(state):
+            tasks = _generate_phase_tasks(state.current_phase, project_path, config, state)
             if not tasks:
                 notify(config, f"No tasks for phase {state.current_phase}. Advancing.", "info")
                 state.advance_phase()
                 continue
             state.add_tasks(tasks)
-            tasks = state.get_ready_tasks()
+
+        # Pipelined phases: generate the next phase early so its tasks can start
+        # as soon as their own dependencies are done
+        lookahead = _lookahead_phase(state, config)
+        if lookahead:
+            state.add_tasks(_generate_phase_tasks(lookahead, project_path, config, state))
 
         if dry_run:
-            print(f"\n[DRY RUN] Phase: {state.current_phase}")
-            for t in tasks:
-                print(f"  - {t.id}: {t.title} (role: {t.role})")
+            _print_dry_run(state, dispatcher, config)
             state.advance_phase()
             continue
 
-        # Dispatch workers (up to max_workers)
-        batch = tasks[: config.max_workers]
-        workers: list[Worker] = []
-
-        for task in batch:
-            notify(config, f"Dispatching: {task.id} ({task.title}) -> {task.role}", "info")
-            log_event("task_dispatch", {}, project_path, task_id=task.id, role=task.role, phase=task.phase, model=config.model)
-            w = Worker(task, config, project_path)
-            try:
-                w.start()
-                workers.append(w)
-                state.mark_in_progress(task)
-            except Exception as e:
-                notify(config, f"Failed to start worker for {task.id}: {e}", "error")
-                log_event("task_fail", {"error": str(e)[:200]}, project_path, task_id=task.id, role=task.role, phase=task.phase)
-                state.mark_blocked(task, str(e))
-
-        # Wait for workers and evaluate gates
-        for w in workers:
-            task_start = time.time()
-            try:
-                w.wait()
-            except Exception as e:
-                dur = time.time() - task_start
-                notify(config, f"Worker {w.task.id} failed: {e}", "error")
-                log_event("task_fail", {"error": str(e)[:200]}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur)
-                state.mark_blocked(w.task, str(e))
-                continue
-
-            dur = time.time() - task_start
-            result = gate_check(w.task, w.output_path, config, project_path)
-
-            if result.passed:
-                log_event("gate_pass", {"summary": result.summary}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur, model=config.model)
-                try:
-                    merge_branch(w.task, project_path)
-                    cleanup_worktree(w.task, project_path)
-                    state.mark_done(w.task)
-                    log_event("task_complete", {}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur)
-                    notify(config, f"PASS + merged: {w.task.id}", "info")
-                except MergeConflict as mc:
-                    notify(config, f"Merge conflict on {w.task.id}: {mc.details[:200]}", "error")
-                    log_event("task_fail", {"error": f"merge_conflict: {mc.details[:200]}"}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur)
-                    _handle_failure(w.task, f"Merge conflict: {mc.details}", state, config, project_path)
-            else:
-                log_event("gate_fail", {"summary": result.summary, "missing": result.missing}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur, model=config.model)
-                notify(config, f"FAIL: {w.task.id} — {result.summary}", "warning")
-                _handle_failure(w.task, result.summary, state, config, project_path)
+        _dispatch_phase(state, dispatcher, stages, config, project_path, hedger)
+        if dispatcher.window_active():
+            log_event("slot_utilisation", dispatcher.window_stats(), project_path, phase=state.current_phase)
+        _check_stalled(state, config, project_path)
 
         # Check if phase is complete
         if state.phase_complete():
@@ -132,8 +111,11 @@ def run(project_path: str, config: Config, dry_run: bool = False):
                 notify(config, "Requirements phase complete. Review specs/requirements.md and resume.", "warning")
                 _create_checkpoint(project_path)
 
+    stages.close()
+    dispatcher.close()
+    flush_caches()
     total_duration = time.time() - _run_start
-    log_run_complete(project_path, total_duration)
+    log_run_complete(project_path, total_duration, dispatcher.total_stats())
     notify(config, "All phases complete. Project delivery finished.", "complete")
     state.log_decision(
         "Concurrent run complete",
@@ -141,15 +123,330 @@ def run(project_path: str, config: Config, dry_run: bool = False):
     )
 
 
-def _generate_phase_tasks(phase: str, project_path: str, config: Config) -> list[Task]:
+def _needs_phase_tasks(state: State) -> bool:
+    """Whether tasks must be generated for the current phase before dispatching.
+
+    Only an empty phase is generated: a phase with tasks on the board may have
+    none ready simply because they are running, judged, blocked or waiting for
+    a fix task.
+    """
+    if state.get_ready_tasks():
+        return False
+    return not state.phase_tasks()
+
+
+def _lookahead_phase(state: State, config: Config) -> Optional[str]:
+    """Next phase whose tasks should be generated early in pipelined mode, if any.
+
+    Implementation is never generated ahead (the planner needs finished design
+    specs), and nothing is generated past the post-requirements checkpoint.
+    """
+    if not state.pipelined or not state.phase_tasks():
+        return None
+    idx = PHASE_ORDER.index(state.current_phase)
+    for phase in PHASE_ORDER[idx + 1:]:
+        if phase in config.skip_phases:
+            continue
+        if phase == "complete" or phase == "implementation" or state.phase_tasks(phase):
+            return None
+        if state.current_phase == "requirements" and config.checkpoint_after_requirements:
+            return None
+        return phase
+    return None
+
+
+def _check_stalled(state: State, config: Config, project_path: str, notify_fn: Optional[Callable[..., None]] = None):
+    """Pause a run whose current phase can make no further progress.
+
+    Called once dispatch has drained, so nothing is running: with nothing
+    ready either, the phase is stuck behind blocked tasks (e.g. a worker that
+    failed to start) and only a human can unstick it.
+    """
+    notify_fn = notify_fn or notify
+    if state.phase_complete() or state.get_ready_tasks():
+        return
+    if _checkpoint_exists(project_path):
+        return
+    blocked = [t.id for t in state.phase_tasks() if t.status == "blocked"]
+    notify_fn(config, f"Phase {state.current_phase} stalled (blocked: {', '.join(blocked) or 'none'}). Paused.", "error")
+    _create_checkpoint(project_path)
+
+
+def _print_dry_run(state: State, dispatcher: Dispatcher, config: Config):
+    """Print the critical-path dispatch order and predicted makespan for the current phase.
+
+    Durations are p50 estimates from past runs where available (p90 shown
+    alongside), else the task's timeout.
+    """
+    phase_tasks = [t for t in state.tasks if t.phase == state.current_phase]
+    planned = dispatcher.scheduler.plan(phase_tasks, config.max_workers)
+    print(f"\n[DRY RUN] Phase: {state.current_phase}")
+    for i, slot in enumerate(planned, 1):
+        t = slot.task
+        p50, p90 = dispatcher.durations.p50(t), dispatcher.durations.p90(t)
+        estimate = f"p50 {format_duration(p50)}, p90 {format_duration(p90)}" if p50 is not None else "no history"
+        print(
+            f"  {i}. {t.id}: {t.title} (role: {t.role}, priority: {t.priority}, {estimate}, "
+            f"critical path: {format_duration(slot.critical_path_s)}, starts at +{format_duration(slot.start_s)})"
+        )
+    makespan = max((slot.end_s for slot in planned), default=0.0)
+    print(f"  Predicted makespan: {format_duration(makespan)} on {config.max_workers} slot(s)")
+
+
+class Stages:
+    """The gate pool and merge queue behind the dispatcher, plus merges waiting for queue space."""
+
+    def __init__(self, config: Config, project_path: str, dispatcher: Dispatcher):
+        self.gates = GatePool(config, project_path)
+        self.merges = MergeQueue(config, project_path, dispatcher.worktrees)
+        self.awaiting_merge: list[Worker] = []
+        dispatcher.add_wake_source(self.gates)
+        dispatcher.add_wake_source(self.merges)
+
+    def merge(self, worker: Worker):
+        self.awaiting_merge.append(worker)
+        self.flush()
+
+    def flush(self):
+        """Move waiting merges into the bounded merge queue while it has room."""
+        while self.awaiting_merge and self.merges.submit(self.awaiting_merge[0]):
+            self.awaiting_merge.pop(0)
+
+    def merging(self, task_id: str) -> list[Worker]:
+        """Copies of a task waiting for or in the merge queue."""
+        return [w for w in self.awaiting_merge if w.task.id == task_id] + self.merges.pending(task_id)
+
+    def live_copies(self, task_id: str) -> list[Worker]:
+        """Copies of a task still being judged or merged."""
+        return self.gates.pending(task_id) + self.merging(task_id)
+
+    def busy(self) -> bool:
+        return bool(self.gates.pending() or self.awaiting_merge or self.merges.pending())
+
+    def wait(self):
+        """Block until the gate pool or merge queue reports a result."""
+        select.select([self.gates.fileno(), self.merges.fileno()], [], [])
+
+    def close(self):
+        self.gates.close()
+        self.merges.close()
+
+
+def _dispatch_phase(
+    state: State,
+    dispatcher: Dispatcher,
+    stages: Stages,
+    config: Config,
+    project_path: str,
+    hedger: Optional[HedgePolicy] = None,
+):
+    """Keep every slot busy until the phase has nothing ready, running, judged or merging.
+
+    Exited workers go to the gate pool, passing branches to the merge queue,
+    and the loop carries on dispatching while both work; results are applied
+    to State as they arrive, so a freed slot is refilled at once and
+    dependents unblocked by a merge start without waiting for the rest of the
+    in-flight work. Dispatch stops (but running workers are still gated and
+    merged) while a checkpoint is present. With a ``hedger``, slots left idle
+    after admission go to second copies of straggling workers.
+    """
+    while True:
+        for outcome in stages.gates.results():
+            _finish_gate(outcome, state, dispatcher, stages, config, project_path)
+        stages.flush()
+        for merged in stages.merges.results():
+            _finish_merge(merged, state, dispatcher, stages, config, project_path)
+
+        if not _checkpoint_exists(project_path):
+            for task in dispatcher.admit(state.get_ready_tasks(), state.tasks):
+                _start_task(task, state, dispatcher, config, project_path)
+            if hedger is not None:
+                _start_hedges(hedger, dispatcher, config, project_path)
+
+        if dispatcher.running:
+            for w in dispatcher.wait_any(_next_hedge_check(hedger, dispatcher)):
+                _finish_worker(w, state, dispatcher, stages, config, project_path)
+        elif stages.busy():
+            stages.wait()
+        else:
+            return
+
+
+def _start_task(task: Task, state: State, dispatcher: Dispatcher, config: Config, project_path: str):
+    notify(config, f"Dispatching: {task.id} ({task.title}) -> {task.role}", "info")
+    log_event("task_dispatch", {}, project_path, task_id=task.id, role=task.role, phase=task.phase, model=config.model)
+    try:
+        dispatcher.start(task)
+        state.mark_in_progress(task)
+    except Exception as e:
+        notify(config, f"Failed to start worker for {task.id}: {e}", "error")
+        log_event("task_fail", {"error": str(e)[:200]}, project_path, task_id=task.id, role=task.role, phase=task.phase)
+        state.mark_blocked(task, str(e))
+
+
+def _start_hedges(hedger: HedgePolicy, dispatcher: Dispatcher, config: Config, project_path: str):
+    """Give idle slots to second copies of workers running past their role/phase percentile."""
+    for primary, threshold in hedger.stragglers(dispatcher.running.values()):
+        if not dispatcher.free_slots():
+            return
+        task = primary.task
+        if not dispatcher.can_start_copy(task):
+            continue
+        try:
+            dispatcher.start(task, variant=HEDGE_VARIANT)
+        except Exception as e:
+            notify(config, f"Failed to start hedge for {task.id}: {e}", "warning")
+            continue
+        elapsed = time.time() - primary.started_at
+        log_event(
+            "hedge_start", {"elapsed_s": round(elapsed, 2), "threshold_s": round(threshold, 2)},
+            project_path, task_id=task.id, role=task.role, phase=task.phase,
+        )
+        notify(config, f"Hedging straggler {task.id}: running {format_duration(elapsed)}, p{config.hedge_percentile:g} is {format_duration(threshold)}", "info")
+
+
+def _next_hedge_check(hedger: Optional[HedgePolicy], dispatcher: Dispatcher) -> Optional[float]:
+    """Seconds until the next running worker becomes a hedge candidate (None = no wake-up needed)."""
+    if hedger is None or not dispatcher.free_slots():
+        return None
+    now = time.time()
+    waits = []
+    for w in dispatcher.running.values():
+        if w.variant or dispatcher.siblings(w):
+            continue
+        limit = hedger.threshold(w.task)
+        if limit is not None:
+            waits.append(max(0.0, w.started_at + limit - now))
+    return min(waits) + 0.01 if waits else None
+
+
+def _finish_worker(
+    w: Worker,
+    state: State,
+    dispatcher: Dispatcher,
+    stages: Stages,
+    config: Config,
+    project_path: str,
+):
+    """Hand an exited worker to the gate pool, or fail it if it timed out.
+
+    For a hedged task the first copy to pass is merged and the others are
+    killed; a copy that fails while another is still live is just discarded.
+    """
+    if w.task.status == "done":  # another copy of this task already won
+        _discard_copy(w, dispatcher, project_path)
+        return
+
+    if w.timed_out:
+        error = f"Worker timed out after {w.timeout}s"
+        notify(config, f"Worker {w.task.id} failed: {error}", "error")
+        log_event("task_fail", {"error": error}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=w.duration)
+        if not _drop_failed_copy(w, dispatcher, stages, project_path):
+            _discard_copy(w, dispatcher, project_path)
+            state.mark_blocked(w.task, error)
+        return
+
+    stages.gates.submit(w)
+
+
+def _finish_gate(
+    outcome: GateOutcome,
+    state: State,
+    dispatcher: Dispatcher,
+    stages: Stages,
+    config: Config,
+    project_path: str,
+):
+    """Queue a worker whose gate passed for merging, or hand it to failure handling."""
+    w, result = outcome.worker, outcome.result
+    dur = w.duration
+    if w.task.status == "done" or stages.merging(w.task.id):
+        _discard_copy(w, dispatcher, project_path)  # another copy already merged or is merging
+        return
+
+    timing = {"gate_queue_s": round(outcome.queued_s, 3), "gate_exec_s": round(outcome.exec_s, 3)}
+    if result.passed:
+        log_event("gate_pass", {"summary": result.summary, **timing}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur, model=config.model)
+        stages.merge(w)
+    else:
+        log_event("gate_fail", {"summary": result.summary, "missing": result.missing, **timing}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur, model=config.model)
+        notify(config, f"FAIL: {w.task.id} — {result.summary}", "warning")
+        if not _drop_failed_copy(w, dispatcher, stages, project_path):
+            _discard_copy(w, dispatcher, project_path)  # the fix task starts from main on a new branch
+            _handle_failure(w.task, result.summary, state, config, project_path)
+
+
+def _finish_merge(
+    outcome: MergeOutcome,
+    state: State,
+    dispatcher: Dispatcher,
+    stages: Stages,
+    config: Config,
+    project_path: str,
+):
+    """Record a merged task as done, or hand a conflicting one to failure handling."""
+    w = outcome.worker
+    dur = w.duration
+    dispatcher.release_scope(w)  # merged, or back to a worker that claims it again
+    if outcome.conflict is None:
+        state.mark_done(w.task)
+        log_event("task_complete", task_shape(w.task), project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur, model=config.model)
+        notify(config, f"PASS + merged: {w.task.id}", "info")
+        dispatcher.durations.record(w.task, dur)
+        _cancel_copies(w, dispatcher, project_path)
+        return
+
+    mc = outcome.conflict
+    notify(config, f"Merge conflict on {w.task.id}: {mc.details[:200]}", "error")
+    log_event("task_fail", {"error": f"merge_conflict: {mc.details[:200]}"}, project_path, task_id=w.task.id, role=w.task.role, phase=w.task.phase, duration_s=dur)
+    if not _drop_failed_copy(w, dispatcher, stages, project_path) and not _handle_conflict(w, mc, state, dispatcher, config, project_path):
+        _discard_copy(w, dispatcher, project_path)
+
+
+def _drop_failed_copy(w: Worker, dispatcher: Dispatcher, stages: Stages, project_path: str) -> bool:
+    """Discard a failed copy of a hedged task if another copy is still running, judged or merging."""
+    live = dispatcher.siblings(w) + [c for c in stages.live_copies(w.task.id) if c is not w]
+    if not live:
+        return False
+    _discard_copy(w, dispatcher, project_path)
+    return True
+
+
+def _cancel_copies(winner: Worker, dispatcher: Dispatcher, project_path: str):
+    """Kill the other running copies of ``winner``'s task and clean up after them."""
+    losers = dispatcher.siblings(winner)
+    for loser in losers:
+        dispatcher.cancel(loser)
+        _discard_copy(loser, dispatcher, project_path)
+    if losers or winner.variant:
+        log_event(
+            "hedge_win",
+            {"winner": winner.variant or "primary", "cancelled": [loser.variant or "primary" for loser in losers]},
+            project_path, task_id=winner.task.id, role=winner.task.role, phase=winner.task.phase,
+        )
+
+
+def _discard_copy(w: Worker, dispatcher: Dispatcher, project_path: str):
+    """Release ``w``'s scope and remove its worktree and unmerged branch (a pooled worktree is parked again)."""
+    dispatcher.release_scope(w)
+    cleanup_worktree(w.task, project_path, w.worktree, w.branch, force=True, pool=w.pool)
+
+
+def _generate_phase_tasks(phase: str, project_path: str, config: Config, state: Optional[State] = None) -> list[Task]:
     """Generate tasks for a phase.
 
     For implementation: runs a planner agent to decompose work into atomic tasks
     based on project specs.  For other phases: uses PHASE_ROLES defaults.  In both
-    cases, role_overrides from config are applied.
+    cases, role_overrides from config are applied.  In pipelined mode QA also
+    gets one task per implementation track (see _track_qa_tasks).
     """
     if phase == "implementation":
-        tasks = _plan_implementation_tasks(project_path, config)
+        tasks = _plan_implementation_tasks(project_path, config, state)
+        if tasks:
+            return tasks
+
+    if phase == "qa" and state is not None and state.pipelined:
+        tasks = _track_qa_tasks(state, project_path, config)
         if tasks:
             return tasks
 
@@ -164,6 +461,44 @@ def _generate_phase_tasks(phase: str, project_path: str, config: Config) -> list
     return tasks
 
 
+def _track_qa_tasks(state: State, project_path: str, config: Config) -> list[Task]:
+    """One QA task per implementation track, plus the phase-wide audit after them.
+
+    A track ends at an implementation task no other implementation task depends
+    on; its QA task depends only on that task, so QA on a finished track starts
+    while other tracks are still being built.
+    """
+    role = config.role_overrides.get("qa-engineer", "qa-engineer")
+    if role not in _discover_roles(project_path):
+        return []
+    impl = state.phase_tasks("implementation")
+    depended_on = {d for t in impl for d in t.dependencies}
+    leaves = [t for t in impl if t.id not in depended_on]
+    if len(leaves) < 2:
+        return []
+
+    tasks = [
+        Task(
+            id=f"TASK-QA-{leaf.id}",
+            title=f"QA: {leaf.title}",
+            role=role,
+            phase="qa",
+            dependencies=[leaf.id],
+            file_scope=list(leaf.file_scope),
+            acceptance=f"Test and audit the work delivered by {leaf.id} ({leaf.title}); log issues in qa/issues.md.",
+        )
+        for leaf in leaves
+    ]
+    tasks.append(Task(
+        id="TASK-QA-001",
+        title="Quality audit and testing",
+        role=role,
+        phase="qa",
+        dependencies=[t.id for t in tasks],
+    ))
+    return tasks
+
+
 _PLANNER_PROMPT = """\
 You are a task planner for a software project. Read the provided specs and decompose
 the implementation phase into atomic, parallelizable tasks.
@@ -177,6 +512,7 @@ Output ONLY a JSON array. Each element must have these fields:
 - "required_reads": array of spec file paths the worker needs (e.g. "specs/architecture.md")
 - "acceptance": string, concrete acceptance criteria for this task
 - "timeout": integer, suggested timeout in seconds (0 for default)
+- "resources": array of shared resource names the task needs exclusively, from: {resources} (empty if none)
 
 Guidelines:
 - Create 5-20 tasks depending on project complexity.
@@ -192,31 +528,165 @@ Return ONLY the JSON array, no markdown fences or commentary.
 """
 
 
-def _plan_implementation_tasks(project_path: str, config: Config) -> list[Task]:
-    """Invoke a planner agent to decompose implementation into atomic tasks."""
-    specs_dir = os.path.join(project_path, "specs")
-    if not os.path.isdir(specs_dir):
+def _plan_implementation_tasks(project_path: str, config: Config, state: Optional[State] = None) -> list[Task]:
+    """Invoke a planner agent to decompose implementation into atomic tasks.
+
+    The parsed plan is cached in runtime/plan_cache.json (plan_cache.py) and
+    reused while the specs, roles, overrides and model are unchanged. Specs
+    longer than ``planner_map_reduce_chars`` in total are planned part by part
+    (see _plan_map_reduce); with a ``state`` those parts' tasks are added to
+    the board as they arrive.
+    """
+    specs = spec_files(project_path)
+    if not specs:
         return []
 
-    spec_contents = []
-    for spec_file in sorted(os.listdir(specs_dir)):
-        if not spec_file.endswith(".md"):
-            continue
-        path = os.path.join(specs_dir, spec_file)
-        with open(path) as f:
-            content = f.read()
-        spec_contents.append(f"### specs/{spec_file}\n\n{content}")
+    cache = PlanCache(project_path) if config.planner_cache else None
+    key = plan_key(project_path, config, specs)
+    cached = cache.get(key) if cache is not None else None
+    if cached:
+        notify(config, f"Reusing cached implementation plan ({len(cached)} tasks)", "info")
+        log_event("plan_cache_hit", {"key": key[:16], "tasks": len(cached)}, project_path, phase="implementation", model=config.model)
+        return cached
+
+    limit = config.planner_map_reduce_chars
+    parts = spec_parts(specs, limit) if limit > 0 and sum(len(c) for _, c in specs) > limit else []
+    if len(parts) > 1:
+        tasks, complete = _plan_map_reduce(parts, project_path, config, state)
+    else:
+        tasks, complete = _plan_single(specs, project_path, config), True
 
-    if not spec_contents:
-        return []
+    if tasks and complete and cache is not None:
+        cache.put(key, tasks, config.model, specs)
+    return tasks
 
-    available_roles = _discover_roles(project_path)
-    roles_str = ", ".join(sorted(available_roles))
-    system_prompt = _PLANNER_PROMPT.format(roles=roles_str)
+
+def _plan_single(specs: list[tuple[str, str]], project_path: str, config: Config) -> list[Task]:
+    """Plan every spec in one planner call."""
+    spec_contents = [f"### specs/{name}\n\n{content}" for name, content in specs]
+
+    system_prompt = _PLANNER_PROMPT.format(**_planner_vocabulary(project_path, config))
     user_prompt = "# Project Specs\n\n" + "\n\n---\n\n".join(spec_contents)
 
     notify(config, "Running task planner to decompose implementation phase...", "info")
+    raw = _run_planner(system_prompt, user_prompt, project_path, config)
+    if raw is None:
+        return []
+    return _parse_planner_output(raw, project_path, config)
+
+
+_PLAN_MERGE_PROMPT = """\
+You are a task planner merging implementation plans that were made separately for
+different parts of a project's specs. You are given each part's tasks (one JSON task
+per line); ids are already unique across parts.
+
+Output ONLY a JSON object with two keys:
+- "duplicates": array of {{"drop": id, "keep": id}} for tasks in different parts that
+  describe the same work; the kept task takes over the dropped task's dependents
+- "dependencies": array of {{"id": id, "depends_on": [ids]}} adding dependencies
+  between parts, e.g. an endpoint task on the shared schema task it needs
+
+Rules:
+- Only merge tasks that are genuinely the same work; do not merge related tasks.
+- Only add a dependency when the task cannot be done without the other's output.
+- If nothing needs merging or wiring, return {{"duplicates": [], "dependencies": []}}.
+
+Return ONLY the JSON object, no markdown fences or commentary.
+"""
+
+
+def _plan_map_reduce(
+    parts: list[SpecPart],
+    project_path: str,
+    config: Config,
+    state: Optional[State] = None,
+) -> tuple[list[Task], bool]:
+    """Plan each spec part in parallel, then merge the part plans in one small call.
+
+    Every part is planned with the normal planner prompt and renumbered into
+    its own id block (plan_split.py); each part's tasks go onto the board as
+    soon as they are parsed. The merge pass sees only the task graph and
+    returns duplicates to drop and cross-part dependencies, which are applied
+    to the tasks already on the board. A part whose planner call fails gets a
+    single catch-all task, and the result is reported as incomplete so it is
+    not cached. Returns (tasks, complete).
+    """
+    notify(config, f"Running task planner on {len(parts)} spec parts in parallel...", "info")
+    system_prompt = _PLANNER_PROMPT.format(**_planner_vocabulary(project_path, config))
+    available_roles = _discover_roles(project_path)
+    labels = ", ".join(p.label for p in parts)
+    planned: dict[int, list[Task]] = {}
+    complete = True
+
+    def plan_part(index: int) -> list[Task]:
+        part = parts[index - 1]
+        user_prompt = (
+            f"# Project Specs — part {index} of {len(parts)}: {part.label}\n\n"
+            f"The specs are planned in parts ({labels}); the other parts are planned separately. "
+            f"Create tasks only for the work described in this part.\n\n{part.text}"
+        )
+        start = time.time()
+        raw = _run_planner(system_prompt, user_prompt, project_path, config)
+        tasks = renumber(_parse_planner_output(raw, project_path, config), index) if raw is not None else []
+        log_event("plan_part", {"part": part.label, "tasks": len(tasks)}, project_path, phase="implementation", duration_s=time.time() - start, model=config.model)
+        return tasks
+
+    with ThreadPoolExecutor(max_workers=max(1, config.planner_concurrency), thread_name_prefix="planner") as pool:
+        futures = {pool.submit(plan_part, i): i for i in range(1, len(parts) + 1)}
+        for future in as_completed(futures):
+            index = futures[future]
+            tasks = future.result()
+            if not tasks:
+                complete = False
+                part = parts[index - 1]
+                notify(config, f"Planning failed for spec part {part.label}; adding a catch-all task for it", "warning")
+                tasks = renumber([_planner_task({
+                    "title": f"Implement specs: {part.label}",
+                    "required_reads": [f"specs/{part.name}"],
+                    "acceptance": f"Everything specified in {part.label} is implemented and tested.",
+                }, 1, available_roles, config)], index)
+            planned[index] = tasks
+            if state is not None:
+                state.add_tasks(tasks)
+
+    ordered = [(parts[i - 1], planned[i]) for i in sorted(planned)]
+    tasks = [t for _, part_tasks in ordered for t in part_tasks]
+    raw = _run_planner(_PLAN_MERGE_PROMPT, "# Part Plans\n\n" + format_parts(ordered), project_path, config)
+    try:
+        merge = parse_merge(raw) if raw is not None else None
+    except (ValueError, json.JSONDecodeError) as e:
+        notify(config, f"Plan merge output unusable ({e}); keeping the part plans unmerged", "error")
+        merge = None
+    if merge is None:
+        return tasks, False
+
+    changed, dropped = apply_merge(tasks, merge)
+    by_id = {t.id: t for t in tasks}
+    for task_id, deps in changed.items():
+        if state is not None:
+            state.update_task(by_id[task_id], {"dependencies": deps})
+        else:
+            by_id[task_id].dependencies = deps
+    if dropped and state is not None:
+        state.remove_tasks(dropped)
+    tasks = [t for t in tasks if t.id not in dropped]
+    log_event(
+        "plan_merge", {"parts": len(parts), "tasks": len(tasks), "dropped": dropped, "rewired": sorted(changed)},
+        project_path, phase="implementation", model=config.model,
+    )
+    notify(config, f"Merged {len(parts)} part plans: {len(tasks)} tasks, {len(dropped)} duplicates dropped", "info")
+    return tasks, complete
+
+
+def _planner_vocabulary(project_path: str, config: Config) -> dict:
+    return {
+        "roles": ", ".join(sorted(_discover_roles(project_path))),
+        "resources": ", ".join(sorted(config.resource_tokens)) or "(none configured)",
+    }
+
 
+def _run_planner(system_prompt: str, user_prompt: str, project_path: str, config: Config) -> Optional[str]:
+    """Run the planner agent and return its stdout (None on failure)."""
     try:
         result = subprocess.run(
             [
@@ -233,13 +703,12 @@ def _plan_implementation_tasks(project_path: str, config: Config) -> list[Task]:
         )
     except (subprocess.TimeoutExpired, FileNotFoundError) as e:
         notify(config, f"Task planner failed: {e}", "error")
-        return []
+        return None
 
     if result.returncode != 0:
         notify(config, f"Task planner exited with code {result.returncode}", "error")
-        return []
-
-    return _parse_planner_output(result.stdout, project_path, config)
+        return None
+    return result.stdout
 
 
 def _parse_planner_output(raw: str, project_path: str, config: Config) -> list[Task]:
@@ -258,30 +727,109 @@ def _parse_planner_output(raw: str, project_path: str, config: Config) -> list[T
     available_roles = _discover_roles(project_path)
     tasks = []
     for item in items:
-        if not isinstance(item, dict):
-            continue
-        role = item.get("role", "fullstack-engineer")
-        resolved = config.role_overrides.get(role, role)
-        if resolved not in available_roles:
-            resolved = "fullstack-engineer"
-
-        task = Task(
-            id=item.get("id", f"TASK-IMP-{len(tasks)+1:03d}"),
-            title=item.get("title", "Untitled task"),
-            role=resolved,
-            phase="implementation",
-            dependencies=item.get("dependencies", []),
-            file_scope=item.get("file_scope", []),
-            required_reads=item.get("required_reads", []),
-            acceptance=item.get("acceptance", ""),
-            timeout=int(item.get("timeout", 0)),
-        )
-        tasks.append(task)
+        if isinstance(item, dict):
+            tasks.append(_planner_task(item, len(tasks) + 1, available_roles, config))
 
     notify(config, f"Task planner generated {len(tasks)} implementation tasks", "info")
     return tasks
 
 
+def _planner_task(item: dict, number: int, available_roles: set[str], config: Config) -> Task:
+    """Build an implementation Task from one planner item."""
+    role = item.get("role", "fullstack-engineer")
+    resolved = config.role_overrides.get(role, role)
+    if resolved not in available_roles:
+        resolved = "fullstack-engineer"
+
+    return Task(
+        id=item.get("id", f"TASK-IMP-{number:03d}"),
+        title=item.get("title", "Untitled task"),
+        role=resolved,
+        phase="implementation",
+        dependencies=item.get("dependencies", []),
+        file_scope=item.get("file_scope", []),
+        required_reads=item.get("required_reads", []),
+        acceptance=item.get("acceptance", ""),
+        timeout=int(item.get("timeout", 0)),
+        resources=[r for r in item.get("resources", []) if r in config.resource_tokens],
+    )
+
+
+_REPLANNER_PROMPT = """\
+You are a task planner updating an existing implementation plan after the project
+specs were edited. You are given the current task graph (one JSON task per line,
+with its status) and only the spec sections that changed.
+
+Output ONLY a JSON object with three keys:
+- "add": array of new tasks, each with the fields "id" (format "TASK-IMP-NNN",
+  continuing after the highest existing number), "title", "role", "dependencies",
+  "file_scope", "required_reads", "acceptance", "timeout" and "resources"
+- "modify": array of objects with the "id" of an existing task plus only the fields
+  to change (title, role, dependencies, file_scope, required_reads, acceptance,
+  timeout, resources)
+- "cancel": array of ids of existing tasks that are no longer needed
+
+Rules:
+- Never modify or cancel a task whose status is done or in_progress. If finished
+  work has to change, add a follow-up task that depends on it.
+- Leave tasks the changes do not affect out of the output.
+- If the changes need no plan updates, return {{"add": [], "modify": [], "cancel": []}}.
+- Resources, from: {resources}
+
+Available roles: {roles}
+
+Return ONLY the JSON object, no markdown fences or commentary.
+"""
+
+
+def _replan_on_spec_changes(state: State, project_path: str, config: Config):
+    """Update the implementation tasks in place if specs/ changed since they were planned.
+
+    Only the changed spec sections and the current task graph go to the
+    planner; its add/modify/cancel operations are applied to State, leaving
+    done and in-progress tasks untouched (replan.py). Runs while the
+    implementation phase has unfinished tasks and the cached plan is not pinned.
+    """
+    if not (config.incremental_replan and config.planner_cache):
+        return
+    impl = state.phase_tasks("implementation")
+    if not impl or all(t.status == "done" for t in impl):
+        return
+    cache = PlanCache(project_path)
+    entry = cache.load()
+    specs = spec_files(project_path)
+    if entry is None or entry.get("pinned") or not entry.get("specs") or dict(specs) == entry["specs"]:
+        return
+
+    changes = diff_specs(entry["specs"], dict(specs))
+    notify(config, f"Specs changed ({len(changes)} section(s)); re-planning implementation incrementally...", "info")
+    user_prompt = (
+        "# Current Task Graph\n\n" + format_task_graph(impl)
+        + "\n\n# Changed Spec Sections\n\n" + format_changes(changes)
+    )
+    raw = _run_planner(_REPLANNER_PROMPT.format(**_planner_vocabulary(project_path, config)), user_prompt, project_path, config)
+    if raw is None:
+        return
+    try:
+        ops = parse_ops(raw)
+    except (ValueError, json.JSONDecodeError) as e:
+        notify(config, f"Incremental re-plan output unusable ({e}); keeping the current plan", "error")
+        return
+
+    available_roles = _discover_roles(project_path)
+    report = apply_ops(state, ops, lambda item, n: _planner_task(item, n, available_roles, config))
+    log_event("replan", {"changed_sections": [c.section for c in changes], **report}, project_path, phase="implementation", model=config.model)
+    notify(
+        config,
+        f"Re-plan applied: {len(report['added'])} added, {len(report['modified'])} modified, "
+        f"{len(report['cancelled'])} cancelled, {len(report['skipped'])} skipped",
+        "info",
+    )
+    if report["cancelled"]:
+        state.log_decision("Tasks cancelled by incremental re-plan", f"Spec edits made {', '.join(report['cancelled'])} unnecessary.")
+    cache.put(plan_key(project_path, config, specs), state.phase_tasks("implementation"), config.model, specs)
+
+
 def _discover_roles(project_path: str) -> set[str]:
     """Return set of available role names from harness/agents/ directory."""
     agents_dir = os.path.join(project_path, "harness", "agents")
@@ -294,12 +842,27 @@ def _discover_roles(project_path: str) -> set[str]:
     }
 
 
-def _handle_failure(task: Task, evidence: str, state: State, config: Config, project_path: str):
-    """Handle a task failure: retry or escalate."""
+def _handle_failure(
+    task: Task,
+    evidence: str,
+    state: State,
+    config: Config,
+    project_path: str,
+    notify_fn: Optional[Callable[..., None]] = None,
+):
+    """Handle a task failure: retry or escalate.
+
+    A retry adds a ``-fixN`` task and marks the failed one superseded, so it
+    no longer runs and counts as done once its fix is merged.
+
+    ``notify_fn`` replaces ``notify`` for engines that must not block on the
+    webhook (the async engine queues it behind its notification semaphore).
+    """
+    notify_fn = notify_fn or notify
     task.retries += 1
     if task.retries > config.max_retries:
         state.mark_blocked(task, evidence)
-        notify(config, f"BLOCKED (max retries): {task.id} — {evidence[:200]}", "error")
+        notify_fn(config, f"BLOCKED (max retries): {task.id} — {evidence[:200]}", "error")
         _create_checkpoint(project_path)
     else:
         fix_task = Task(
@@ -311,7 +874,38 @@ def _handle_failure(task: Task, evidence: str, state: State, config: Config, pro
             retries=task.retries,
         )
         state.add_tasks([fix_task])
-        notify(config, f"Retry {task.retries}/{config.max_retries}: {task.id}", "info")
+        state.mark_superseded(task, f"superseded by {fix_task.id}: {evidence}")
+        notify_fn(config, f"Retry {task.retries}/{config.max_retries}: {task.id}", "info")
+
+
+def _handle_conflict(
+    w: Worker,
+    mc: MergeConflict,
+    state: State,
+    dispatcher: Dispatcher,
+    config: Config,
+    project_path: str,
+    notify_fn: Optional[Callable[..., None]] = None,
+) -> bool:
+    """Send a branch whose automatic rebase failed back to its worker to resolve in place.
+
+    The task keeps its worktree, scope, dependencies and required reads, and
+    the attempt counts as a retry; conflicts without known paths, and tasks
+    out of retries, go through _handle_failure as before. Returns False in
+    that case: the worktree and branch are no longer needed and the caller
+    cleans them up.
+    """
+    notify_fn = notify_fn or notify
+    task = w.task
+    if not (config.conflict_resolution and mc.paths and os.path.isdir(w.worktree)) or task.retries >= config.max_retries:
+        _handle_failure(task, f"Merge conflict: {mc.details}", state, config, project_path, notify_fn)
+        return False
+    task.retries += 1
+    dispatcher.resolve_in_place(w)
+    state.mark_ready(task)
+    log_event("conflict_resolve", {"paths": mc.paths}, project_path, task_id=task.id, role=task.role, phase=task.phase, retry_count=task.retries)
+    notify_fn(config, f"Resolving merge conflict on {task.id} in its worktree ({', '.join(mc.paths)}); retry {task.retries}/{config.max_retries}", "info")
+    return True
 
 
 def _checkpoint_exists(project_path: str) -> bool:
@@ -322,10 +916,3 @@ def _create_checkpoint(project_path: str):
     os.makedirs(os.path.join(project_path, "runtime"), exist_ok=True)
     with open(os.path.join(project_path, "runtime", ".checkpoint"), "w") as f:
         f.write(f"Paused at {time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime())}\n")
-
-
-def _wait_for_resume(project_path: str):
-    """Block until checkpoint file is removed (by --resume flag or manual deletion)."""
-    checkpoint = os.path.join(project_path, "runtime", ".checkpoint")
-    while os.path.exists(checkpoint):
-        time.sleep(5)
@@ -0,0 +1,117 @@
+"""Persistent cache of the implementation planner's task list.
+
+The parsed planner output is stored in runtime/plan_cache.json together with
+a SHA-256 of everything the planner sees — the spec files, the available
+roles, role overrides, resource tokens and the model — so a resumed or
+restarted run reuses the plan instead of re-running the planner. The specs
+themselves are kept too, so replan.py can diff them after an edit. Only the
+plan is stored — each task's plan fields, without run state such as status
+or retries, and without the ``-fixN`` tasks failures add — so a reused plan
+always starts from ready tasks. A pinned
+plan is reused even after the specs change, until it is unpinned or
+invalidated (``harness_cli.py plan ...``).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Optional
+
+from config import Config
+from state import Task
+
+CACHE_VERSION = 1
+
+PLAN_FIELDS = (
+    "id", "title", "role", "phase", "priority", "dependencies", "file_scope",
+    "required_reads", "acceptance", "timeout", "resources",
+)
+_FIX_TASK = re.compile(r"-fix\d+$")
+
+
+def spec_files(project_path: str) -> list[tuple[str, str]]:
+    """(name, content) of every markdown file in specs/, sorted by name."""
+    specs_dir = os.path.join(project_path, "specs")
+    if not os.path.isdir(specs_dir):
+        return []
+    files = []
+    for name in sorted(os.listdir(specs_dir)):
+        if not name.endswith(".md"):
+            continue
+        with open(os.path.join(specs_dir, name)) as f:
+            files.append((name, f.read()))
+    return files
+
+
+def plan_key(project_path: str, config: Config, specs: Optional[list[tuple[str, str]]] = None) -> str:
+    """Hash of the planner's inputs for this project and config."""
+    agents_dir = os.path.join(project_path, "harness", "agents")
+    roles = sorted(os.path.splitext(f)[0] for f in os.listdir(agents_dir) if f.endswith(".md")) if os.path.isdir(agents_dir) else []
+    payload = {
+        "specs": specs if specs is not None else spec_files(project_path),
+        "roles": roles,
+        "role_overrides": dict(sorted(config.role_overrides.items())),
+        "resources": sorted(config.resource_tokens),
+        "model": config.model,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class PlanCache:
+    """The cached plan for one project: its key, tasks and pin state."""
+
+    def __init__(self, project_path: str):
+        self.path = os.path.join(project_path, "runtime", "plan_cache.json")
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return raw if raw.get("version") == CACHE_VERSION else None
+
+    def get(self, key: str) -> Optional[list[Task]]:
+        """Cached tasks, all ready, if they were planned for ``key`` or the plan is pinned, else None."""
+        entry = self.load()
+        if entry is None or (entry["key"] != key and not entry.get("pinned")):
+            return None
+        return [Task(**{f: t[f] for f in PLAN_FIELDS if f in t}) for t in entry["tasks"]]
+
+    def put(self, key: str, tasks: list[Task], model: str = "", specs: Optional[list[tuple[str, str]]] = None):
+        """Store the plan fields of ``tasks`` (fix tasks left out) as the plan for ``key``, with the specs they were planned from."""
+        self._save({
+            "version": CACHE_VERSION,
+            "key": key,
+            "pinned": False,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "model": model,
+            "specs": dict(specs or []),
+            "tasks": [{f: getattr(t, f) for f in PLAN_FIELDS} for t in tasks if not _FIX_TASK.search(t.id)],
+        })
+
+    def pin(self, pinned: bool = True) -> bool:
+        """Pin (or unpin) the cached plan; False if there is none."""
+        entry = self.load()
+        if entry is None:
+            return False
+        entry["pinned"] = pinned
+        self._save(entry)
+        return True
+
+    def invalidate(self) -> bool:
+        """Drop the cached plan; False if there was none."""
+        try:
+            os.remove(self.path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _save(self, entry: dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, self.path)
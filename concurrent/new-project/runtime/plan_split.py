@@ -0,0 +1,147 @@
+"""Map-reduce planning of the implementation phase for large spec sets.
+
+When the specs are too big for one planner prompt, each spec file (split at
+markdown sections if it is itself too big) is planned as a separate part, in
+parallel. Each part's tasks are renumbered into their own id block
+(``TASK-IMP-101``.., ``TASK-IMP-201``..) so parts never collide, and a final
+merge pass sees only the compact task graph — not the specs — and answers with
+duplicates to fold together and cross-part dependencies to add. Planning
+latency then follows the largest part plus one small merge call.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from replan import format_task_graph, spec_sections
+from state import Task
+
+ID_BLOCK = 100  # ids per part: part 1 gets TASK-IMP-101..199
+
+
+@dataclass
+class SpecPart:
+    name: str  # spec file name
+    label: str  # "api.md" or "api.md (2/3)"
+    text: str  # markdown, with each file's "### specs/<name>" header
+
+
+@dataclass
+class PlanMerge:
+    duplicates: list[tuple[str, str]] = field(default_factory=list)  # (drop, keep)
+    dependencies: dict[str, list[str]] = field(default_factory=dict)  # id -> ids to add
+
+
+def spec_parts(specs: list[tuple[str, str]], max_chars: int) -> list[SpecPart]:
+    """One part per spec file; a file longer than ``max_chars`` is split between sections."""
+    parts = []
+    for name, content in specs:
+        if len(content) <= max_chars:
+            parts.append(SpecPart(name, name, f"### specs/{name}\n\n{content}"))
+            continue
+        chunks, current = [], ""
+        for section in spec_sections(name, content).values():
+            if current and len(current) + len(section) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += section
+        if current:
+            chunks.append(current)
+        for i, chunk in enumerate(chunks, 1):
+            label = f"{name} ({i}/{len(chunks)})" if len(chunks) > 1 else name
+            parts.append(SpecPart(name, label, f"### specs/{name}\n\n{chunk}"))
+    return parts
+
+
+def renumber(tasks: list[Task], part: int) -> list[Task]:
+    """Move a part's tasks into its id block, keeping only dependencies within the part."""
+    tasks = tasks[: ID_BLOCK - 1]
+    ids = {t.id: f"TASK-IMP-{part * ID_BLOCK + n:03d}" for n, t in enumerate(tasks, 1)}
+    for t in tasks:
+        t.id = ids[t.id]
+        t.dependencies = [ids[d] for d in t.dependencies if d in ids and ids[d] != t.id]
+    return tasks
+
+
+def format_parts(parts: list[tuple[SpecPart, list[Task]]]) -> str:
+    return "\n\n".join(f"## Part: {part.label}\n\n{format_task_graph(tasks)}" for part, tasks in parts if tasks)
+
+
+def parse_merge(raw: str) -> PlanMerge:
+    """Parse the merge pass's JSON object; raises ValueError when there is none."""
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in plan merge output")
+    data = json.loads(match.group())
+    if not isinstance(data, dict):
+        raise ValueError("plan merge output is not a JSON object")
+    merge = PlanMerge()
+    for d in data.get("duplicates", []):
+        if isinstance(d, dict) and d.get("drop") and d.get("keep"):
+            merge.duplicates.append((str(d["drop"]), str(d["keep"])))
+    for d in data.get("dependencies", []):
+        if isinstance(d, dict) and d.get("id") and isinstance(d.get("depends_on"), list):
+            merge.dependencies.setdefault(str(d["id"]), []).extend(str(x) for x in d["depends_on"])
+    return merge
+
+
+def apply_merge(tasks: list[Task], merge: PlanMerge) -> tuple[dict[str, list[str]], list[str]]:
+    """New dependency lists and the ids to drop after applying ``merge`` to ``tasks``.
+
+    A dropped duplicate's dependents are pointed at the task it folds into.
+    Ids that do not exist are ignored, and dependencies that would create a
+    cycle are left out.
+    """
+    deps = {t.id: list(t.dependencies) for t in tasks}
+    into: dict[str, str] = {}
+    for drop, keep in merge.duplicates:
+        while keep in into:
+            keep = into[keep]
+        if drop in deps and keep in deps and drop != keep and drop not in into:
+            into[drop] = keep
+            deps[keep] = _union(deps[keep], deps[drop])
+
+    def resolve(task_id: str) -> str:
+        while task_id in into:
+            task_id = into[task_id]
+        return task_id
+
+    for task_id in list(deps):
+        deps[task_id] = [d for d in _union([], [resolve(d) for d in deps[task_id]]) if d != resolve(task_id) and d in deps]
+    for task_id in deps:  # folding a duplicate's dependencies into its keeper can close a cycle
+        deps[task_id] = [d for d in deps[task_id] if not _reaches(deps, d, task_id)]
+    for task_id, extra in merge.dependencies.items():
+        task_id = resolve(task_id)
+        if task_id not in deps or task_id in into:
+            continue
+        for dep in (resolve(d) for d in extra):
+            if dep in deps and dep not in into and dep != task_id and dep not in deps[task_id] \
+                    and not _reaches(deps, dep, task_id):
+                deps[task_id].append(dep)
+
+    for drop in into:
+        del deps[drop]
+    changed = {t.id: deps[t.id] for t in tasks if t.id in deps and deps[t.id] != t.dependencies}
+    return changed, list(into)
+
+
+def _union(a: list[str], b: list[str]) -> list[str]:
+    """``a`` followed by the items of ``b`` not already seen, in order."""
+    out = list(a)
+    for x in b:
+        if x not in out:
+            out.append(x)
+    return out
+
+
+def _reaches(deps: dict[str, list[str]], start: str, target: str) -> bool:
+    """Whether ``target`` is among ``start``'s transitive dependencies."""
+    seen, stack = set(), [start]
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node not in seen:
+            seen.add(node)
+            stack.extend(deps.get(node, []))
+    return False
@@ -0,0 +1,172 @@
+"""Rule-based checks run before the LLM judge.
+
+Mechanical failures — a missing spec, an empty ``src/``, template slots left
+in the docs, a failing test command — are caught here in milliseconds, so the
+judge is only called for work that could plausibly pass. Rules are declared
+per phase in config.yaml's ``pre_gate_rules``; with ``pre_gate_builtin`` the
+phases not listed there use ``PRE_GATE_RULES`` (next to ``GATE_CRITERIA`` in
+gates.py). Each rule is a dict with a ``rule`` kind:
+
+- ``exists``: every path in ``paths`` exists (``any: true``: at least one)
+- ``non_empty``: every path is a non-empty file or a directory with files in it
+- ``no_placeholders``: no ``patterns`` (default: TODO/TBD/FIXME, lorem ipsum,
+  template slots) match in ``paths`` (directories: their .md files)
+- ``sections``: the markdown file ``path`` has a heading for each of ``headings``
+- ``command``: the shell command ``run`` exits 0 in the worker's tree within ``timeout`` seconds
+
+Paths are relative to the tree being judged.
+"""
+
+import os
+import re
+import subprocess
+
+# An unfilled template slot such as "[Project Name]" (markdown links and
+# checkboxes are not slots)
+TEMPLATE_SLOT = r"\[[A-Z][A-Za-z]*(?: [A-Za-z]+){0,3}\](?![(\[:])"
+
+PRE_GATE_RULES = {
+    "requirements": [
+        {"rule": "non_empty", "paths": ["specs/requirements.md"]},
+        {"rule": "sections", "path": "specs/requirements.md", "headings": ["Functional Requirements"]},
+        {"rule": "no_placeholders", "paths": ["specs/requirements.md"], "patterns": [TEMPLATE_SLOT]},
+    ],
+    "implementation": [
+        {"rule": "non_empty", "paths": ["src/", "tests/"], "any": True},
+    ],
+    "qa": [
+        {"rule": "non_empty", "paths": ["qa/test-plan.md", "qa/issues.md"]},
+    ],
+    "documentation": [
+        {"rule": "non_empty", "paths": ["docs/README.md", "docs/SETUP.md"]},
+        # only the docs the phase must write, and only unfilled slots: other docs
+        # (e.g. the API.md template of a project without an API) and prose that
+        # mentions TODO are left to the judge
+        {"rule": "no_placeholders", "paths": ["docs/README.md", "docs/SETUP.md"], "patterns": [TEMPLATE_SLOT]},
+    ],
+    "growth": [
+        {"rule": "non_empty", "paths": ["specs/growth-plan.md"]},
+    ],
+    "review": [
+        {"rule": "exists", "paths": ["STATUS.md", "DECISIONS.md"]},
+    ],
+}
+
+DEFAULT_PLACEHOLDERS = [r"\bTODO\b", r"\bTBD\b", r"\bFIXME\b", r"(?i)lorem ipsum", TEMPLATE_SLOT]
+
+MAX_VIOLATIONS = 10
+_IGNORED = {".git", ".gitkeep", ".worker_output.txt", "node_modules", "__pycache__"}
+
+
+def check(phase: str, tree: str, rules: dict[str, list[dict]], default_timeout: int = 120, builtin: bool = True) -> list[str]:
+    """Violations of ``phase``'s rules in ``tree`` (empty when every rule holds).
+
+    A phase missing from ``rules`` gets its ``PRE_GATE_RULES`` if ``builtin``, else no checks.
+    """
+    phase_rules = rules[phase] if phase in rules else PRE_GATE_RULES.get(phase, []) if builtin else []
+    violations = []
+    for rule in phase_rules:
+        kind = rule.get("rule", "")
+        checker = _CHECKS.get(kind)
+        if checker is None:
+            violations.append(f"unknown pre-gate rule: {kind!r}")
+        else:
+            violations.extend(checker(rule, tree, default_timeout))
+        if len(violations) >= MAX_VIOLATIONS:
+            break
+    return violations[:MAX_VIOLATIONS]
+
+
+def _check_exists(rule: dict, tree: str, _timeout: int) -> list[str]:
+    return _check_paths(rule, tree, os.path.exists, "missing")
+
+
+def _check_non_empty(rule: dict, tree: str, _timeout: int) -> list[str]:
+    return _check_paths(rule, tree, _has_content, "missing or empty")
+
+
+def _check_paths(rule: dict, tree: str, ok, problem: str) -> list[str]:
+    paths = list(rule.get("paths", []))
+    failed = [p for p in paths if not ok(os.path.join(tree, p))]
+    if not failed or (rule.get("any") and len(failed) < len(paths)):
+        return []
+    if rule.get("any"):
+        return [f"{problem}: all of {', '.join(paths)}"]
+    return [f"{problem}: {p}" for p in failed]
+
+
+def _check_placeholders(rule: dict, tree: str, _timeout: int) -> list[str]:
+    patterns = [re.compile(p) for p in rule.get("patterns", DEFAULT_PLACEHOLDERS)]
+    violations = []
+    for rel in _expand(rule.get("paths", []), tree):
+        try:
+            with open(os.path.join(tree, rel), errors="replace") as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for lineno, line in enumerate(lines, 1):
+            match = next((m for m in (p.search(line) for p in patterns) if m), None)
+            if match:
+                violations.append(f"placeholder in {rel}:{lineno}: {match.group()}")
+                break  # one per file is enough to fail it
+    return violations
+
+
+def _check_sections(rule: dict, tree: str, _timeout: int) -> list[str]:
+    rel = rule.get("path", "")
+    try:
+        with open(os.path.join(tree, rel), errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return [f"missing: {rel}"]
+    found = {m.group(1).strip().lower() for m in re.finditer(r"^#{1,6}\s+(.+?)\s*#*\s*$", text, re.MULTILINE)}
+    return [f"missing section in {rel}: {h}" for h in rule.get("headings", []) if h.strip().lower() not in found]
+
+
+def _check_command(rule: dict, tree: str, default_timeout: int) -> list[str]:
+    cmd = rule.get("run", "")
+    timeout = int(rule.get("timeout", default_timeout))
+    try:
+        result = subprocess.run(cmd, shell=True, cwd=tree, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return [f"command timed out after {timeout}s: {cmd}"]
+    if result.returncode != 0:
+        tail = (result.stdout + result.stderr).strip()[-300:]
+        return [f"command failed (exit {result.returncode}): {cmd}" + (f"\n{tail}" if tail else "")]
+    return []
+
+
+_CHECKS = {
+    "exists": _check_exists,
+    "non_empty": _check_non_empty,
+    "no_placeholders": _check_placeholders,
+    "sections": _check_sections,
+    "command": _check_command,
+}
+
+
+def _has_content(full: str) -> bool:
+    if os.path.isfile(full):
+        return os.path.getsize(full) > 0
+    for _, dirs, files in os.walk(full):
+        dirs[:] = [d for d in dirs if d not in _IGNORED]
+        if any(f not in _IGNORED for f in files):
+            return True
+    return False
+
+
+def _expand(paths: list[str], tree: str) -> list[str]:
+    """Files named in ``paths``, with directories expanded to the .md files under them."""
+    files = []
+    for rel in paths:
+        full = os.path.join(tree, rel)
+        if os.path.isfile(full):
+            files.append(rel)
+            continue
+        for root, dirs, names in os.walk(full):
+            dirs[:] = sorted(d for d in dirs if d not in _IGNORED)
+            files.extend(
+                os.path.relpath(os.path.join(root, n), tree)
+                for n in sorted(names) if n.endswith(".md")
+            )
+    return files
@@ -0,0 +1,120 @@
+"""Completion-order reaping of worker processes.
+
+On Linux each worker's process is watched through a pidfd registered with a
+selector, so the orchestrator wakes the moment any worker exits and handles
+workers in the order they actually finish. Where pidfds are unavailable
+(other platforms, old kernels) the reaper falls back to polling. Other fds
+(such as the checkpoint watch in control.py) can be added as wakeups that end
+a wait early.
+"""
+
+import os
+import selectors
+import time
+from typing import Optional
+
+from worker import Worker
+
+
+class Reaper:
+    """Waits on a set of running workers and yields them as they exit."""
+
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self._selector = selectors.DefaultSelector()
+        self._workers: dict[str, Worker] = {}
+        self._pidfds: dict[str, int] = {}
+        self._wakeups: list[int] = []
+
+    def add(self, worker: Worker):
+        self._workers[worker.key] = worker
+        fd = _open_pidfd(worker.pid)
+        if fd is not None:
+            self._pidfds[worker.key] = fd
+            self._selector.register(fd, selectors.EVENT_READ, worker.key)
+
+    def add_wakeup(self, fd: int):
+        """Also return from ``wait`` (with no workers) when ``fd`` becomes readable."""
+        self._wakeups.append(fd)
+        self._selector.register(fd, selectors.EVENT_READ, None)
+
+    def remove(self, worker: Worker):
+        self._workers.pop(worker.key, None)
+        fd = self._pidfds.pop(worker.key, None)
+        if fd is not None:
+            self._selector.unregister(fd)
+            os.close(fd)
+
+    def wait(self, timeout: Optional[float] = None) -> list[Worker]:
+        """Wait up to ``timeout`` seconds and return exited workers in exit order.
+
+        The wait is also cut short at the earliest worker deadline so that
+        timed-out workers are killed (by ``Worker.poll``) without delay.
+        """
+        if not self._workers:
+            return []
+
+        now = time.time()
+        earliest = min(w.deadline for w in self._workers.values())
+        wait_s = max(0.0, earliest - now)
+        if timeout is not None:
+            wait_s = min(wait_s, timeout)
+        if len(self._pidfds) < len(self._workers):
+            wait_s = min(wait_s, self.poll_interval)
+
+        signalled: list[str] = []
+        if self._pidfds or self._wakeups:
+            signalled = [key.data for key, _ in self._selector.select(wait_s) if key.data is not None]
+        else:
+            time.sleep(wait_s)
+
+        order = signalled + [tid for tid in self._workers if tid not in signalled]
+        return [self._workers[tid] for tid in order if self._workers[tid].poll() is not None]
+
+    def close(self):
+        for worker in list(self._workers.values()):
+            self.remove(worker)
+        for fd in self._wakeups:
+            self._selector.unregister(fd)
+        self._wakeups = []
+        self._selector.close()
+
+
+class WakeupPipe:
+    """Self-pipe that lets a background thread wake a selector (``add_wakeup``)."""
+
+    def __init__(self):
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def notify(self):
+        os.write(self._write_fd, b"\0")
+
+    def changed(self) -> bool:
+        """Drain the pipe; True if ``notify`` was called since the last drain."""
+        woke = False
+        while True:
+            try:
+                if not os.read(self._read_fd, 512):
+                    return woke
+                woke = True
+            except BlockingIOError:
+                return woke
+
+    def close(self):
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """Return a pidfd for ``pid``, or None when the platform cannot provide one."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        return None
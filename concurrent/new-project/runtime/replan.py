@@ -0,0 +1,144 @@
+"""Incremental re-planning of the implementation phase after spec edits.
+
+The specs used for the last plan are kept in the plan cache (plan_cache.py).
+When they differ from specs/ on disk, the changed markdown sections are
+diffed and sent to the planner together with the existing task graph, and
+the planner answers with add/modify/cancel operations. Operations are applied
+to ``State.tasks`` here; tasks that are done or in progress are never
+modified or cancelled, so completed work survives a spec edit.
+"""
+
+import difflib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from state import State, Task
+
+# Fields the planner may change on an existing task
+MODIFIABLE = ("title", "role", "dependencies", "file_scope", "required_reads", "acceptance", "timeout", "resources")
+_LOCKED_STATUSES = ("done", "in_progress", "superseded")
+_HEADING = re.compile(r"^#{1,6}\s+\S.*$", re.MULTILINE)
+
+
+@dataclass
+class SpecChange:
+    section: str  # "architecture.md > ## Data model"
+    kind: str  # added | changed | removed
+    text: str  # new section text, a unified diff, or the removed section
+
+
+@dataclass
+class PlanOps:
+    add: list[dict] = field(default_factory=list)
+    modify: list[dict] = field(default_factory=list)
+    cancel: list[str] = field(default_factory=list)
+
+
+def spec_sections(name: str, text: str) -> dict[str, str]:
+    """Split a markdown spec into sections keyed by file and heading."""
+    sections: dict[str, str] = {}
+    starts = [m.start() for m in _HEADING.finditer(text)]
+    if not starts or starts[0] > 0:
+        starts.insert(0, 0)
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        body = text[start:end]
+        first = body.split("\n", 1)[0].strip()
+        heading = first if _HEADING.match(first) else "(preamble)"
+        key = base = f"{name} > {heading}"
+        n = 2
+        while key in sections:
+            key, n = f"{base} ({n})", n + 1
+        if body.strip():
+            sections[key] = body
+    return sections
+
+
+def diff_specs(old: dict[str, str], new: dict[str, str]) -> list[SpecChange]:
+    """Section-level changes between two {spec name: content} snapshots."""
+    before = {k: v for name, text in sorted(old.items()) for k, v in spec_sections(name, text).items()}
+    after = {k: v for name, text in sorted(new.items()) for k, v in spec_sections(name, text).items()}
+    changes = []
+    for key, text in after.items():
+        if key not in before:
+            changes.append(SpecChange(key, "added", text))
+        elif before[key] != text:
+            diff = difflib.unified_diff(before[key].splitlines(), text.splitlines(), lineterm="", n=1)
+            changes.append(SpecChange(key, "changed", "\n".join(list(diff)[2:])))
+    changes.extend(SpecChange(key, "removed", text) for key, text in before.items() if key not in after)
+    return changes
+
+
+def format_changes(changes: list[SpecChange]) -> str:
+    return "\n\n".join(f"### specs/{c.section} ({c.kind})\n\n{c.text.strip()}" for c in changes)
+
+
+def format_task_graph(tasks: list[Task]) -> str:
+    """One JSON line per task, with the fields the planner needs to reason about the graph."""
+    return "\n".join(
+        json.dumps({
+            "id": t.id, "title": t.title, "role": t.role, "status": t.status,
+            "dependencies": t.dependencies, "file_scope": t.file_scope, "acceptance": t.acceptance,
+        })
+        for t in tasks
+    )
+
+
+def parse_ops(raw: str) -> PlanOps:
+    """Parse the planner's JSON object; raises ValueError when there is none."""
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in re-planner output")
+    data = json.loads(match.group())
+    if not isinstance(data, dict):
+        raise ValueError("re-planner output is not a JSON object")
+    return PlanOps(
+        add=[a for a in data.get("add", []) if isinstance(a, dict)],
+        modify=[m for m in data.get("modify", []) if isinstance(m, dict) and m.get("id")],
+        cancel=[str(c) for c in data.get("cancel", []) if c],
+    )
+
+
+def apply_ops(state: State, ops: PlanOps, make_task: Callable[[dict, int], Task]) -> dict:
+    """Apply ``ops`` to the implementation tasks in ``state``; returns what was done and skipped.
+
+    ``make_task`` builds a Task from a planner item (resolving roles and
+    resources the same way as a full plan).
+    """
+    by_id = {t.id: t for t in state.tasks}
+    report = {"added": [], "modified": [], "cancelled": [], "skipped": []}
+
+    cancel = []
+    for task_id in ops.cancel:
+        task = by_id.get(task_id)
+        if task is None or task.phase != "implementation" or task.status in _LOCKED_STATUSES:
+            report["skipped"].append(f"cancel {task_id}")
+        else:
+            cancel.append(task_id)
+
+    for change in ops.modify:
+        task = by_id.get(change["id"])
+        if task is None or task.phase != "implementation" or task.status in _LOCKED_STATUSES or task.id in cancel:
+            report["skipped"].append(f"modify {change['id']}")
+            continue
+        updated = make_task({**{f: getattr(task, f) for f in MODIFIABLE}, **change}, 0)
+        state.update_task(task, {f: getattr(updated, f) for f in MODIFIABLE})
+        report["modified"].append(task.id)
+
+    added = []
+    for i, item in enumerate(ops.add, 1):
+        task = make_task(item, len([t for t in state.tasks if t.phase == "implementation"]) + i)
+        if task.id in by_id:
+            report["skipped"].append(f"add {task.id}")
+            continue
+        by_id[task.id] = task
+        added.append(task)
+    if added:
+        state.add_tasks(added)
+        report["added"] = [t.id for t in added]
+
+    if cancel:
+        state.remove_tasks(cancel)
+        report["cancelled"] = cancel
+    return report
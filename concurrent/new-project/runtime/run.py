@@ -5,6 +5,7 @@ Usage:
     python runtime/run.py --project /path/to/project
     python runtime/run.py --project /path/to/project --resume
     python runtime/run.py --project /path/to/project --config custom-config.yaml
+    python runtime/run.py --project /path/to/project --engine async
 """
 
 import argparse
@@ -28,6 +29,10 @@ def main():
     parser.add_argument("--config", default=None, help="Config file path (default: <project>/runtime/config.yaml)")
     parser.add_argument("--resume", action="store_true", help="Clear checkpoint and resume paused run")
     parser.add_argument("--dry-run", action="store_true", help="Print dispatch plan without executing workers")
+    parser.add_argument(
+        "--engine", choices=["sync", "async"], default="sync",
+        help="Orchestrator engine: blocking loop (sync) or asyncio coroutines (async)",
+    )
     args = parser.parse_args()
 
     project = os.path.abspath(args.project)
@@ -57,7 +62,15 @@ def main():
         else:
             print("No checkpoint found. Starting normally.")
 
-    run(project, config, dry_run=args.dry_run)
+    if args.engine == "async" and not args.dry_run:
+        from async_orchestrator import run_async, unsupported_options
+        unsupported = unsupported_options(config)
+        if unsupported:
+            print(f"Error: {', '.join(unsupported)} only work with the sync engine — turn them off or drop --engine async")
+            sys.exit(1)
+        run_async(project, config)
+    else:
+        run(project, config, dry_run=args.dry_run)
 
 
 if __name__ == "__main__":
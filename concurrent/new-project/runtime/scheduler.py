@@ -0,0 +1,136 @@
+"""Critical-path-aware ordering of ready tasks over the task dependency DAG.
+
+Each task's criticality is the longest chain of work that still has to run
+after it starts (its own weight plus its heaviest chain of dependents).
+Ready tasks are dispatched highest-criticality first, with ``priority`` as the
+tie-breaker and an aging bonus so low-criticality tasks cannot starve.
+Weights come from a duration estimator when one is available, else the
+task's ``timeout`` (or the global ``worker_timeout``).
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from config import Config
+from state import Task
+
+PRIORITY_RANK = {"P0": 0, "P1": 1, "P2": 2, "P3": 3}
+
+Estimator = Callable[[Task], Optional[float]]
+
+
+@dataclass
+class PlannedSlot:
+    task: Task
+    critical_path_s: float
+    start_s: float
+    end_s: float
+
+
+class Scheduler:
+    """Orders ready tasks for dispatch; remembers how long each has been waiting."""
+
+    def __init__(self, config: Config, estimator: Optional[Estimator] = None):
+        self.config = config
+        self.estimator = estimator
+        self._ready_since: dict[str, float] = {}
+
+    def weight(self, task: Task) -> float:
+        """Expected run time of ``task`` in seconds."""
+        if self.estimator is not None:
+            estimate = self.estimator(task)
+            if estimate:
+                return estimate
+        return float(task.timeout if task.timeout > 0 else self.config.worker_timeout)
+
+    def order(self, ready: list[Task], all_tasks: Optional[list[Task]] = None, now: Optional[float] = None) -> list[Task]:
+        """Return ``ready`` sorted by criticality plus aging, then priority, then board order."""
+        now = time.time() if now is None else now
+        ready_ids = {t.id for t in ready}
+        self._ready_since = {tid: ts for tid, ts in self._ready_since.items() if tid in ready_ids}
+        for t in ready:
+            self._ready_since.setdefault(t.id, now)
+
+        paths = critical_path_lengths(all_tasks or ready, self.weight)
+        aging = self.config.scheduler_aging_factor
+
+        def key(item):
+            index, t = item
+            waited = now - self._ready_since[t.id]
+            return (-(paths.get(t.id, 0.0) + aging * waited), PRIORITY_RANK.get(t.priority, 9), index)
+
+        return [t for _, t in sorted(enumerate(ready), key=key)]
+
+    def plan(self, tasks: list[Task], slots: int) -> list[PlannedSlot]:
+        """Simulate list scheduling of ``tasks`` on ``slots`` workers.
+
+        Used by the dry run to show dispatch order and predicted makespan
+        (the largest ``end_s``). Done tasks are treated as already finished.
+        """
+        pending = [t for t in tasks if t.status != "done"]
+        paths = critical_path_lengths(pending, self.weight)
+        known = {t.id for t in pending}
+        finished_at = {t.id: 0.0 for t in tasks if t.status == "done"}
+        running: list[tuple[float, str]] = []
+        planned: list[PlannedSlot] = []
+        clock = 0.0
+
+        while pending:
+            ready = [
+                t for t in pending
+                if all(d in finished_at or d not in known for d in t.dependencies)
+            ]
+            ready.sort(key=lambda t: (-paths[t.id], PRIORITY_RANK.get(t.priority, 9)))
+            while ready and len(running) < max(1, slots):
+                t = ready.pop(0)
+                pending.remove(t)
+                end = clock + self.weight(t)
+                running.append((end, t.id))
+                planned.append(PlannedSlot(t, paths[t.id], clock, end))
+            if not running:
+                break  # remaining tasks wait on dependencies that never finish (cycle)
+            running.sort()
+            clock, done_id = running.pop(0)
+            finished_at[done_id] = clock
+        return planned
+
+
+def critical_path_lengths(tasks: list[Task], weight: Callable[[Task], float]) -> dict[str, float]:
+    """Longest remaining path (in seconds) from each task to the end of the DAG.
+
+    Edges point from a dependency to its dependents; dependencies on tasks not
+    in ``tasks`` are ignored. Cycles are broken rather than recursed into.
+    """
+    by_id = {t.id: t for t in tasks}
+    dependents: dict[str, list[str]] = {t.id: [] for t in tasks}
+    for t in tasks:
+        for dep in t.dependencies:
+            if dep in dependents:
+                dependents[dep].append(t.id)
+
+    lengths: dict[str, float] = {}
+    visiting: set[str] = set()
+
+    def visit(task_id: str) -> float:
+        if task_id in lengths:
+            return lengths[task_id]
+        if task_id in visiting:
+            return 0.0
+        visiting.add(task_id)
+        tail = max((visit(child) for child in dependents[task_id]), default=0.0)
+        visiting.discard(task_id)
+        lengths[task_id] = weight(by_id[task_id]) + tail
+        return lengths[task_id]
+
+    for task_id in by_id:
+        visit(task_id)
+    return lengths
+
+
+def format_duration(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    if seconds >= 60:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds:.0f}s"
@@ -0,0 +1,111 @@
+"""Path-prefix index over the ``file_scope`` of in-flight tasks.
+
+Two scopes overlap when one path is a prefix of the other, component by
+component (``src/api`` overlaps ``src/api/users.py`` but not ``src/apiv2``).
+Paths are stored in a trie keyed by path component, so finding every in-flight
+task whose scope overlaps a new task's costs a walk down each of its paths
+plus the subtree below, not a comparison with every running task. Glob
+patterns are cut at their first wildcard component, and ``.`` claims the
+whole tree. Tasks without a file scope are never indexed and never conflict.
+"""
+
+from collections import Counter
+from typing import Optional
+
+_GLOB_CHARS = set("*?[")
+
+
+class _Node:
+    __slots__ = ("children", "owners")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.owners: Counter = Counter()  # task id -> number of live claims on this exact path
+
+
+def normalize(path: str) -> tuple[str, ...]:
+    """Path components of a scope entry, up to its first glob component."""
+    parts = []
+    for part in path.replace("\\", "/").split("/"):
+        if part in ("", "."):
+            continue
+        if _GLOB_CHARS & set(part):
+            break
+        parts.append(part)
+    return tuple(parts)
+
+
+class ScopeIndex:
+    """Which tasks currently claim which paths.
+
+    A task can be added more than once (hedged copies of it, or a claim held
+    while admission is still deciding); each ``add`` needs its own ``remove``.
+    Paths under ``shared`` may be touched by any number of tasks at once and
+    are left out of the index.
+    """
+
+    def __init__(self, shared: Optional[list[str]] = None):
+        self._root = _Node()
+        self._shared = list(shared or [])
+
+    def add(self, task_id: str, paths: list[str]):
+        for parts in self._claims(paths):
+            node = self._root
+            for part in parts:
+                node = node.children.setdefault(part, _Node())
+            node.owners[task_id] += 1
+
+    def remove(self, task_id: str, paths: list[str]):
+        for parts in self._claims(paths):
+            trail = [self._root]
+            for part in parts:
+                child = trail[-1].children.get(part)
+                if child is None:
+                    break
+                trail.append(child)
+            else:
+                node = trail[-1]
+                node.owners[task_id] -= 1
+                if node.owners[task_id] <= 0:
+                    del node.owners[task_id]
+                for parent, part in zip(reversed(trail[:-1]), reversed(parts)):  # prune empty branches
+                    child = parent.children[part]
+                    if child.owners or child.children:
+                        break
+                    del parent.children[part]
+
+    def overlapping(self, paths: list[str], exclude: str = "") -> dict[str, list[str]]:
+        """Tasks (other than ``exclude``) whose claims overlap ``paths``: {task id: [paths of ours they overlap]}."""
+        hits: dict[str, list[str]] = {}
+        for path in paths:
+            parts = normalize(path)
+            if self._is_shared(parts):
+                continue
+            owners: set[str] = set()
+            node = self._root
+            owners.update(node.owners)  # a claim on the whole tree
+            for part in parts:
+                node = node.children.get(part)
+                if node is None:
+                    break
+                owners.update(node.owners)
+            else:
+                owners.update(_subtree_owners(node))
+            for owner in owners - {exclude}:
+                hits.setdefault(owner, []).append(path)
+        return hits
+
+    def _claims(self, paths: list[str]) -> list[tuple[str, ...]]:
+        return [parts for parts in map(normalize, paths) if not self._is_shared(parts)]
+
+    def _is_shared(self, parts: tuple[str, ...]) -> bool:
+        return any(parts[: len(p)] == p for p in map(normalize, self._shared))
+
+
+def _subtree_owners(node: _Node) -> set[str]:
+    owners, stack = set(), list(node.children.values())
+    while stack:
+        n = stack.pop()
+        owners.update(n.owners)
+        stack.extend(n.children.values())
+    return owners
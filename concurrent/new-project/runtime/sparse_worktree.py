@@ -0,0 +1,85 @@
+"""Sparse-checkout worktrees limited to what a task declares it needs.
+
+With ``sparse_worktrees`` a worker whose task has a ``file_scope`` gets a
+worktree in git's cone mode. It holds only the directories of the task's
+scope and required reads, the harness files and ``sparse_always_include``.
+Cone mode always keeps the files at the top of the tree, so AGENTS.md,
+STATUS.md and BRIEF.md are there without being listed. A scope entry that
+names a file (or a file still to be created) brings in its directory. A glob
+is cut at its first wildcard component. ``.`` means the whole tree, and so
+does a task without a scope, since nothing says what it can skip.
+
+The sparse pattern is per-worktree (``extensions.worktreeConfig``): the main
+checkout and other workers keep full trees. Merges, rebases and conflict
+resolution work as usual, because git checks out any path a merge needs
+even when it lies outside the cone.
+"""
+
+import os
+import subprocess
+import time
+
+from scope_index import normalize
+from state import Task
+from telemetry import log_event
+from worktree_pool import WORKTREE_LOCK
+
+HARNESS_PATHS = ["AGENTS.md", "STATUS.md", "harness/agents"]
+
+
+def cone_paths(task: Task, project_path: str, always_include: list[str]) -> list[str]:
+    """Directories to check out for ``task``; [] means the full tree."""
+    if not task.file_scope:
+        return []
+    dirs: list[str] = []
+    for path in [*task.file_scope, *task.required_reads, *HARNESS_PATHS, *always_include]:
+        parts = normalize(path)
+        if not parts:
+            return []
+        if not _is_dir(project_path, "/".join(parts)):
+            parts = parts[:-1]
+        if parts and "/".join(parts) not in dirs:
+            dirs.append("/".join(parts))
+    return dirs
+
+
+def create_sparse_worktree(task: Task, project_path: str, worktree: str, branch: str, dirs: list[str]) -> bool:
+    """Add a worktree on a new ``branch`` with only ``dirs`` (and top-level files) checked out.
+
+    Falls back to a full checkout, returning False, if git refuses the
+    sparse pattern (sparse-checkout needs git 2.25+).
+    """
+    started = time.time()
+    os.makedirs(os.path.dirname(worktree), exist_ok=True)
+    with WORKTREE_LOCK:
+        subprocess.run(
+            ["git", "worktree", "add", "-q", "--no-checkout", "-b", branch, worktree],
+            cwd=project_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    result = subprocess.run(["git", "sparse-checkout", "set", "--cone", *dirs], cwd=worktree, capture_output=True, text=True)
+    sparse = result.returncode == 0
+    subprocess.run(["git", "checkout", "-q"], cwd=worktree, check=True, capture_output=True, text=True)
+    log_event(
+        "worktree_sparse",
+        {"result": "sparse" if sparse else "full", "paths": dirs, "error": "" if sparse else result.stderr.strip()[:200]},
+        project_path, task_id=task.id, role=task.role, phase=task.phase, duration_s=time.time() - started,
+    )
+    return sparse
+
+
+def sparse_prompt(dirs: list[str]) -> str:
+    """Prompt section telling a worker which parts of the repository are checked out."""
+    return (
+        "\n## Sparse Checkout\n"
+        f"This worktree only contains the top-level files and: {', '.join(dirs)}. "
+        "Other paths exist in the repository but are not checked out; read them with `git show HEAD:<path>`, "
+        "and run `git sparse-checkout add <dir>` only if you must change files there."
+    )
+
+
+def _is_dir(project_path: str, path: str) -> bool:
+    result = subprocess.run(["git", "cat-file", "-t", f"HEAD:{path}"], cwd=project_path, capture_output=True, text=True)
+    return result.stdout.strip() == "tree"
@@ -1,7 +1,9 @@
 """Parse and update harness markdown state files (STATUS.md, DECISIONS.md)."""
 
+import functools
 import os
 import re
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
@@ -24,13 +26,14 @@ class Task:
     title: str
     role: str
     phase: str
-    status: str = "ready"  # ready | in_progress | done | blocked
+    status: str = "ready"  # ready | in_progress | done | blocked | superseded
     priority: str = "P1"
     dependencies: list[str] = field(default_factory=list)
     file_scope: list[str] = field(default_factory=list)
     required_reads: list[str] = field(default_factory=list)
     acceptance: str = ""
     timeout: int = 0  # 0 = use global config.worker_timeout
+    resources: list[str] = field(default_factory=list)  # named tokens from config.resource_tokens
     retries: int = 0
     slug: str = ""
     evidence: str = ""
@@ -40,14 +43,30 @@ class Task:
             self.slug = re.sub(r"[^a-z0-9]+", "-", self.title.lower()).strip("-")[:40]
 
 
+def _locked(method):
+    """Run a State method under the board lock (planner threads update State too)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class State:
-    """Reads and writes harness state from markdown files."""
+    """Reads and writes harness state from markdown files.
 
-    def __init__(self, project_path: str):
+    Safe to share between threads: every public method holds one re-entrant
+    lock, so board updates and the STATUS.md rewrite behind each of them are
+    never interleaved.
+    """
+
+    def __init__(self, project_path: str, pipelined: bool = False):
         self.project_path = project_path
+        self.pipelined = pipelined
         self._status_path = os.path.join(project_path, "STATUS.md")
         self._decisions_path = os.path.join(project_path, "DECISIONS.md")
         self.tasks: list[Task] = []
+        self._lock = threading.RLock()
         self._current_phase: str = "requirements"
         self._status_raw: str = ""
         self._load_status()
@@ -72,8 +91,9 @@ class State:
         Reads cards in the format:
             - [ ] [CARD-XXX] Title
               - Owner: role
-              - Status: ready | in_progress | done | blocked
+              - Status: ready | in_progress | done | blocked | superseded
               - Phase: phase_name
+              - Resources: db, browser
         """
         self.tasks = []
         if not os.path.isfile(self._status_path):
@@ -96,12 +116,13 @@ class State:
             r"(?:\s+- Branch/Worktree:\s*(.+)\n)?"
             r"(?:\s+- Acceptance:\s*(.+)\n)?"
             r"(?:\s+- Timeout:\s*(.+)\n)?"
+            r"(?:\s+- Resources:\s*(.+)\n)?"
             r"(?:\s+- Status:\s*(.+)\n)?",
             re.MULTILINE,
         )
 
         for m in card_pattern.finditer(tasks_section):
-            status_str = (m.group(12) or "ready").strip().lower()
+            status_str = (m.group(13) or "ready").strip().lower()
             timeout_str = (m.group(11) or "0").strip()
             task = Task(
                 id=m.group(1).strip(),
@@ -122,10 +143,20 @@ class State:
             reads = (m.group(8) or "").strip()
             if reads and reads.lower() != "none":
                 task.required_reads = [r.strip() for r in reads.split(",")]
+            resources = (m.group(12) or "").strip()
+            if resources and resources.lower() != "none":
+                task.resources = [r.strip() for r in resources.split(",")]
             self.tasks.append(task)
 
+    @_locked
     def get_ready_tasks(self) -> list[Task]:
         done_ids = {t.id for t in self.tasks if t.status == "done"}
+        if self.pipelined:
+            return [
+                t for t in self.tasks
+                if t.status == "ready"
+                and all(d in done_ids for d in self.effective_dependencies(t))
+            ]
         return [
             t for t in self.tasks
             if t.status == "ready"
@@ -133,35 +164,106 @@ class State:
             and all(d in done_ids for d in t.dependencies)
         ]
 
+    @_locked
+    def effective_dependencies(self, task: Task) -> list[str]:
+        """Dependencies used for scheduling in pipelined mode.
+
+        Explicit ``dependencies`` win. A task without any depends on every task
+        of the nearest earlier phase that has tasks, so PHASE_ORDER still acts
+        as the default edge set.
+        """
+        if task.dependencies or task.phase not in PHASE_ORDER:
+            return task.dependencies
+        for phase in reversed(PHASE_ORDER[: PHASE_ORDER.index(task.phase)]):
+            earlier = [t.id for t in self.tasks if t.phase == phase]
+            if earlier:
+                return earlier
+        return []
+
+    @_locked
+    def phase_tasks(self, phase: Optional[str] = None) -> list[Task]:
+        phase = phase or self._current_phase
+        return [t for t in self.tasks if t.phase == phase]
+
+    @_locked
+    def active_phases(self) -> list[str]:
+        """Current phase plus every phase with a task in progress, in PHASE_ORDER."""
+        phases = {self._current_phase} | {t.phase for t in self.tasks if t.status == "in_progress"}
+        return [p for p in PHASE_ORDER if p in phases]
+
+    @_locked
     def add_tasks(self, tasks: list[Task]):
-        self.tasks.extend(tasks)
+        """Append tasks to the board; ids already on it are skipped (e.g. plan parts added as they arrive)."""
+        known = {t.id for t in self.tasks}
+        self.tasks.extend(t for t in tasks if t.id not in known)
+        self._write_tasks()
+
+    @_locked
+    def update_task(self, task: Task, fields: dict):
+        """Change fields of a task that has not started (incremental re-planning)."""
+        for name, value in fields.items():
+            setattr(task, name, value)
+        if "title" in fields:
+            task.slug = ""
+            task.__post_init__()
         self._write_tasks()
 
+    @_locked
+    def remove_tasks(self, task_ids: list[str]):
+        """Drop cancelled tasks from the board, and from the dependencies of the rest."""
+        dropped = set(task_ids)
+        self.tasks = [t for t in self.tasks if t.id not in dropped]
+        for t in self.tasks:
+            t.dependencies = [d for d in t.dependencies if d not in dropped]
+        self._write_tasks()
+
+    @_locked
     def mark_in_progress(self, task: Task):
         task.status = "in_progress"
         self._write_tasks()
 
+    @_locked
+    def mark_ready(self, task: Task):
+        task.status = "ready"
+        self._write_tasks()
+
+    @_locked
     def mark_done(self, task: Task):
+        """Mark ``task`` done, along with the failed attempts its fix task superseded."""
         task.status = "done"
+        for t in self.tasks:
+            if t.status == "superseded" and task.id.startswith(f"{t.id}-fix"):
+                t.status = "done"
         self._write_tasks()
 
+    @_locked
+    def mark_superseded(self, task: Task, evidence: str):
+        """Retire a failed task in favour of its fix task; it counts as done once the fix is."""
+        task.status = "superseded"
+        task.evidence = evidence
+        self._write_tasks()
+
+    @_locked
     def mark_blocked(self, task: Task, evidence: str):
         task.status = "blocked"
         task.evidence = evidence
         self._write_tasks()
 
+    @_locked
     def phase_complete(self) -> bool:
         phase_tasks = [t for t in self.tasks if t.phase == self._current_phase]
         if not phase_tasks:
             return False
         return all(t.status == "done" for t in phase_tasks)
 
+    @_locked
     def advance_phase(self):
         idx = PHASE_ORDER.index(self._current_phase)
         if idx + 1 < len(PHASE_ORDER):
             self._current_phase = PHASE_ORDER[idx + 1]
             self._write_status()
 
+    @_locked
     def log_decision(self, title: str, rationale: str):
         """Append a decision entry to DECISIONS.md."""
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
@@ -177,12 +279,7 @@ class State:
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
         if self._status_raw and re.search(r"Current Phase", self._status_raw, re.IGNORECASE):
-            updated = re.sub(
-                r"(##\s*Current Phase\s*\n).*",
-                rf"\g<1>{self._current_phase}",
-                self._status_raw,
-                count=1,
-            )
+            updated = self._render_current_phase(self._status_raw)
             updated = re.sub(
                 r"(##\s*Last Updated\s*\n).*",
                 rf"\g<1>{timestamp} by orchestrator (concurrent mode)",
@@ -193,19 +290,34 @@ class State:
         else:
             self._status_raw = (
                 f"# Project Status\n\n"
-                f"## Current Phase\n{self._current_phase}\n\n"
+                f"## Current Phase\n{self._phase_label()}\n\n"
                 f"## Last Updated\n{timestamp} by orchestrator (concurrent mode)\n\n"
                 f"## Completed\n\n## In Progress\n\n## Blocked\n\n## Next Up\n\n## Risks\n"
             )
 
         _write(self._status_path, self._status_raw)
 
+    def _phase_label(self) -> str:
+        """Text for the Current Phase section; pipelined runs also list every active phase."""
+        active = self.active_phases()
+        if self.pipelined and len(active) > 1:
+            return f"{self._current_phase} (active: {', '.join(active)})"
+        return self._current_phase
+
+    def _render_current_phase(self, content: str) -> str:
+        return re.sub(
+            r"(##\s*Current Phase\s*\n).*",
+            lambda m: m.group(1) + self._phase_label(),
+            content,
+            count=1,
+        )
+
     def _write_tasks(self):
         """Write current task state to the ## Tasks section of STATUS.md."""
         task_lines = ""
         for t in self.tasks:
             task_lines += _format_card(t)
-            if t.status == "blocked" and t.evidence:
+            if t.status in ("blocked", "superseded") and t.evidence:
                 task_lines += f"  - Evidence: {t.evidence[:200]}\n"
 
         tasks_section = f"## Tasks\n\n{task_lines}\n"
@@ -221,6 +333,9 @@ class State:
         else:
             self._status_raw = self._status_raw.rstrip() + "\n\n" + tasks_section
 
+        if self.pipelined:
+            self._status_raw = self._render_current_phase(self._status_raw)
+
         _write(self._status_path, self._status_raw)
 
 
@@ -237,6 +352,7 @@ def _format_card(task: Task) -> str:
     card += f"  - Branch/Worktree: agent/{task.role}/{task.id}-{task.slug}\n"
     card += f"  - Acceptance: {task.acceptance or 'see phase gate criteria'}\n"
     card += f"  - Timeout: {task.timeout}\n"
+    card += f"  - Resources: {', '.join(task.resources) if task.resources else 'none'}\n"
     card += f"  - Status: {task.status}\n"
     return card
 
@@ -56,9 +56,9 @@ def log_event(
         f.write(json.dumps(record) + "\n")
 
 
-def log_run_complete(project_path: str, total_duration_s: float):
+def log_run_complete(project_path: str, total_duration_s: float, stats: Optional[dict] = None):
     log_event(
         "run_complete",
-        {"total_duration_s": round(total_duration_s, 2)},
+        {"total_duration_s": round(total_duration_s, 2), **(stats or {})},
         project_path,
     )
@@ -3,61 +3,173 @@
 import os
 import re
 import subprocess
+import time
 from pathlib import Path
 from typing import Optional
 
 from config import Config
+from conflicts import merge_main, resolution_prompt
+from sparse_worktree import cone_paths, create_sparse_worktree, sparse_prompt
 from state import Task
+from worktree_pool import WORKTREE_LOCK, WorktreePool
 
 
 class Worker:
     """Runs a Claude Code CLI worker for a single task on an isolated branch."""
 
-    def __init__(self, task: Task, config: Config, project_path: str):
+    def __init__(
+        self,
+        task: Task,
+        config: Config,
+        project_path: str,
+        variant: str = "",
+        resolve: bool = False,
+        worktree: str = "",
+        pool: Optional[WorktreePool] = None,
+    ):
         self.task = task
         self.config = config
         self.project_path = project_path
-        self.branch = f"agent/{task.role}/{task.id}-{task.slug}"
-        self.worktree = os.path.join(project_path, ".worktrees", task.id)
-        self.output_path = os.path.join(self.worktree, ".worker_output.txt")
+        self.variant = variant  # e.g. "hedge": a second copy of the same task on its own branch
+        self.resolve = resolve  # resolve merge conflicts in the existing worktree (conflicts.py)
+        self.pool = pool  # pre-warmed worktrees (worktree_pool.py)
+        self.sparse: list[str] = []  # directories checked out when the worktree is sparse (sparse_worktree.py)
+        suffix = f"-{variant}" if variant else ""
+        self.key = f"{task.id}{suffix}"
+        self.branch = f"agent/{task.role}/{task.id}-{task.slug}{suffix}"
+        self.worktree = worktree or os.path.join(project_path, ".worktrees", self.key)
         self._process: Optional[subprocess.Popen] = None
         self._out_file = None
+        self._role_prompt = ""
+        self._task_prompt = ""
+        self.pid: Optional[int] = None
+        self.started_at: float = 0.0
+        self.finished_at: float = 0.0
+        self.timed_out = False
+        self.default_timeout: Optional[int] = None  # learned from past runs (durations.py)
+
+    @property
+    def output_path(self) -> str:
+        return os.path.join(self.worktree, ".worker_output.txt")
 
     def start(self):
         """Create worktree and spawn headless Claude Code process."""
-        _create_worktree(self.project_path, self.worktree, self.branch)
-
-        role_prompt = _load_role_prompt(self.project_path, self.task.role)
-        task_prompt = _build_task_prompt(self.task, self.project_path)
-
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        self._out_file = open(self.output_path, "w")
-
+        self.prepare()
         self._process = subprocess.Popen(
-            [
-                "claude",
-                "--print",
-                "--model", self.config.model,
-                "--systemPrompt", role_prompt,
-                "--allowedTools", "Edit,Write,Bash,Read",
-                "-p", task_prompt,
-            ],
+            self.command(),
             cwd=self.worktree,
             stdout=self._out_file,
             stderr=subprocess.STDOUT,
         )
+        self.pid = self._process.pid
+        self.started_at = time.time()
+
+    def prepare(self):
+        """Create the worktree, build prompts and open the output log.
+
+        With a worktree pool, an idle pooled worktree is switched to the
+        worker's branch instead of adding a new one; with ``sparse_worktrees``
+        a task with a file scope gets a sparse worktree of its own (pooled
+        worktrees are full checkouts). A resolving worker reuses
+        its existing worktree, with main merged in and the conflict hunks
+        appended to its prompt.
+
+        Everything ``start`` does short of spawning the process, so other
+        engines (see async_orchestrator.py) can spawn it themselves.
+        """
+        resolution = None
+        if self.resolve and os.path.isdir(self.worktree):
+            resolution = merge_main(self.project_path, self.worktree)
+        else:
+            dirs = cone_paths(self.task, self.project_path, self.config.sparse_always_include) if self.config.sparse_worktrees else []
+            pooled = self.pool.acquire(self.branch) if self.pool is not None and not dirs else None
+            if pooled:
+                self.worktree = pooled
+            elif dirs:
+                if create_sparse_worktree(self.task, self.project_path, self.worktree, self.branch, dirs):
+                    self.sparse = dirs
+            else:
+                _create_worktree(self.project_path, self.worktree, self.branch)
+
+        self._role_prompt = _load_role_prompt(self.project_path, self.task.role)
+        self._task_prompt = _build_task_prompt(self.task, self.project_path)
+        if self.sparse:
+            self._task_prompt += "\n" + sparse_prompt(self.sparse)
+        if resolution is not None:
+            self._task_prompt += "\n" + resolution_prompt(self.task, resolution)
+
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        self._out_file = open(self.output_path, "w")
+
+    def command(self) -> list[str]:
+        """Return the Claude Code CLI invocation for this worker (after ``prepare``)."""
+        return [
+            "claude",
+            "--print",
+            "--model", self.config.model,
+            "--systemPrompt", self._role_prompt,
+            "--allowedTools", "Edit,Write,Bash,Read",
+            "-p", self._task_prompt,
+        ]
+
+    @property
+    def output_file(self):
+        return self._out_file
+
+    @property
+    def timeout(self) -> int:
+        if self.task.timeout > 0:
+            return self.task.timeout
+        return self.default_timeout or self.config.worker_timeout
+
+    @property
+    def deadline(self) -> float:
+        return self.started_at + self.timeout
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
 
     def wait(self) -> int:
         """Block until the worker process exits. Returns exit code."""
         if self._process is None:
             raise RuntimeError("Worker not started")
-        timeout = self.task.timeout if self.task.timeout > 0 else self.config.worker_timeout
         try:
-            return self._process.wait(timeout=timeout)
+            return self._process.wait(timeout=self.timeout)
         finally:
-            if self._out_file:
-                self._out_file.close()
-                self._out_file = None
+            self.finish()
+
+    def poll(self) -> Optional[int]:
+        """Return the exit code if the worker has exited, else None.
+
+        A worker past its timeout is killed and reported as exited with
+        ``timed_out`` set, so callers never block on a straggler.
+        """
+        if self._process is None:
+            raise RuntimeError("Worker not started")
+        code = self._process.poll()
+        if code is None and time.time() >= self.deadline:
+            self._process.kill()
+            code = self._process.wait()
+            self.timed_out = True
+        if code is not None:
+            self.finish()
+        return code
+
+    def kill(self):
+        """Terminate a running worker (e.g. the losing copy of a hedged task)."""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self.finish()
+
+    def finish(self):
+        """Record the exit time and close the output log."""
+        if not self.finished_at:
+            self.finished_at = time.time()
+        if self._out_file:
+            self._out_file.close()
+            self._out_file = None
 
     @property
     def succeeded(self) -> bool:
@@ -66,12 +178,13 @@ class Worker:
 
 def _create_worktree(project_path: str, worktree_path: str, branch: str):
     """Create a git worktree for isolated concurrent work."""
-    subprocess.run(
-        ["git", "worktree", "add", "-b", branch, worktree_path],
-        cwd=project_path,
-        check=True,
-        capture_output=True,
-    )
+    with WORKTREE_LOCK:
+        subprocess.run(
+            ["git", "worktree", "add", "-b", branch, worktree_path],
+            cwd=project_path,
+            check=True,
+            capture_output=True,
+        )
 
 
 def _load_role_prompt(project_path: str, role: str) -> str:
@@ -0,0 +1,162 @@
+"""Pre-warmed git worktrees, recycled between workers.
+
+``git worktree add`` checks out the whole tree before a worker can launch,
+which on a large repository takes far longer than switching an existing
+checkout between two nearby commits. The pool keeps up to ``size`` clean
+worktrees detached at main's HEAD (``.worktrees/pool-<n>``). ``acquire``
+switches one to the worker's new branch at the current HEAD — only files that
+changed since it was parked are rewritten — and ``recycle`` resets it after
+merge (or discard), deletes the branch and parks it again. A background
+thread replaces worktrees as they are handed out, so the pool settles at
+``size`` plus the number of workers running at once and then only recycles.
+When no worktree is idle, ``acquire`` returns None and the worker creates its
+own as before.
+
+Recycling keeps ignored files (``git clean`` without ``-x``), so dependency
+directories and build caches stay warm from one task to the next.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from telemetry import log_event
+
+# Held around every ``git worktree add`` and ``remove`` in this process: git
+# reads each worktree's admin directory while adding one and fails on a
+# directory another thread is half-way through creating or deleting.
+WORKTREE_LOCK = threading.Lock()
+
+
+class WorktreePool:
+    """Idle worktrees at main HEAD, filled by a background thread."""
+
+    def __init__(self, project_path: str, size: int):
+        self.project_path = project_path
+        self.size = max(0, size)
+        self._idle: list[str] = []
+        self._pooled: set[str] = set()  # every worktree created by the pool, idle or handed out
+        self._next = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._started = time.time()
+        self.warm_s: Optional[float] = None  # time until the pool first held ``size`` idle worktrees
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self._thread = threading.Thread(target=self._fill, name="worktree-pool", daemon=True)
+        self._thread.start()
+
+    def acquire(self, branch: str) -> Optional[str]:
+        """Switch an idle worktree to a new ``branch`` at main HEAD; None if none is idle."""
+        with self._cond:
+            path = self._idle.pop() if self._idle else None
+            self._cond.notify()  # refill behind the handed-out worktree
+        head = self._head()
+        hit = path is not None and head is not None and _git(path, "checkout", "-q", "-b", branch, head).returncode == 0
+        if path is not None and not hit:
+            self._discard(path)
+        with self._cond:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return path if hit else None
+
+    def owns(self, path: str) -> bool:
+        return path in self._pooled
+
+    def recycle(self, path: str, branch: str, force: bool = False) -> bool:
+        """Reset a pooled worktree, delete ``branch`` and park the worktree again.
+
+        Returns False (and does nothing) if ``path`` did not come from the
+        pool. ``force`` deletes the branch even if it was never merged.
+        """
+        if not self.owns(path):
+            return False
+        head = self._head()
+        ok = head is not None and os.path.isdir(path) and all(
+            _git(path, *args).returncode == 0
+            for args in (("reset", "-q", "--hard"), ("clean", "-fdq"), ("checkout", "-q", "--detach", head))
+        )
+        _git(self.project_path, "branch", "-D" if force else "-d", branch)
+        with self._cond:
+            if ok and not self._closed:
+                self._idle.append(path)
+                self.recycled += 1
+                return True
+        self._discard(path)
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+        handed_out = self.hits + self.misses
+        return {
+            "size": self.size,
+            "idle": idle,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / handed_out, 3) if handed_out else 0.0,
+            "recycled": self.recycled,
+            "warm_s": round(self.warm_s, 2) if self.warm_s is not None else None,
+        }
+
+    def close(self):
+        """Stop refilling and remove the idle worktrees (handed-out ones are left to their workers)."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify()
+        self._thread.join()
+        for path in idle:
+            self._discard(path)
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._idle) >= self.size:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self._next += 1
+                path = os.path.join(self.project_path, ".worktrees", f"pool-{self._next}")
+            error = self._create(path)
+            if error:  # give up filling; workers fall back to creating their own worktrees
+                log_event("worktree_pool", {"result": "error", "error": error[:200]}, self.project_path)
+                return
+            with self._cond:
+                self._pooled.add(path)
+                self._idle.append(path)
+                warm = self.warm_s is None and len(self._idle) >= self.size
+                if warm:
+                    self.warm_s = time.time() - self._started
+            if warm:
+                log_event("worktree_pool", {"result": "warm", "size": self.size, "warm_s": round(self.warm_s, 2)}, self.project_path)
+
+    def _create(self, path: str) -> str:
+        """Add a detached worktree at main HEAD; the error message, or "" on success."""
+        head = self._head()
+        if head is None:
+            return "cannot resolve main HEAD"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with WORKTREE_LOCK:
+            if os.path.exists(path):  # left behind by an earlier run
+                _git(self.project_path, "worktree", "remove", "--force", path)
+            result = _git(self.project_path, "worktree", "add", "-q", "--detach", path, head)
+        return "" if result.returncode == 0 else (result.stderr or result.stdout).strip()
+
+    def _discard(self, path: str):
+        with WORKTREE_LOCK:
+            _git(self.project_path, "worktree", "remove", "--force", path)
+        self._pooled.discard(path)
+
+    def _head(self) -> Optional[str]:
+        result = _git(self.project_path, "rev-parse", "HEAD")
+        return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _git(cwd: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
@@ -0,0 +1,1020 @@
+import http.client
+import importlib.util
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNTIME_DIR = REPO_ROOT / "concurrent" / "new-project" / "runtime"
+
+# Stand-in for the Claude CLI: sleeps for the number of seconds named in the
+# task title ("sleep 0.5") so tests control how long each worker runs, and
+# commits the file named by "write <path>" in its worktree.
+FAKE_CLAUDE = """#!{python}
+import os, re, subprocess, sys, time
+prompt = sys.argv[sys.argv.index("-p") + 1]
+match = re.search(r"sleep ([0-9.]+)", prompt)
+time.sleep(float(match.group(1)) if match else 0)
+write = re.search(r"write (\\S+)", prompt)
+if write:
+    os.makedirs(os.path.dirname(write.group(1)) or ".", exist_ok=True)
+    with open(write.group(1), "w") as f:
+        f.write(write.group(1))
+    subprocess.run(["git", "add", write.group(1)], check=True)
+    subprocess.run(["git", "commit", "-qm", write.group(1)], check=True)
+print("done")
+"""
+
+
+def make_project(tmpdir: Path) -> tuple[Path, Path]:
+    project = tmpdir / "project"
+    (project / "harness" / "agents").mkdir(parents=True)
+    (project / "harness" / "agents" / "fullstack-engineer.md").write_text("You are an engineer.", encoding="utf-8")
+    (project / "BRIEF.md").write_text("Brief.", encoding="utf-8")
+    git = ["git", "-c", "user.email=t@example.com", "-c", "user.name=t"]
+    subprocess.run(["git", "init", "-q"], cwd=project, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=project, check=True)
+    subprocess.run(git + ["commit", "-qm", "init"], cwd=project, check=True)
+
+    bin_dir = tmpdir / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "claude"
+    fake.write_text(FAKE_CLAUDE.format(python=sys.executable), encoding="utf-8")
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    return project, bin_dir
+
+
+class TestContinuousDispatch(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project, bin_dir = make_project(Path(self._tmp.name))
+        self._old_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{self._old_path}"
+
+        import config
+        import dispatcher
+        import state
+        self.Config = config.Config
+        self.Dispatcher = dispatcher.Dispatcher
+        self.Task = state.Task
+
+    def tearDown(self):
+        os.environ["PATH"] = self._old_path
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _task(self, task_id: str, seconds: float):
+        return self.Task(id=task_id, title=f"sleep {seconds}", role="fullstack-engineer", phase="implementation")
+
+    def test_workers_are_returned_in_exit_order_and_slots_refill(self):
+        d = self.Dispatcher(self.Config(max_workers=2), str(self.project))
+        slow, fast, queued = self._task("T-SLOW", 1.5), self._task("T-FAST", 0.1), self._task("T-NEXT", 0.1)
+
+        for task in d.admit([slow, fast, queued]):
+            d.start(task)
+        self.assertEqual(set(d.running), {"T-SLOW", "T-FAST"})
+
+        first = d.wait_any()
+        self.assertEqual([w.task.id for w in first], ["T-FAST"])
+        self.assertEqual(d.admit([queued]), [queued])
+        d.start(queued)
+
+        second = d.wait_any()
+        self.assertEqual([w.task.id for w in second], ["T-NEXT"])
+        self.assertIn("T-SLOW", d.running)
+
+        d.wait_any()
+        stats = d.total_stats()
+        self.assertEqual(stats["dispatched"], 3)
+        self.assertEqual(stats["peak_in_flight"], 2)
+        self.assertGreater(stats["slot_utilisation"], 0.5)
+
+    def test_polling_fallback_reaps_in_exit_order(self):
+        import reaper
+
+        with mock.patch.object(reaper, "_open_pidfd", return_value=None):
+            d = self.Dispatcher(self.Config(max_workers=2), str(self.project))
+            d._reaper.poll_interval = 0.05
+            for task in (self._task("T-SLOW", 1.0), self._task("T-FAST", 0.1)):
+                d.start(task)
+            self.assertEqual([w.task.id for w in d.wait_any()], ["T-FAST"])
+            self.assertEqual([w.task.id for w in d.wait_any()], ["T-SLOW"])
+
+    def test_role_caps_and_resource_tokens_limit_admission(self):
+        cfg = self.Config(max_workers=4, role_limits={"fullstack-engineer": 1}, resource_tokens={"db": 1})
+        d = self.Dispatcher(cfg, str(self.project))
+        eng1, eng2 = self._task("T-ENG1", 0.1), self._task("T-ENG2", 0.1)
+        qa = self.Task(id="T-QA", title="qa", role="qa-engineer", phase="implementation", resources=["db"])
+        qa2 = self.Task(id="T-QA2", title="qa", role="qa-engineer", phase="implementation", resources=["db"])
+        admitted = d.admit([eng1, eng2, qa, qa2])
+        self.assertEqual(sorted(t.id for t in admitted), ["T-ENG1", "T-QA"])
+
+    def test_overlapping_file_scopes_are_never_in_flight_together(self):
+        cfg = self.Config(max_workers=5, scope_exclusive=True, scope_shared_paths=["package.json"])
+        d = self.Dispatcher(cfg, str(self.project))
+        api = self._task("T-API", 0.2)
+        api.file_scope = ["src/api", "package.json"]
+        users, v2, web, deps = (self._task(i, 0.1) for i in ("T-USERS", "T-V2", "T-WEB", "T-DEPS"))
+        users.file_scope, v2.file_scope = ["src/api/users.py"], ["./src/apiv2/"]
+        web.file_scope, deps.file_scope = ["src/web/*.tsx"], ["package.json"]
+
+        admitted = d.admit([api, users, v2, web, deps])
+        self.assertEqual([t.id for t in admitted], ["T-API", "T-V2", "T-WEB", "T-DEPS"])
+        api_worker = d.start(api)
+        self.assertEqual(d.admit([users]), [])
+
+        while "T-API" in d.running:
+            d.wait_any()
+        self.assertEqual(d.admit([users]), [])  # exited, but its branch is not merged yet
+        d.release_scope(api_worker)
+        self.assertEqual(d.admit([users]), [users])
+        events = [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+        avoided = [e for e in events if e["event"] == "scope_conflict_avoided"]
+        self.assertEqual([(e["task_id"], e["in_flight"], e["paths"]) for e in avoided], [("T-USERS", "T-API", ["src/api/users.py"])])
+        waits = [e["resource"] for e in events if e["event"] == "resource_wait"]
+        self.assertEqual(waits, ["scope:T-API"])
+
+    def test_worker_past_timeout_is_killed(self):
+        d = self.Dispatcher(self.Config(max_workers=1), str(self.project))
+        task = self._task("T-HANG", 30)
+        task.timeout = 1
+        start = time.time()
+        d.start(task)
+        (w,) = d.wait_any()
+        self.assertTrue(w.timed_out)
+        self.assertLess(time.time() - start, 10)
+
+    def test_checkpoint_changes_wake_the_dispatcher_immediately(self):
+        import threading
+        import control
+
+        watch = control.CheckpointWatch(str(self.project), poll_interval=0.05)
+        d = self.Dispatcher(self.Config(max_workers=1), str(self.project), watch)
+        d.start(self._task("T-SLOW", 3.0))
+
+        threading.Timer(0.2, Path(watch.path).touch).start()
+        start = time.time()
+        self.assertEqual(d.wait_any(), [])
+        self.assertTrue(watch.paused)
+        self.assertLess(time.time() - start, 1.5)
+
+        threading.Timer(0.2, os.remove, [watch.path]).start()
+        start = time.time()
+        watch.wait_for_resume()
+        self.assertLess(time.time() - start, 1.5)
+        d.cancel(next(iter(d.running.values())))
+        watch.close()
+
+    def test_straggler_gets_a_hedged_copy_on_its_own_branch(self):
+        import hedging
+
+        logs = self.project / "logs"
+        logs.mkdir()
+        (logs / "runs.jsonl").write_text(
+            '{"event": "task_complete", "role": "fullstack-engineer", "phase": "implementation", "duration_s": 0.2}\n' * 3,
+            encoding="utf-8",
+        )
+        cfg = self.Config(max_workers=2, hedge_min_samples=3)
+        d = self.Dispatcher(cfg, str(self.project))
+        policy = hedging.HedgePolicy(cfg, d.durations)
+        primary = d.start(self._task("T-SLOW", 1.0))
+        self.assertEqual(policy.stragglers(d.running.values()), [])
+
+        time.sleep(0.3)
+        ((straggler, threshold),) = policy.stragglers(d.running.values())
+        self.assertIs(straggler, primary)
+        self.assertAlmostEqual(threshold, 0.2, delta=0.02)
+
+        hedge = d.start(primary.task, variant=hedging.HEDGE_VARIANT)
+        self.assertEqual(set(d.running), {"T-SLOW", "T-SLOW-hedge"})
+        self.assertNotEqual(hedge.branch, primary.branch)
+        self.assertEqual(d.siblings(primary), [hedge])
+        self.assertEqual(policy.stragglers(d.running.values()), [])
+
+        d.cancel(hedge)
+        self.assertEqual(set(d.running), {"T-SLOW"})
+        d.wait_any()
+
+
+class TestGatePool(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        import config
+        import gate_pool
+        import gates
+        import state
+        self.gate_pool = gate_pool
+        self.GateResult = gates.GateResult
+        self.config = config.Config(gate_concurrency=3)
+        self.Task = state.Task
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def test_gates_run_in_parallel_and_report_queue_and_exec_time(self):
+        def slow_gate(task, output_path, config, project_path):
+            time.sleep(0.3)
+            return self.GateResult(passed=task.id != "T-2", summary=task.id)
+
+        pool = self.gate_pool.GatePool(self.config, self._tmp.name)
+        workers = [
+            types.SimpleNamespace(key=f"T-{i}", task=self.Task(id=f"T-{i}", title="t", role="r", phase="implementation"),
+                                  finished_at=time.time(), output_path="")
+            for i in range(1, 4)
+        ]
+        start = time.time()
+        with mock.patch.object(self.gate_pool, "gate_check", slow_gate):
+            for w in workers:
+                pool.submit(w)
+            self.assertEqual(len(pool.pending()), 3)
+            outcomes = []
+            while len(outcomes) < 3:
+                outcomes += pool.wait(timeout=5)
+        self.assertLess(time.time() - start, 0.8)
+        self.assertEqual(pool.pending(), [])
+        self.assertEqual({o.worker.key: o.result.passed for o in outcomes}, {"T-1": True, "T-2": False, "T-3": True})
+        self.assertTrue(all(o.exec_s >= 0.3 and o.queued_s < 0.3 for o in outcomes))
+        pool.close()
+
+
+class TestGateCache(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        import config
+        import gate_cache
+        import gates
+        import state
+        gate_cache._caches.clear()
+        self.gate_cache = gate_cache
+        self.gates = gates
+        self.Config = config.Config
+        self.output = self.project / "out.txt"
+        self.output.write_text("worker output", encoding="utf-8")
+        (self.project / "src").mkdir()
+        (self.project / "src" / "app.py").write_text("print('hi')\n", encoding="utf-8")
+        self.task = state.Task(id="T-1", title="t", role="r", phase="implementation", acceptance="works")
+
+    def tearDown(self):
+        self.gate_cache._caches.clear()
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _check(self, config, replies):
+        judge = mock.Mock(side_effect=replies)
+        with mock.patch.object(self.gates, "_call_llm_judge", judge):
+            result = self.gates.gate_check(self.task, str(self.output), config, str(self.project))
+        return result, judge.call_count
+
+    def test_unchanged_inputs_reuse_the_verdict_across_runs(self):
+        config = self.Config(gate_cache_size=4)
+        verdict = '{"passed": true, "summary": "ok", "evidence": "", "missing": []}'
+        self.assertEqual(self._check(config, [verdict])[1], 1)
+        self.gate_cache._caches.clear()  # as if the run was resumed in a new process
+        result, calls = self._check(config, [verdict])
+        self.assertEqual((result.passed, result.summary, calls), (True, "ok", 0))
+        hits = [line for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines() if "gate_cache_hit" in line]
+        self.assertEqual(len(hits), 1)
+
+        self.output.write_text("different output", encoding="utf-8")
+        self.assertEqual(self._check(config, [verdict])[1], 1)
+        self.assertEqual(self._check(self.Config(gate_cache_size=4, gate_model="other"), [verdict])[1], 1)
+
+    def test_judge_failures_are_not_cached_and_lru_is_capped(self):
+        config = self.Config(gate_cache_size=2)
+        self._check(config, ["not json"])
+        self.assertEqual(self._check(config, ["not json"])[1], 1)
+
+        cache = self.gate_cache.GateCache(str(self.project), 2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        saved = Path(cache.path).read_text()
+        cache.get("a")
+        self.assertEqual(Path(cache.path).read_text(), saved)  # a hit does not rewrite the file
+        cache.flush()
+        self.assertNotEqual(Path(cache.path).read_text(), saved)
+        cache.put("c", {"n": 3})
+        reloaded = self.gate_cache.GateCache(str(self.project), 2)
+        self.assertEqual((reloaded.get("a"), reloaded.get("b"), reloaded.get("c")), ({"n": 1}, None, {"n": 3}))
+
+
+class TestGateBatching(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        import config
+        import gates
+        import state
+        self.gates = gates
+        self.config = config.Config(gate_cache_size=0, gate_batch_window_s=0.5, gate_batch_max=3)
+        self.tasks = [state.Task(id=f"T-{i}", title=f"t{i}", role="designer", phase="design") for i in range(1, 4)]
+        for task in self.tasks:
+            (self.project / f"{task.id}.txt").write_text(f"output of {task.id}", encoding="utf-8")
+
+    def tearDown(self):
+        self.gates._batcher = None
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _run_concurrently(self, judge):
+        with mock.patch.object(self.gates, "_call_llm_judge", judge):
+            return self._check_all()
+
+    def _check_all(self):
+        results = {}
+
+        def check(task):
+            results[task.id] = self.gates.gate_check(task, str(self.project / f"{task.id}.txt"), self.config, str(self.project))
+
+        threads = [threading.Thread(target=check, args=(t,)) for t in self.tasks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        return results
+
+    def test_close_arrivals_share_one_judge_call(self):
+        def judge(prompt, model, config):
+            self.assertIn("Task 3 of 3", prompt)
+            return json.dumps([
+                {"task_id": tid, "passed": tid != "T-2", "summary": tid, "evidence": "", "missing": []}
+                for tid in ("T-1", "T-2", "T-3")
+            ])
+
+        judge = mock.Mock(side_effect=judge)
+        start = time.time()
+        results = self._run_concurrently(judge)
+        self.assertLess(time.time() - start, 0.5)  # a full batch does not wait out the window
+        self.assertEqual(judge.call_count, 1)
+        self.assertEqual({tid: (r.passed, r.summary) for tid, r in results.items()},
+                         {"T-1": (True, "T-1"), "T-2": (False, "T-2"), "T-3": (True, "T-3")})
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_fake_judge_answers_a_batch_in_one_request(self):
+        import fake_judge
+        self.tasks[1].acceptance = fake_judge.FAIL_MARKER
+        with fake_judge.FakeJudgeServer() as server:
+            self.config.judge_backend, self.config.judge_url = "http", server.url
+            results = self._check_all()
+        self.assertEqual(server.requests, 1)
+        self.assertEqual({tid: r.passed for tid, r in results.items()}, {"T-1": True, "T-2": False, "T-3": True})
+        event = json.loads((self.project / "logs" / "runs.jsonl").read_text())
+        self.assertEqual((event["size"], event["fallback"]), (3, []))
+
+    def test_unparseable_batch_reply_falls_back_to_individual_calls(self):
+        def judge(prompt, model, config):
+            if "Task 1 of" in prompt:
+                return "[not json"
+            return '{"passed": true, "summary": "single"}'
+
+        judge = mock.Mock(side_effect=judge)
+        results = self._run_concurrently(judge)
+        self.assertEqual(judge.call_count, 4)
+        self.assertTrue(all(r.passed and r.summary == "single" for r in results.values()))
+        event = json.loads((self.project / "logs" / "runs.jsonl").read_text())
+        self.assertEqual((event["event"], sorted(event["fallback"])), ("gate_batch", ["T-1", "T-2", "T-3"]))
+
+
+class TestPreGate(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project, _ = make_project(Path(self._tmp.name))
+        import config
+        import gates
+        import state
+        self.gates = gates
+        self.Config = config.Config
+        self.Task = state.Task
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _check(self, phase, config, worktree=None):
+        tree = worktree or self.project
+        task = self.Task(id="T-1", title="t", role="r", phase=phase)
+        judge = mock.Mock(return_value='{"passed": true, "summary": "ok"}')
+        with mock.patch.object(self.gates, "_call_llm_judge", judge):
+            result = self.gates.gate_check(task, str(tree / ".worker_output.txt"), config, str(self.project))
+        return result, judge.call_count
+
+    def test_mechanical_failures_skip_the_judge(self):
+        config = self.Config(pre_gate_builtin=True)
+        result, calls = self._check("implementation", config)
+        self.assertEqual((result.passed, calls), (False, 0))
+        self.assertEqual(result.missing, ["missing or empty: all of src/, tests/"])
+
+        docs = self.project / "docs"
+        docs.mkdir()
+        (docs / "README.md").write_text("# App\n\nSee [setup](SETUP.md).\n- [ ] ship\n", encoding="utf-8")
+        (docs / "SETUP.md").write_text("# Setup: [Project Name]\n\nRun it. TODO: commands\n", encoding="utf-8")
+        result, calls = self._check("documentation", config)
+        self.assertEqual(calls, 0)
+        self.assertEqual(result.missing, ["placeholder in docs/SETUP.md:1: [Project Name]"])
+        events = (self.project / "logs" / "runs.jsonl").read_text()
+        self.assertEqual(events.count('"pre_gate_fail"'), 2)
+
+    def test_untouched_project_template_passes_the_documentation_rules(self):
+        import pregate
+        template = REPO_ROOT / "concurrent" / "new-project"
+        self.assertIn("[Name]", (template / "docs" / "API.md").read_text(encoding="utf-8"))
+        self.assertEqual(pregate.check("documentation", str(template), {}), [])
+
+        docs = self.project / "docs"
+        docs.mkdir()
+        (docs / "README.md").write_text("# App\n\nThe TODO list view groups items by due date.\n", encoding="utf-8")
+        (docs / "SETUP.md").write_text("# Setup\n\nRun `make`.\n", encoding="utf-8")
+        (docs / "API.md").write_text("# API\n\n## Endpoint: [Name]\n", encoding="utf-8")
+        self.assertEqual(pregate.check("documentation", str(self.project), {}), [])
+
+    def test_rules_run_in_the_worker_tree_and_can_be_replaced_from_config(self):
+        worktree = self.project / ".worktrees" / "T-1"
+        subprocess.run(["git", "worktree", "add", "-q", "-b", "agent/r/T-1", str(worktree)], cwd=self.project, check=True)
+        (worktree / "tests").mkdir()
+        (worktree / "tests" / "test_app.py").write_text("", encoding="utf-8")
+        rules = {"implementation": [
+            {"rule": "non_empty", "paths": ["src/", "tests/"], "any": True},
+            {"rule": "sections", "path": "BRIEF.md", "headings": ["Goals"]},
+            {"rule": "command", "run": "exit 3"},
+        ]}
+        result, calls = self._check("implementation", self.Config(gate_cache_size=0, pre_gate_rules=rules), worktree)
+        self.assertEqual(calls, 0)
+        self.assertEqual(result.missing, ["missing section in BRIEF.md: Goals", "command failed (exit 3): exit 3"])
+
+        result, calls = self._check("implementation", self.Config(pre_gate_builtin=True, pre_gate_rules={"implementation": []}))
+        self.assertEqual((result.passed, calls), (True, 1))
+
+    def test_builtin_rules_are_off_by_default(self):
+        result, calls = self._check("implementation", self.Config())
+        self.assertEqual((result.passed, calls), (True, 1))
+
+
+class TestHttpJudge(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        import config
+        import fake_judge
+        import judge
+        self.Config = config.Config
+        self.fake_judge = fake_judge
+        self.judge = judge
+
+    def tearDown(self):
+        sys.path.remove(str(RUNTIME_DIR))
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_pooled_client_reuses_one_connection_and_retries_overload(self):
+        with self.fake_judge.FakeJudgeServer(errors=(429, 503)) as server, \
+                mock.patch.object(self.judge, "BACKOFF_BASE_S", 0.01):
+            config = self.Config(judge_backend="http", judge_url=server.url, judge_concurrency=1)
+            client = self.judge.HttpJudge(config)
+            replies = [json.loads(client.judge(f"gate {i}", "m", 10)) for i in range(3)]
+            failed = json.loads(client.judge(self.fake_judge.FAIL_MARKER, "m", 10))
+            client.close()
+        self.assertTrue(all(r["passed"] for r in replies))
+        self.assertFalse(failed["passed"])
+        self.assertEqual((server.requests, server.connections), (6, 1))
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_time_queued_for_a_judge_slot_counts_against_the_timeout(self):
+        with self.fake_judge.FakeJudgeServer() as server:
+            client = self.judge.HttpJudge(self.Config(judge_backend="http", judge_url=server.url, judge_concurrency=1))
+            client._slots.acquire()  # a saturated judge: every slot is busy
+            start = time.time()
+            reply = json.loads(client.judge("gate", "m", 1))
+            waited = time.time() - start
+            client._slots.release()
+            client.close()
+        self.assertEqual((reply["passed"], reply["missing"]), (False, ["timeout"]))
+        self.assertLess(waited, 5)
+        self.assertEqual(server.requests, 0)
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_exhausted_retries_fail_the_gate(self):
+        with self.fake_judge.FakeJudgeServer(errors=(503, 503)) as server, \
+                mock.patch.object(self.judge, "BACKOFF_BASE_S", 0.01):
+            config = self.Config(judge_backend="http", judge_url=server.url, judge_max_retries=1)
+            reply = json.loads(self.judge.HttpJudge(config).judge("gate", "m", 10))
+        self.assertEqual((reply["passed"], reply["missing"]), (False, ["judge_error"]))
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_retry_after_zero_retries_at_once(self):
+        with self.fake_judge.FakeJudgeServer(errors=(429,)) as server, \
+                mock.patch.object(self.judge, "_backoff", return_value=30.0):
+            start = time.time()
+            reply = json.loads(self.judge.HttpJudge(self.Config(judge_backend="http", judge_url=server.url)).judge("gate", "m", 10))
+        self.assertTrue(reply["passed"])
+        self.assertLess(time.time() - start, 5)
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+    def test_shared_client_is_rebuilt_when_its_settings_change(self):
+        base = self.Config(judge_backend="http", judge_url="http://127.0.0.1:9")
+        same = self.judge.judge_for(base)
+        self.assertIs(self.judge.judge_for(self.Config(judge_backend="http", judge_url="http://127.0.0.1:9")), same)
+        self.assertIsNot(self.judge.judge_for(self.Config(judge_backend="http", judge_url="http://127.0.0.1:9", judge_max_retries=0)), same)
+        self.assertIsNot(self.judge.judge_for(self.Config(judge_backend="http", judge_url="http://127.0.0.1:9", judge_api_key_env="OTHER_KEY")), same)
+
+    def test_fake_server_speaks_the_messages_api(self):
+        with self.fake_judge.FakeJudgeServer() as server:
+            conn = http.client.HTTPConnection(server.url.removeprefix("http://"))
+            for _ in range(2):
+                conn.request("POST", "/v1/messages", json.dumps({"messages": [{"role": "user", "content": "hi"}]}))
+                body = json.loads(conn.getresponse().read())
+            conn.close()
+        self.assertTrue(json.loads(body["content"][0]["text"])["passed"])
+        self.assertEqual((server.requests, server.connections), (2, 1))
+
+
+class TestMergeQueue(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project, _ = make_project(Path(self._tmp.name))
+        for key, value in (("user.email", "t@example.com"), ("user.name", "t")):
+            subprocess.run(["git", "config", key, value], cwd=self.project, check=True)
+        import config
+        import merge_queue
+        import state
+        self.merge_queue = merge_queue
+        self.Config = config.Config
+        self.Task = state.Task
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _branch(self, task_id: str, deps=(), path: str = ""):
+        task = self.Task(id=task_id, title=task_id, role="fullstack-engineer", phase="implementation", dependencies=list(deps))
+        branch, worktree = f"agent/fullstack-engineer/{task_id}", str(self.project / ".worktrees" / task_id)
+        subprocess.run(["git", "worktree", "add", "-q", "-b", branch, worktree], cwd=self.project, check=True)
+        Path(worktree, path or f"{task_id}.txt").write_text(task_id, encoding="utf-8")
+        subprocess.run(["git", "add", "-A"], cwd=worktree, check=True)
+        subprocess.run(["git", "commit", "-qm", task_id], cwd=worktree, check=True)
+        return types.SimpleNamespace(key=task_id, task=task, branch=branch, worktree=worktree)
+
+    def test_merges_are_serialised_in_dependency_order_and_bounded(self):
+        mq = self.merge_queue.MergeQueue(self.Config(merge_queue_size=2), str(self.project))
+        child, parent, extra = self._branch("T-2", deps=["T-1"]), self._branch("T-1"), self._branch("T-3")
+        with mq._cond:  # hold the merge thread while the queue fills up
+            self.assertTrue(mq.submit(child))
+            self.assertTrue(mq.submit(parent))
+            self.assertFalse(mq.submit(extra))
+
+        outcomes = []
+        while len(outcomes) < 2:
+            mq.changed() or time.sleep(0.01)
+            outcomes += mq.results()
+        mq.close()
+
+        self.assertEqual([o.worker.key for o in outcomes], ["T-1", "T-2"])
+        self.assertTrue(all(o.conflict is None for o in outcomes))
+        self.assertTrue((self.project / "T-2.txt").exists())
+
+    def test_cleanup_error_after_a_merge_is_logged_not_reported_as_a_conflict(self):
+        mq = self.merge_queue.MergeQueue(self.Config(), str(self.project))
+        worker = self._branch("T-1")
+        with mock.patch.object(self.merge_queue, "cleanup_worktree", side_effect=OSError("worktree busy")):
+            self.assertTrue(mq.submit(worker))
+            outcomes = []
+            while not outcomes:
+                mq.changed() or time.sleep(0.01)
+                outcomes += mq.results()
+        mq.close()
+
+        self.assertIsNone(outcomes[0].conflict)
+        self.assertTrue((self.project / "T-1.txt").exists())
+        log = (self.project / "logs" / "runs.jsonl").read_text(encoding="utf-8")
+        self.assertIn('"event": "merge_cleanup_error"', log)
+        self.assertIn("worktree busy", log)
+
+    def test_predicted_conflicts_fail_before_touching_main_and_clean_branches_merge_least_overlapping_first(self):
+        mq = self.merge_queue.MergeQueue(self.Config(merge_queue_size=4, merge_predict=True), str(self.project))
+        stale = self._branch("T-A", path="BRIEF.md")
+        (self.project / "BRIEF.md").write_text("Edited on main.", encoding="utf-8")
+        subprocess.run(["git", "commit", "-qam", "main edit"], cwd=self.project, check=True)
+        x, y, z = self._branch("T-X", path="shared.txt"), self._branch("T-Y", path="shared.txt"), self._branch("T-Z")
+        with mq._cond:
+            for w in (stale, x, y, z):
+                self.assertTrue(mq.submit(w))
+
+        outcomes = []
+        while len(outcomes) < 4:
+            mq.changed() or time.sleep(0.01)
+            outcomes += mq.results()
+        mq.close()
+
+        self.assertEqual([(o.worker.key, o.conflict.paths if o.conflict else None) for o in outcomes], [
+            ("T-A", ["BRIEF.md"]), ("T-Z", None), ("T-X", None), ("T-Y", ["shared.txt"]),
+        ])
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=self.project, capture_output=True, text=True)
+        self.assertEqual(status.stdout, "")
+        self.assertEqual((self.project / "BRIEF.md").read_text(encoding="utf-8"), "Edited on main.")
+        events = [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+        self.assertEqual([e["result"] for e in events if e["event"] == "merge"], ["predicted_conflict", "merged", "merged", "predicted_conflict"])
+
+
+    def test_disjoint_branches_are_merged_together_in_one_octopus_commit(self):
+        mq = self.merge_queue.MergeQueue(self.Config(merge_queue_size=8, merge_batch_max=3), str(self.project))
+        workers = [self._branch(t) for t in ("T-1", "T-2", "T-3", "T-4")]
+        with mq._cond:
+            for w in workers:
+                self.assertTrue(mq.submit(w))
+
+        outcomes = []
+        while len(outcomes) < 4:
+            mq.changed() or time.sleep(0.01)
+            outcomes += mq.results()
+        mq.close()
+
+        self.assertTrue(all(o.conflict is None for o in outcomes))
+        self.assertTrue(all((self.project / f"{t}.txt").exists() for t in ("T-1", "T-2", "T-3", "T-4")))
+        merges = subprocess.run(["git", "rev-list", "--merges", "--parents", "HEAD"], cwd=self.project, capture_output=True, text=True)
+        self.assertEqual(sorted(len(line.split()) - 1 for line in merges.stdout.splitlines()), [2, 4])
+        events = [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+        self.assertEqual([len(e["tasks"]) for e in events if e["event"] == "merge_batch"], [3])
+        self.assertEqual([e["result"] for e in events if e["event"] == "merge"], ["merged"] * 4)
+
+    def test_failed_octopus_merge_leaves_main_untouched(self):
+        import merge
+        a, b = self._branch("T-A", path="shared.txt"), self._branch("T-B", path="shared.txt")
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.project, capture_output=True, text=True).stdout
+        with self.assertRaises(merge.MergeConflict):
+            merge.merge_branches([a.task, b.task], [a.branch, b.branch], str(self.project))
+        self.assertEqual(subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.project, capture_output=True, text=True).stdout, head)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=self.project, capture_output=True, text=True)
+        self.assertEqual(status.stdout, "")
+
+
+class TestConflictResolution(unittest.TestCase):
+    setUp, tearDown, _branch = TestMergeQueue.setUp, TestMergeQueue.tearDown, TestMergeQueue._branch
+
+    def _main_edit(self):
+        (self.project / "BRIEF.md").write_text("Edited on main.", encoding="utf-8")
+        subprocess.run(["git", "commit", "-qam", "main edit"], cwd=self.project, check=True)
+
+    def test_clean_rebase_rechecks_only_the_pre_gate(self):
+        import conflicts
+        import merge
+
+        with_src, without_src = self._branch("T-SRC", path="src.txt"), self._branch("T-DOC")
+        Path(with_src.worktree, "src").mkdir()
+        Path(with_src.worktree, "src", "app.py").write_text("print()\n", encoding="utf-8")
+        subprocess.run(["git", "add", "-A"], cwd=with_src.worktree, check=True)
+        subprocess.run(["git", "commit", "-qm", "src"], cwd=with_src.worktree, check=True)
+        self._main_edit()
+
+        config = self.Config(pre_gate_builtin=True)
+        conflict = merge.MergeConflict(with_src.task, "conflict", ["BRIEF.md"])
+        self.assertIsNone(conflicts.rebase_and_recheck(conflict, with_src.worktree, str(self.project), config))
+        self.assertEqual(Path(with_src.worktree, "BRIEF.md").read_text(encoding="utf-8"), "Edited on main.")
+
+        failed = conflicts.rebase_and_recheck(merge.MergeConflict(without_src.task, "conflict", ["BRIEF.md"]), without_src.worktree, str(self.project), config)
+        self.assertIn("pre-gate checks fail", failed.details)
+
+    def test_failed_rebase_resolves_in_the_existing_worktree(self):
+        import dispatcher
+        import orchestrator
+        import state
+
+        w = self._branch("T-A", path="BRIEF.md")
+        w.variant = ""
+        w.task.file_scope, w.task.required_reads = ["BRIEF.md"], ["specs/brief.md"]
+        self._main_edit()
+        board = state.State(str(self.project))
+        board.add_tasks([w.task])
+        board.mark_in_progress(w.task)
+
+        config = self.Config(merge_rebase_attempts=2, conflict_resolution=True)
+        mq = self.merge_queue.MergeQueue(config, str(self.project))
+        self.assertTrue(mq.submit(w))
+        outcomes = []
+        while not outcomes:
+            mq.changed() or time.sleep(0.01)
+            outcomes += mq.results()
+        mq.close()
+        conflict = outcomes[0].conflict
+        self.assertEqual(conflict.paths, ["BRIEF.md"])
+
+        d = dispatcher.Dispatcher(config, str(self.project))
+        with mock.patch.object(orchestrator, "notify"):
+            orchestrator._handle_conflict(w, conflict, board, d, config, str(self.project))
+        self.assertEqual((w.task.status, w.task.retries), ("ready", 1))
+        self.assertEqual(len(board.tasks), 1)  # no "Fix:" task
+
+        resolver = d.make_worker(w.task)
+        self.assertTrue(resolver.resolve)
+        self.assertEqual(resolver.worktree, w.worktree)
+        resolver.prepare()
+        resolver.finish()
+        self.assertIn("<<<<<<<", resolver._task_prompt)
+        self.assertIn("File scope: BRIEF.md", resolver._task_prompt)
+        self.assertIn("<<<<<<<", Path(w.worktree, "BRIEF.md").read_text(encoding="utf-8"))
+        events = [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+        self.assertEqual([e["result"] for e in events if e["event"] == "merge_rebase"], ["conflict"])
+
+
+class TestWorktreePool(unittest.TestCase):
+    setUp, tearDown = TestMergeQueue.setUp, TestMergeQueue.tearDown
+
+    def _git(self, *args, cwd=None):
+        return subprocess.run(["git", *args], cwd=cwd or self.project, capture_output=True, text=True, check=True).stdout.strip()
+
+    def test_workers_take_warm_worktrees_that_are_recycled_at_the_new_head(self):
+        import merge
+        import worker
+        import worktree_pool
+        pool = worktree_pool.WorktreePool(str(self.project), 1)
+        deadline = time.time() + 10
+        while pool.warm_s is None and time.time() < deadline:
+            time.sleep(0.01)
+
+        task = self.Task(id="T-1", title="One", role="fullstack-engineer", phase="implementation")
+        w = worker.Worker(task, self.Config(), str(self.project), pool=pool)
+        w.prepare()
+        w.finish()
+        while pool.stats()["idle"] < 1 and time.time() < deadline:  # refilled behind it
+            time.sleep(0.01)
+        self.assertTrue(pool.owns(w.worktree))
+        self.assertEqual(self._git("branch", "--show-current", cwd=w.worktree), w.branch)
+        Path(w.worktree, "one.txt").write_text("one", encoding="utf-8")
+        self._git("add", "one.txt", cwd=w.worktree)
+        self._git("commit", "-qm", "T-1", cwd=w.worktree)
+        merge.merge_branch(task, str(self.project), w.branch)
+        merge.cleanup_worktree(task, str(self.project), w.worktree, w.branch, pool=pool)
+
+        self.assertTrue(os.path.isdir(w.worktree))
+        self.assertEqual(self._git("branch", "--list", w.branch), "")
+        self.assertEqual(self._git("rev-parse", "HEAD", cwd=w.worktree), self._git("rev-parse", "HEAD"))
+        self.assertEqual(self._git("status", "--porcelain", cwd=w.worktree), "")
+
+        second = worker.Worker(self.Task(id="T-2", title="Two", role="fullstack-engineer", phase="implementation"), self.Config(), str(self.project), pool=pool)
+        self.assertEqual(pool.acquire(second.branch), w.worktree)  # the recycled one, before the refilled one
+        self.assertTrue(Path(w.worktree, "one.txt").exists())
+        pool.close()
+        self.assertIsNone(pool.acquire("agent/extra"))
+        stats = pool.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["recycled"]), (2, 1, 1))
+        events = [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+        self.assertEqual([e["result"] for e in events if e["event"] == "worktree_pool"], ["warm"])
+
+
+class TestSparseWorktree(unittest.TestCase):
+    setUp, tearDown = TestMergeQueue.setUp, TestMergeQueue.tearDown
+
+    def test_sparse_worktree_holds_only_scope_reads_and_harness(self):
+        import worker
+        for path in ("src/api/users.py", "src/web/app.js", "specs/api.md", "docs/guide.md"):
+            (self.project / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.project / path).write_text(path, encoding="utf-8")
+        subprocess.run(["git", "add", "-A"], cwd=self.project, check=True)
+        subprocess.run(["git", "commit", "-qm", "tree"], cwd=self.project, check=True)
+        config = self.Config(sparse_worktrees=True, sparse_always_include=["docs"])
+        task = self.Task(
+            id="T-1", title="Users API", role="fullstack-engineer", phase="implementation",
+            file_scope=["src/api/users.py", "src/api/new_module.py"], required_reads=["specs/api.md"],
+        )
+        w = worker.Worker(task, config, str(self.project))
+        w.prepare()
+        w.finish()
+
+        tree = Path(w.worktree)
+        self.assertEqual(w.sparse, ["src/api", "specs", "harness/agents", "docs"])
+        for present in ("src/api/users.py", "specs/api.md", "docs/guide.md", "BRIEF.md", "harness/agents/fullstack-engineer.md"):
+            self.assertTrue((tree / present).exists(), present)
+        self.assertFalse((tree / "src" / "web").exists())
+        self.assertTrue((self.project / "src" / "web" / "app.js").exists())
+        self.assertIn("## Sparse Checkout", w.command()[-1])
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=tree, capture_output=True, text=True)
+        self.assertEqual(status.stdout, "")
+
+        unscoped = worker.Worker(self.Task(id="T-2", title="Anything", role="fullstack-engineer", phase="implementation"), config, str(self.project))
+        unscoped.prepare()
+        unscoped.finish()
+        self.assertEqual(unscoped.sparse, [])
+        self.assertTrue(Path(unscoped.worktree, "src", "web", "app.js").exists())
+
+
+STATUS_TEMPLATE = """# Project Status
+
+## Current Phase
+implementation
+
+## Tasks
+
+- [ ] [T-1] write src/one.py
+  - Owner: fullstack-engineer
+  - Phase: implementation
+  - Status: ready
+- [ ] [T-2] write src/two.py
+  - Owner: fullstack-engineer
+  - Phase: implementation
+  - Dependencies: T-1
+  - Status: ready
+- [ ] [T-3] write tests/test_three.py
+  - Owner: fullstack-engineer
+  - Phase: implementation
+  - Status: ready
+"""
+
+
+class EngineTestCase(unittest.TestCase):
+    """Runs run.py end to end on a git project whose board is STATUS_TEMPLATE."""
+
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project, self.bin_dir = make_project(Path(self._tmp.name))
+        (self.project / "AGENTS.md").write_text("Harness rules.", encoding="utf-8")
+        (self.project / ".gitignore").write_text(".worktrees/\nlogs/\nruntime/\n", encoding="utf-8")
+        for key, value in (("user.email", "t@example.com"), ("user.name", "t")):
+            subprocess.run(["git", "config", key, value], cwd=self.project, check=True)
+        import fake_judge
+        self.fake_judge = fake_judge
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _run(self, engine: str, board: str = STATUS_TEMPLATE, options: str = "") -> subprocess.CompletedProcess:
+        (self.project / "STATUS.md").write_text(board, encoding="utf-8")
+        subprocess.run(["git", "add", "-A"], cwd=self.project, check=True)
+        subprocess.run(["git", "commit", "-qm", "board"], cwd=self.project, check=True)
+        with self.fake_judge.FakeJudgeServer() as server:
+            config = self.project / "runtime" / "config.yaml"
+            config.parent.mkdir()
+            config.write_text(
+                "max_workers: 2\n"
+                "skip_phases: [requirements, design, qa, documentation, growth, review]\n"
+                f"judge_backend: http\njudge_url: {server.url}\n{options}",
+                encoding="utf-8",
+            )
+            env = {**os.environ, "PATH": f"{self.bin_dir}{os.pathsep}{os.environ['PATH']}", "ANTHROPIC_API_KEY": "test"}
+            result = subprocess.run(
+                [sys.executable, str(RUNTIME_DIR / "run.py"), "--project", str(self.project), "--engine", engine],
+                env=env, capture_output=True, text=True, timeout=120,
+            )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertGreater(server.requests, 0)  # gates went through the fake judge
+        return result
+
+    def _events(self) -> list[dict]:
+        return [json.loads(line) for line in (self.project / "logs" / "runs.jsonl").read_text().splitlines()]
+
+    def assertMerged(self, *paths: str):
+        for path in paths:
+            shown = subprocess.run(["git", "show", f"HEAD:{path}"], cwd=self.project, capture_output=True, text=True)
+            self.assertEqual(shown.stdout, path)
+
+
+@unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+class TestAsyncEngine(EngineTestCase):
+    def test_async_engine_runs_the_board_to_completion(self):
+        self._run("async")
+
+        self.assertMerged("src/one.py", "src/two.py", "tests/test_three.py")
+        self.assertNotIn("Status: ready", (self.project / "STATUS.md").read_text(encoding="utf-8"))
+        self.assertEqual((self.project / "STATUS.md").read_text(encoding="utf-8").count("Status: done"), 3)
+        events = self._events()
+        completed = [e["task_id"] for e in events if e["event"] == "task_complete"]
+        self.assertEqual(sorted(completed), ["T-1", "T-2", "T-3"])
+        self.assertLess(completed.index("T-1"), completed.index("T-2"))
+        self.assertEqual(events[-1]["event"], "run_complete")
+
+    def test_an_error_while_gating_fails_the_task_not_the_run(self):
+        import async_orchestrator
+        import config
+        import gates
+        (self.project / "STATUS.md").write_text(STATUS_TEMPLATE, encoding="utf-8")
+
+        def gate_check(task, *args):
+            if task.id == "T-3":
+                raise RuntimeError("judge exploded")
+            return gates.GateResult(passed=True, summary="ok")
+
+        cfg = config.Config(max_workers=2, skip_phases=["requirements", "design", "qa", "documentation", "growth", "review"])
+        with mock.patch.dict(os.environ, {"PATH": f"{self.bin_dir}{os.pathsep}{os.environ['PATH']}"}), \
+                mock.patch.object(async_orchestrator, "gate_check", gate_check), \
+                mock.patch.object(async_orchestrator, "notify"):
+            async_orchestrator.run_async(str(self.project), cfg)
+
+        self.assertMerged("src/one.py", "src/two.py", "tests/test_three.py")
+        events = self._events()
+        self.assertIn("RuntimeError: judge exploded", [e.get("error") for e in events if e["event"] == "task_fail" and e["task_id"] == "T-3"])
+        self.assertIn("T-3-fix1", [e["task_id"] for e in events if e["event"] == "task_complete"])
+        self.assertEqual(events[-1]["event"], "run_complete")
+
+    def test_sync_only_options_are_rejected(self):
+        config = self.project / "runtime" / "config.yaml"
+        config.parent.mkdir()
+        config.write_text("hedge_enabled: true\nmerge_batch_max: 4\n", encoding="utf-8")
+        result = subprocess.run(
+            [sys.executable, str(RUNTIME_DIR / "run.py"), "--project", str(self.project), "--engine", "async"],
+            capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("hedge_enabled, merge_batch_max", result.stdout)
+        self.assertFalse((self.project / "logs").exists())
+
+
+@unittest.skipUnless(importlib.util.find_spec("requests"), "requests not installed")
+class TestSyncEngine(EngineTestCase):
+    def test_sync_engine_retries_a_gate_failure_and_runs_the_board_to_completion(self):
+        board = STATUS_TEMPLATE.replace(
+            "- [ ] [T-3] write tests/test_three.py\n  - Owner: fullstack-engineer\n  - Phase: implementation\n",
+            f"- [ ] [T-3] write tests/test_three.py\n  - Owner: fullstack-engineer\n  - Phase: implementation\n  - Acceptance: {self.fake_judge.FAIL_MARKER}\n",
+        )
+        self._run("sync", board)
+
+        self.assertMerged("src/one.py", "src/two.py", "tests/test_three.py")
+        status = (self.project / "STATUS.md").read_text(encoding="utf-8")
+        self.assertIn("[T-3-fix1]", status)
+        self.assertNotIn("Status: ready", status)
+        self.assertNotIn("Status: superseded", status)
+        self.assertEqual(status.count("Status: done"), 4)
+
+        events = self._events()
+        order = [(e["event"], e["task_id"]) for e in events if e["event"] in ("task_dispatch", "task_complete")]
+        self.assertLess(order.index(("task_dispatch", "T-3")), order.index(("task_complete", "T-1")))  # ran side by side
+        self.assertLess(order.index(("task_complete", "T-1")), order.index(("task_dispatch", "T-2")))  # waited for its dependency
+        self.assertEqual([e["task_id"] for e in events if e["event"] == "gate_fail"], ["T-3"])
+        self.assertLess(order.index(("task_dispatch", "T-3")), order.index(("task_dispatch", "T-3-fix1")))
+        self.assertEqual(sorted(t for kind, t in order if kind == "task_complete"), ["T-1", "T-2", "T-3-fix1"])
+        self.assertEqual(len([e for e in events if e["event"] == "slot_utilisation"]), 1)
+        self.assertEqual(events[-1]["event"], "run_complete")
+
+        worktrees = subprocess.run(["git", "worktree", "list"], cwd=self.project, capture_output=True, text=True, check=True).stdout
+        branches = subprocess.run(["git", "branch", "--list", "*T-3*"], cwd=self.project, capture_output=True, text=True, check=True).stdout
+        self.assertEqual((len(worktrees.splitlines()), branches), (1, ""))  # the failed attempt was cleaned up too
+
+    def test_a_phase_stuck_behind_a_blocked_task_pauses_the_run(self):
+        import config
+        import orchestrator
+        import state
+
+        (self.project / "STATUS.md").write_text(STATUS_TEMPLATE.replace("Status: ready", "Status: blocked", 1), encoding="utf-8")
+        board = state.State(str(self.project))
+        orchestrator._check_stalled(board, config.Config(), str(self.project), notify_fn=mock.Mock())
+        self.assertFalse(orchestrator._checkpoint_exists(str(self.project)))  # T-3 can still run
+
+        board.mark_done(board.tasks[2])
+        notify = mock.Mock()
+        orchestrator._check_stalled(board, config.Config(), str(self.project), notify_fn=notify)
+        self.assertTrue(orchestrator._checkpoint_exists(str(self.project)))  # T-2 waits on blocked T-1 forever
+        self.assertIn("blocked: T-1", notify.call_args.args[1])
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        import concurrency
+        import config
+        self.concurrency = concurrency
+        self.config = config.Config(
+            adaptive_concurrency=True, max_workers=3, worker_floor=1, worker_ceiling=6,
+            concurrency_sample_s=0, min_free_mem_mb=1024,
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _adjust(self, load, mem_mb, current, busy):
+        controller = self.concurrency.AdaptiveConcurrency(self.config, self._tmp.name)
+        with mock.patch.object(self.concurrency.os, "getloadavg", return_value=(load, load, load)), \
+                mock.patch.object(self.concurrency, "_mem_available_mb", return_value=mem_mb):
+            controller._cpus = 1
+            return controller.adjust(current, [os.getpid()] * busy)
+
+    def test_overloaded_host_sheds_a_slot(self):
+        self.assertEqual(self._adjust(load=4.0, mem_mb=50_000, current=3, busy=3), 2)
+
+    def test_low_memory_sheds_a_slot_but_not_below_floor(self):
+        self.assertEqual(self._adjust(load=0.1, mem_mb=100, current=1, busy=1), 1)
+        self.assertEqual(self._adjust(load=0.1, mem_mb=100, current=3, busy=3), 2)
+
+    def test_idle_host_with_busy_slots_gains_a_slot_up_to_ceiling(self):
+        self.assertEqual(self._adjust(load=0.1, mem_mb=500_000, current=3, busy=3), 4)
+        self.assertEqual(self._adjust(load=0.1, mem_mb=500_000, current=6, busy=6), 6)
+        self.assertEqual(self._adjust(load=0.1, mem_mb=500_000, current=3, busy=1), 3)
+        log = Path(self._tmp.name) / "logs" / "runs.jsonl"
+        self.assertIn('"event": "concurrency_adjust"', log.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNTIME_DIR = REPO_ROOT / "concurrent" / "new-project" / "runtime"
+
+
+class TestDurationModel(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "logs").mkdir()
+        import config
+        import durations
+        import state
+        self.durations = durations
+        self.config = config.Config(model="m1", duration_min_samples=3, worker_timeout=3600)
+        self.Task = state.Task
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _log(self, *events):
+        with open(self.project / "logs" / "runs.jsonl", "a") as f:
+            for event in events:
+                f.write(json.dumps({"event": "task_complete", "phase": "implementation", **event}) + "\n")
+
+    def _task(self, role="backend-engineer", acceptance="", scope=()):
+        return self.Task(id="T-1", title="t", role=role, phase="implementation", acceptance=acceptance, file_scope=list(scope))
+
+    def test_percentiles_fall_back_to_coarser_keys(self):
+        self._log(*[{"role": "backend-engineer", "model": "m1", "duration_s": d, "acceptance_len": 10, "scope_size": 1} for d in (100, 200, 300, 400, 1000)])
+        self._log(*[{"role": "backend-engineer", "duration_s": 50} for _ in range(3)])  # old events: no model/shape
+        model = self.durations.DurationModel(str(self.project), self.config)
+
+        exact = self._task(acceptance="x" * 10, scope=["src/"])
+        self.assertAlmostEqual(model.p50(exact), 300, delta=15)
+        self.assertAlmostEqual(model.p90(exact), 1000, delta=50)
+
+        other_shape = self._task(acceptance="x" * 1000, scope=["a", "b", "c"])
+        self.assertAlmostEqual(model.p50(other_shape), 300, delta=15)  # role + phase + model
+
+        self.config.model = "m2"
+        self.assertAlmostEqual(model.p50(exact), 100, delta=5)  # role + phase, all 8 samples
+        self.assertIsNone(model.p50(self._task(role="frontend-engineer")))
+
+    def test_summary_is_updated_incrementally(self):
+        self._log(*[{"role": "qa-engineer", "model": "m1", "duration_s": 60} for _ in range(3)])
+        self.durations.DurationModel(str(self.project), self.config)
+        summary = json.loads((self.project / "logs" / "durations.json").read_text())
+        self.assertEqual(summary["offset"], (self.project / "logs" / "runs.jsonl").stat().st_size)
+
+        self._log(*[{"role": "qa-engineer", "model": "m1", "duration_s": 600} for _ in range(5)])
+        model = self.durations.DurationModel(str(self.project), self.config)
+        self.assertAlmostEqual(model.p50(self._task(role="qa-engineer")), 600, delta=30)
+
+        (self.project / "logs" / "runs.jsonl").write_text("")  # log rotated: rebuild from scratch
+        self.assertIsNone(self.durations.DurationModel(str(self.project), self.config).p50(self._task(role="qa-engineer")))
+
+    def test_default_timeout_scales_p90_and_respects_explicit_timeouts(self):
+        self._log(*[{"role": "backend-engineer", "model": "m1", "duration_s": 400} for _ in range(3)])
+        model = self.durations.DurationModel(str(self.project), self.config)
+        task = self._task()
+        self.assertAlmostEqual(model.default_timeout(task), 1200, delta=60)
+
+        task.timeout = 90
+        self.assertIsNone(model.default_timeout(task))
+        self.config.duration_timeout_factor = 100
+        self.assertEqual(model.default_timeout(self._task()), 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
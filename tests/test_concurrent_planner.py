@@ -0,0 +1,243 @@
+import json
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNTIME_DIR = REPO_ROOT / "concurrent" / "new-project" / "runtime"
+HARNESS_CLI = REPO_ROOT / "concurrent" / "new-project" / "cli" / "harness_cli.py"
+
+PLAN = [
+    {"id": "TASK-IMP-001", "title": "Schema", "role": "fullstack-engineer", "dependencies": []},
+    {"id": "TASK-IMP-002", "title": "API", "role": "fullstack-engineer", "dependencies": ["TASK-IMP-001"]},
+]
+
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "specs").mkdir()
+        (self.project / "specs" / "architecture.md").write_text("# Architecture\n", encoding="utf-8")
+        (self.project / "harness" / "agents").mkdir(parents=True)
+        (self.project / "harness" / "agents" / "fullstack-engineer.md").write_text("engineer", encoding="utf-8")
+        (self.project / "runtime").mkdir()
+        (self.project / "runtime" / "config.yaml").write_text("model: m1\n", encoding="utf-8")
+        import config
+        import orchestrator
+        self.orchestrator = orchestrator
+        self.config = config.Config(model="m1", planner_cache=True)
+        self.planner = mock.Mock(return_value=types.SimpleNamespace(returncode=0, stdout=json.dumps(PLAN)))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _plan(self):
+        with mock.patch.object(self.orchestrator.subprocess, "run", self.planner), \
+                mock.patch.object(self.orchestrator, "notify"):
+            return self.orchestrator._plan_implementation_tasks(str(self.project), self.config)
+
+    def _cli(self, *args):
+        result = subprocess.run(
+            [sys.executable, str(HARNESS_CLI), "--project", str(self.project), "--json", "plan", *args],
+            capture_output=True, text=True, check=True,
+        )
+        return result.stdout
+
+    def test_unchanged_inputs_reuse_the_plan_until_specs_change(self):
+        first = self._plan()
+        second = self._plan()
+        self.assertEqual(self.planner.call_count, 1)
+        self.assertEqual([(t.id, t.dependencies) for t in second], [(t.id, t.dependencies) for t in first])
+        self.assertTrue(json.loads(self._cli("show"))["current"])
+
+        (self.project / "specs" / "architecture.md").write_text("# Architecture\n\nNew service.\n", encoding="utf-8")
+        self.assertFalse(json.loads(self._cli("show"))["current"])
+        self._plan()
+        self.assertEqual(self.planner.call_count, 2)
+
+        self.config.model = "m2"
+        self._plan()
+        self.assertEqual(self.planner.call_count, 3)
+
+    def test_pinned_plan_survives_spec_changes_until_invalidated(self):
+        self._plan()
+        self._cli("pin")
+        (self.project / "specs" / "architecture.md").write_text("# Architecture v2\n", encoding="utf-8")
+        self.assertEqual(len(self._plan()), 2)
+        self.assertEqual(self.planner.call_count, 1)
+
+        self._cli("invalidate")
+        self.assertIsNone(json.loads(self._cli("show")))
+        self._plan()
+        self.assertEqual(self.planner.call_count, 2)
+
+    def test_cache_is_off_by_default(self):
+        self.config = type(self.config)(model="m1")
+        self._plan()
+        self._plan()
+        self.assertEqual(self.planner.call_count, 2)
+        self.assertFalse((self.project / "runtime" / "plan_cache.json").exists())
+
+    def test_only_plan_fields_are_cached(self):
+        import plan_cache
+        tasks = self._plan()
+        tasks[0].status, tasks[0].retries, tasks[0].evidence = "superseded", 1, "gate failed"
+        fix = self.orchestrator.Task(id="TASK-IMP-001-fix1", title="Fix: Schema", role="fullstack-engineer", phase="implementation", retries=1)
+        cache = plan_cache.PlanCache(str(self.project))
+        cache.put("k", tasks + [fix])
+
+        self.assertNotIn("status", cache.load()["tasks"][0])
+        reused = cache.get("k")
+        self.assertEqual([t.id for t in reused], ["TASK-IMP-001", "TASK-IMP-002"])
+        self.assertEqual([(t.status, t.retries, t.evidence) for t in reused], [("ready", 0, "")] * 2)
+        self.assertEqual(reused[1].dependencies, ["TASK-IMP-001"])
+
+
+
+class TestIncrementalReplan(unittest.TestCase):
+    SPEC = "# Architecture\n\n## Auth\nSessions in cookies.\n\n## Billing\nStripe checkout.\n"
+
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "specs").mkdir()
+        (self.project / "specs" / "architecture.md").write_text(self.SPEC, encoding="utf-8")
+        (self.project / "harness" / "agents").mkdir(parents=True)
+        (self.project / "harness" / "agents" / "fullstack-engineer.md").write_text("engineer", encoding="utf-8")
+        import config
+        import orchestrator
+        import replan
+        import state
+        self.orchestrator = orchestrator
+        self.replan = replan
+        self.config = config.Config(model="m1", planner_cache=True, incremental_replan=True)
+        self.state = state.State(str(self.project))
+        plan = PLAN + [{"id": "TASK-IMP-003", "title": "Billing", "role": "fullstack-engineer", "dependencies": []}]
+        self.planner = mock.Mock(return_value=types.SimpleNamespace(returncode=0, stdout=json.dumps(plan)))
+        self.state.add_tasks(self._call(self.orchestrator._plan_implementation_tasks, str(self.project), self.config))
+        self.state.mark_done(self.state.tasks[0])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _call(self, fn, *args):
+        with mock.patch.object(self.orchestrator.subprocess, "run", self.planner), \
+                mock.patch.object(self.orchestrator, "notify"):
+            return fn(*args)
+
+    def test_sections_are_diffed_individually(self):
+        edited = self.SPEC.replace("Stripe checkout.", "Invoices only.") + "## Audit\nLog every login.\n"
+        changes = self.replan.diff_specs({"a.md": self.SPEC}, {"a.md": edited})
+        self.assertEqual([(c.section, c.kind) for c in changes], [("a.md > ## Billing", "changed"), ("a.md > ## Audit", "added")])
+        self.assertIn("+Invoices only.", changes[0].text)
+
+    def test_only_changed_sections_are_sent_and_done_work_is_kept(self):
+        (self.project / "specs" / "architecture.md").write_text(self.SPEC.replace("Stripe checkout.", "Invoices only."), encoding="utf-8")
+        ops = {
+            "add": [{"id": "TASK-IMP-004", "title": "Invoices", "role": "fullstack-engineer", "dependencies": ["TASK-IMP-001", "TASK-IMP-003"]}],
+            "modify": [{"id": "TASK-IMP-001", "title": "Redo schema"}, {"id": "TASK-IMP-002", "acceptance": "Invoice endpoints"}],
+            "cancel": ["TASK-IMP-003"],
+        }
+        self.planner.return_value = types.SimpleNamespace(returncode=0, stdout=json.dumps(ops))
+        self._call(self.orchestrator._replan_on_spec_changes, self.state, str(self.project), self.config)
+
+        prompt = self.planner.call_args.args[0][-1]
+        self.assertIn("Invoices only.", prompt)
+        self.assertNotIn("Sessions in cookies.", prompt)
+        tasks = {t.id: t for t in self.state.tasks}
+        self.assertEqual(sorted(tasks), ["TASK-IMP-001", "TASK-IMP-002", "TASK-IMP-004"])
+        self.assertEqual((tasks["TASK-IMP-001"].title, tasks["TASK-IMP-001"].status), ("Schema", "done"))
+        self.assertEqual(tasks["TASK-IMP-002"].acceptance, "Invoice endpoints")
+        self.assertEqual(tasks["TASK-IMP-004"].dependencies, ["TASK-IMP-001"])
+
+        calls = self.planner.call_count
+        self._call(self.orchestrator._replan_on_spec_changes, self.state, str(self.project), self.config)
+        self.assertEqual(self.planner.call_count, calls)  # the updated plan now matches the specs
+
+
+class TestMapReducePlanner(unittest.TestCase):
+    PARTS = {
+        "api.md": [
+            {"id": "TASK-IMP-001", "title": "Schema", "role": "fullstack-engineer", "dependencies": []},
+            {"id": "TASK-IMP-002", "title": "Endpoints", "role": "fullstack-engineer", "dependencies": ["TASK-IMP-001"]},
+        ],
+        "web.md": [
+            {"id": "TASK-IMP-001", "title": "Shared schema", "role": "fullstack-engineer", "dependencies": []},
+            {"id": "TASK-IMP-002", "title": "Pages", "role": "fullstack-engineer", "dependencies": ["TASK-IMP-001", "TASK-IMP-009"]},
+        ],
+    }
+    MERGE = {
+        "duplicates": [{"drop": "TASK-IMP-201", "keep": "TASK-IMP-101"}],
+        "dependencies": [{"id": "TASK-IMP-202", "depends_on": ["TASK-IMP-102"]}, {"id": "TASK-IMP-101", "depends_on": ["TASK-IMP-202"]}],
+    }
+
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "specs").mkdir()
+        (self.project / "specs" / "api.md").write_text("# API\n\nREST endpoints over the schema.\n", encoding="utf-8")
+        (self.project / "specs" / "web.md").write_text("# Web\n\nPages calling the API.\n", encoding="utf-8")
+        (self.project / "harness" / "agents").mkdir(parents=True)
+        (self.project / "harness" / "agents" / "fullstack-engineer.md").write_text("engineer", encoding="utf-8")
+        import config
+        import orchestrator
+        import state
+        self.orchestrator = orchestrator
+        self.config = config.Config(model="m1", planner_map_reduce_chars=40)
+        self.state = state.State(str(self.project))
+        self.prompts = []
+        self.on_board_at_merge = None
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _planner(self, cmd, **kwargs):
+        system, prompt = cmd[cmd.index("--systemPrompt") + 1], cmd[-1]
+        self.prompts.append(prompt)
+        if system == self.orchestrator._PLAN_MERGE_PROMPT:
+            self.on_board_at_merge = sorted(t.id for t in self.state.tasks)
+            return types.SimpleNamespace(returncode=0, stdout=json.dumps(self.MERGE))
+        name = "api.md" if "specs/api.md" in prompt else "web.md"
+        return types.SimpleNamespace(returncode=0, stdout=json.dumps(self.PARTS[name]))
+
+    def test_parts_are_planned_separately_then_merged_on_the_board(self):
+        with mock.patch.object(self.orchestrator.subprocess, "run", side_effect=self._planner), \
+                mock.patch.object(self.orchestrator, "notify"):
+            tasks = self.orchestrator._plan_implementation_tasks(str(self.project), self.config, self.state)
+        self.state.add_tasks(tasks)
+
+        self.assertEqual(len(self.prompts), 3)
+        self.assertEqual([p.count("### specs/") for p in self.prompts], [1, 1, 0])
+        self.assertEqual(self.on_board_at_merge, ["TASK-IMP-101", "TASK-IMP-102", "TASK-IMP-201", "TASK-IMP-202"])
+        board = {t.id: t.dependencies for t in self.state.tasks}
+        self.assertEqual(board, {
+            "TASK-IMP-101": [],  # the cyclic edge back to 202 is left out
+            "TASK-IMP-102": ["TASK-IMP-101"],
+            "TASK-IMP-202": ["TASK-IMP-101", "TASK-IMP-102"],
+        })
+        self.assertEqual(sorted(t.id for t in tasks), sorted(board))
+
+    def test_small_specs_use_a_single_planner_call(self):
+        self.config.planner_map_reduce_chars = 0
+        planner = mock.Mock(return_value=types.SimpleNamespace(returncode=0, stdout=json.dumps(PLAN)))
+        with mock.patch.object(self.orchestrator.subprocess, "run", planner), \
+                mock.patch.object(self.orchestrator, "notify"):
+            tasks = self.orchestrator._plan_implementation_tasks(str(self.project), self.config, self.state)
+        self.assertEqual(planner.call_count, 1)
+        self.assertEqual([t.id for t in tasks], ["TASK-IMP-001", "TASK-IMP-002"])
+        self.assertEqual(self.state.tasks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
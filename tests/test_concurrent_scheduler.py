@@ -0,0 +1,67 @@
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNTIME_DIR = REPO_ROOT / "concurrent" / "new-project" / "runtime"
+
+
+class TestCriticalPathScheduler(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        import config
+        import scheduler
+        import state
+        self.scheduler_mod = scheduler
+        self.Config = config.Config
+        self.Task = state.Task
+
+    def tearDown(self):
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _task(self, task_id, timeout, deps=(), priority="P1"):
+        return self.Task(
+            id=task_id, title=task_id, role="fullstack-engineer", phase="implementation",
+            dependencies=list(deps), timeout=timeout, priority=priority,
+        )
+
+    def _board(self):
+        # A(10) -> B(100) -> C(10) is the long chain; D(50) and E(50) are independent.
+        return [
+            self._task("D", 50),
+            self._task("E", 50, priority="P0"),
+            self._task("A", 10),
+            self._task("B", 100, deps=["A"]),
+            self._task("C", 10, deps=["B"]),
+        ]
+
+    def test_critical_path_lengths_include_dependents(self):
+        board = self._board()
+        lengths = self.scheduler_mod.critical_path_lengths(board, lambda t: float(t.timeout))
+        self.assertEqual(lengths["A"], 120)
+        self.assertEqual(lengths["B"], 110)
+        self.assertEqual(lengths["D"], 50)
+
+    def test_most_critical_first_then_priority(self):
+        board = self._board()
+        ready = [t for t in board if not t.dependencies]
+        s = self.scheduler_mod.Scheduler(self.Config(scheduler_aging_factor=0))
+        self.assertEqual([t.id for t in s.order(ready, board, now=0)], ["A", "E", "D"])
+
+    def test_aging_promotes_waiting_tasks(self):
+        board = self._board()
+        ready = [t for t in board if not t.dependencies]
+        s = self.scheduler_mod.Scheduler(self.Config(scheduler_aging_factor=1.0))
+        s.order([board[0]], board, now=0)  # D has been ready since t=0
+        self.assertEqual(s.order(ready, board, now=100)[0].id, "D")
+
+    def test_plan_predicts_makespan(self):
+        s = self.scheduler_mod.Scheduler(self.Config())
+        planned = s.plan(self._board(), slots=2)
+        self.assertEqual(planned[0].task.id, "A")
+        self.assertEqual(max(p.end_s for p in planned), 120)
+        self.assertEqual({p.task.id for p in planned}, {"A", "B", "C", "D", "E"})
+
+
+if __name__ == "__main__":
+    unittest.main()
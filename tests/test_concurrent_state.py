@@ -0,0 +1,84 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNTIME_DIR = REPO_ROOT / "concurrent" / "new-project" / "runtime"
+
+STATUS = """# Project Status
+
+## Current Phase
+implementation
+
+## Last Updated
+today
+
+## Tasks
+
+"""
+
+
+class TestPipelinedPhases(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        import state
+        self.state_mod = state
+        self._tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self._tmp.name)
+        (self.project / "STATUS.md").write_text(STATUS, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        sys.path.remove(str(RUNTIME_DIR))
+
+    def _state(self, pipelined):
+        Task = self.state_mod.Task
+        st = self.state_mod.State(str(self.project), pipelined=pipelined)
+        st.add_tasks([
+            Task(id="IMP-BE", title="Backend", role="fullstack-engineer", phase="implementation", status="done"),
+            Task(id="IMP-FE", title="Frontend", role="frontend-engineer", phase="implementation", status="in_progress"),
+            Task(id="QA-BE", title="QA backend", role="qa-engineer", phase="qa", dependencies=["IMP-BE"]),
+            Task(id="QA-ALL", title="QA audit", role="qa-engineer", phase="qa"),
+        ])
+        return st
+
+    def test_barrier_mode_only_returns_current_phase(self):
+        self.assertEqual(self._state(pipelined=False).get_ready_tasks(), [])
+
+    def test_later_phase_task_starts_when_its_dependencies_are_done(self):
+        st = self._state(pipelined=True)
+        self.assertEqual([t.id for t in st.get_ready_tasks()], ["QA-BE"])
+        self.assertEqual(st.effective_dependencies(st.tasks[3]), ["IMP-BE", "IMP-FE"])
+
+    def test_status_reports_active_phases(self):
+        st = self._state(pipelined=True)
+        st.mark_in_progress(st.tasks[2])
+        content = (self.project / "STATUS.md").read_text(encoding="utf-8")
+        self.assertIn("## Current Phase\nimplementation (active: implementation, qa)\n", content)
+        self.assertEqual(self.state_mod.State(str(self.project)).current_phase, "implementation")
+
+
+class TestTaskCards(unittest.TestCase):
+    def test_card_fields_round_trip(self):
+        sys.path.insert(0, str(RUNTIME_DIR))
+        try:
+            import state
+            with tempfile.TemporaryDirectory() as tmpdir:
+                (Path(tmpdir) / "STATUS.md").write_text(STATUS, encoding="utf-8")
+                st = state.State(tmpdir)
+                st.add_tasks([state.Task(
+                    id="IMP-1", title="API", role="fullstack-engineer", phase="implementation",
+                    dependencies=["IMP-0"], file_scope=["src/api"], timeout=900, resources=["db", "browser"],
+                )])
+                (loaded,) = state.State(tmpdir).tasks
+        finally:
+            sys.path.remove(str(RUNTIME_DIR))
+        self.assertEqual(loaded.resources, ["db", "browser"])
+        self.assertEqual(loaded.timeout, 900)
+        self.assertEqual(loaded.dependencies, ["IMP-0"])
+        self.assertEqual(loaded.status, "ready")
+
+
+if __name__ == "__main__":
+    unittest.main()